@@ -2,8 +2,11 @@ import sys
 from sqlalchemy import or_
 
 from app import create_app
+from changelog import lock_log, log_changes
 from database import db
-from models import User, Task, Message, Ride, EmailOTP
+from models import User, Task, Message, Ride, EmailOTP, Conversation, ChatReadCursor
+from search import remove_documents
+from versions import bump_versions
 
 
 def delete_user_by_email(email: str) -> str:
@@ -13,9 +16,29 @@ def delete_user_by_email(email: str) -> str:
         if not user:
             return "user-not-found"
 
+        # before any other write: the tombstones below must commit in seq order
+        lock_log(db.session.connection())
+        # bulk deletes skip the ORM hooks, so bump the cached collections they
+        # change by hand: every chat partner's overview and the public lists
+        partners = {c.user_b_id if c.user_a_id == user.id else c.user_a_id for c in
+                    Conversation.query.filter(or_(Conversation.user_a_id == user.id, Conversation.user_b_id == user.id))}
+        bump_versions(db.session.connection(), ["tasks", "rides"] + [f"chat:{uid}" for uid in partners])
+
         # Delete dependent rows first to satisfy FK constraints
-        Message.query.filter(or_(Message.sender_id == user.id, Message.receiver_id == user.id)).delete(synchronize_session=False)
+        ChatReadCursor.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+        Conversation.query.filter(or_(Conversation.user_a_id == user.id, Conversation.user_b_id == user.id)).delete(synchronize_session=False)
+        conn = db.session.connection()
+        # tombstones for synced clients, which the bulk deletes would not write
+        messages = Message.query.filter(or_(Message.sender_id == user.id, Message.receiver_id == user.id))
+        log_changes(conn, "message", [(m.id, True, m.sender_id, m.receiver_id) for m in messages])
+        messages.delete(synchronize_session=False)
+        # bulk deletes skip the ORM hooks that keep the search index in sync
+        task_ids = [tid for (tid,) in db.session.query(Task.id).filter_by(user_id=user.id)]
+        remove_documents(conn, "task", task_ids)
+        log_changes(conn, "task", [(tid, True, None, None) for tid in task_ids])
         Task.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+        ride_ids = [rid for (rid,) in db.session.query(Ride.id).filter_by(driver_id=user.id)]
+        log_changes(conn, "ride", [(rid, True, None, None) for rid in ride_ids])
         Ride.query.filter_by(driver_id=user.id).delete(synchronize_session=False)
         EmailOTP.query.filter_by(user_id=user.id).delete(synchronize_session=False)
 
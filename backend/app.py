@@ -1,11 +1,62 @@
+import hmac
+import json
 import os
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_jwt_extended import JWTManager
 from flask_socketio import SocketIO
 from dotenv import load_dotenv
 
 from config import Config
-from database import db
+from database import apply_sqlite_pragmas, db
+from markupsafe import escape
+from pagination import after_cursor, clamp_limit, encode_cursor
+
+# rows fetched per server-side cursor batch and written per response chunk
+STREAM_BATCH_SIZE = 200
+OVERVIEW_PAGE_SIZE = 200
+OVERVIEW_MAX_PAGE = 5000
+ADMIN_PAGE_SIZE = 500
+ADMIN_MAX_PAGE = 5000
+
+
+def _owner_task_query(cursor=None):
+    """Select tasks newest first with their owner joined in (no per-row lazy
+    load), read through a server-side cursor STREAM_BATCH_SIZE rows at a time.
+    Raises ValueError for a malformed cursor.
+    """
+    from sqlalchemy import select
+    from sqlalchemy.orm import joinedload
+    from models.task import Task
+    stmt = select(Task).options(joinedload(Task.owner)).order_by(Task.created_at.desc(), Task.id.desc())
+    if cursor:
+        stmt = after_cursor(stmt, Task.created_at, Task.id, cursor)
+    return stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+
+
+class _TaskPage:
+    """Iterate the tasks selected by `stmt`, stopping after `limit` rows (None
+    for all). Fetches one extra row to know whether another page follows;
+    next_cursor is set once iteration ends.
+    """
+
+    def __init__(self, stmt, limit):
+        self.stmt = stmt if limit is None else stmt.limit(limit + 1)
+        self.limit = limit
+        self.next_cursor = None
+
+    def __iter__(self):
+        last = None
+        result = db.session.execute(self.stmt).scalars()
+        try:
+            for n, row in enumerate(result):
+                if self.limit is not None and n == self.limit:
+                    self.next_cursor = encode_cursor(last.created_at, last.id)
+                    break
+                last = row
+                yield row
+        finally:
+            result.close()
+
 
 def create_app():
     # Load environment variables from backend/.env if present
@@ -24,75 +75,26 @@ def create_app():
 
     # register routes
     with app.app_context():
-        # lightweight schema migration: ensure acceptance column exists
-        try:
-            from sqlalchemy import inspect, text
-            engine = db.engine
-            insp = inspect(engine)
-            cols = [c['name'] for c in insp.get_columns('tasks')]
-            statements = []
-            if 'assignee_id' not in cols:
-                statements.append('ALTER TABLE tasks ADD COLUMN assignee_id INTEGER')
-            # ensure status column exists (older DBs)
-            if 'status' not in cols:
-                statements.append("ALTER TABLE tasks ADD COLUMN status VARCHAR(50) DEFAULT 'open'")
-            # messages table additions
-            try:
-                mcols = [c['name'] for c in insp.get_columns('messages')]
-            except Exception:
-                mcols = []
-            if 'task_id' not in mcols:
-                statements.append('ALTER TABLE messages ADD COLUMN task_id INTEGER')
-            # users table extra columns
-            try:
-                ucols = [c['name'] for c in insp.get_columns('users')]
-            except Exception:
-                ucols = []
-            if 'first_name' not in ucols:
-                statements.append("ALTER TABLE users ADD COLUMN first_name VARCHAR(80) DEFAULT ''")
-            if 'last_name' not in ucols:
-                statements.append("ALTER TABLE users ADD COLUMN last_name VARCHAR(80) DEFAULT ''")
-
-            # study_sessions table additions
-            try:
-                scols = [c['name'] for c in insp.get_columns('study_sessions')]
-            except Exception:
-                scols = []
-            if 'campus' not in scols:
-                statements.append("ALTER TABLE study_sessions ADD COLUMN campus VARCHAR(30) DEFAULT 'Surrey'")
-            if 'teacher' not in scols:
-                statements.append("ALTER TABLE study_sessions ADD COLUMN teacher VARCHAR(120) DEFAULT ''")
-            if 'description' not in scols:
-                statements.append("ALTER TABLE study_sessions ADD COLUMN description TEXT DEFAULT ''")
-
-            # rides table additions
-            try:
-                rcols = [c['name'] for c in insp.get_columns('rides')]
-            except Exception:
-                rcols = []
-            if 'kind' not in rcols:
-                statements.append("ALTER TABLE rides ADD COLUMN kind VARCHAR(20) DEFAULT 'offer'")
-            if 'description' not in rcols:
-                statements.append("ALTER TABLE rides ADD COLUMN description TEXT DEFAULT ''")
-
-            if statements:
-                with engine.begin() as conn:
-                    for stmt in statements:
-                        try:
-                            conn.execute(text(stmt))
-                        except Exception as e:
-                            print('Migration statement failed:', stmt, e)
-        except Exception as e:
-            # If anything fails, continue; create_all below will work for new DBs
-            print('Schema check failed or skipped:', e)
+        apply_sqlite_pragmas(db.engine, app.config)
+        # schema changes run through `python migrate.py`; startup only checks the version
+        from migrations import LATEST_VERSION, current_version
+        version = current_version(db.engine)
+        if version < LATEST_VERSION:
+            print(f"Database schema is at version {version}, expected {LATEST_VERSION}: run `python migrate.py`")
         # import blueprints
-        from routes import auth, tasks, chat, rides, users, study
+        from routes import auth, tasks, chat, rides, users, study, search, sync
         app.register_blueprint(auth.bp)
         app.register_blueprint(tasks.bp)
         app.register_blueprint(chat.bp)
         app.register_blueprint(rides.bp)
         app.register_blueprint(users.bp)
         app.register_blueprint(study.bp)
+        app.register_blueprint(search.bp)
+        app.register_blueprint(sync.bp)
+        # backrefs such as Task.owner only exist once the mappers are configured;
+        # do it now so a first request that names them does not fail
+        from sqlalchemy.orm import configure_mappers
+        configure_mappers()
 
         # register socket.io event handlers
         try:
@@ -104,54 +106,122 @@ def create_app():
             # Avoid crashing app if sockets package missing; log to console
             print("Socket handlers not registered:", e)
 
+        # per-endpoint latency, SQL and Socket.IO counters, served at /metrics
+        import metrics
+        metrics.init_app(app, socketio, engine=db.engine)
+
     # simple health route
     @app.route("/")
     def index():
         return jsonify({"status": "ErrandBuddy Backend Running"})
 
-    # overview JSON showing all tasks with owner usernames
+    # Prometheus text exposition of the counters collected by metrics.py,
+    # for scrapers holding METRICS_TOKEN only
+    @app.route("/metrics")
+    def metrics_endpoint():
+        import metrics
+        expected = app.config.get("METRICS_TOKEN")
+        if not expected:
+            return jsonify({"msg": "Not found"}), 404
+        sent = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(sent.encode(), f"Bearer {expected}".encode()):
+            return jsonify({"msg": "Unauthorized"}), 401
+        return metrics.REGISTRY.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+    # overview JSON of all tasks with owner usernames, streamed in batches;
+    # ?limit= and/or ?cursor= return one keyset page with next_cursor
     @app.route("/overview")
     def overview():
-        from models.task import Task
-        tasks = Task.query.order_by(Task.created_at.desc()).all()
-        payload = []
-        for t in tasks:
-            payload.append({
-                "id": t.id,
-                "title": t.title,
-                "description": t.description,
-                "user_id": t.user_id,
-                "username": t.owner.username if getattr(t, 'owner', None) else None,
-                "created_at": t.created_at.isoformat(),
-            })
-        return jsonify({"count": len(payload), "tasks": payload})
-
-    # simple admin HTML table for quick viewing in browser
+        try:
+            limit = int(request.args["limit"]) if request.args.get("limit") else None
+            cursor = (request.args.get("cursor") or "").strip()
+            query = _owner_task_query(cursor)
+        except ValueError:
+            return jsonify({"msg": "Invalid limit or cursor"}), 400
+        paged = limit is not None or bool(cursor)
+        if paged:
+            limit = clamp_limit(limit, OVERVIEW_PAGE_SIZE, OVERVIEW_MAX_PAGE)
+
+        def generate():
+            yield '{"tasks": ['
+            chunk, count, rows = [], 0, _TaskPage(query, limit if paged else None)
+            for t in rows:
+                chunk.append(json.dumps({
+                    "id": t.id,
+                    "title": t.title,
+                    "description": t.description,
+                    "user_id": t.user_id,
+                    "username": t.owner.username if t.owner else None,
+                    "created_at": t.created_at.isoformat(),
+                }))
+                count += 1
+                if len(chunk) >= STREAM_BATCH_SIZE:
+                    yield ("," if count > len(chunk) else "") + ",".join(chunk)
+                    chunk = []
+            if chunk:
+                yield ("," if count > len(chunk) else "") + ",".join(chunk)
+            tail = {"count": count}
+            if paged:
+                tail["next_cursor"] = rows.next_cursor
+            yield "], " + json.dumps(tail)[1:]
+
+        return Response(stream_with_context(generate()), mimetype="application/json")
+
+    # simple admin HTML table for quick viewing in browser, one page at a time
     @app.route("/admin/tasks")
     def admin_tasks():
-        from models.task import Task
-        rows = [
-            f"<tr><td>{t.id}</td><td>{t.title}</td><td>{t.owner.username if getattr(t,'owner',None) else ''}</td><td>{t.created_at.strftime('%Y-%m-%d %H:%M:%S')}</td></tr>"
-            for t in Task.query.order_by(Task.created_at.desc()).all()
-        ]
-        table = """
+        try:
+            limit = int(request.args["limit"]) if request.args.get("limit") else None
+            cursor = (request.args.get("cursor") or "").strip()
+            query = _owner_task_query(cursor)
+        except ValueError:
+            return "Invalid limit or cursor", 400
+        limit = clamp_limit(limit, ADMIN_PAGE_SIZE, ADMIN_MAX_PAGE)
+
+        def generate():
+            yield """
         <html><head><title>Tasks Admin</title>
         <style>body{font-family:Segoe UI,Arial} table{border-collapse:collapse} td,th{border:1px solid #ddd;padding:6px}</style>
         </head><body>
         <h3>All Tasks</h3>
         <table>
           <thead><tr><th>ID</th><th>Title</th><th>Username</th><th>Created</th></tr></thead>
-          <tbody>{rows}</tbody>
-        </table>
-        </body></html>
-        """.replace("{rows}", "\n".join(rows))
-        return table
+          <tbody>
+"""
+            chunk, rows = [], _TaskPage(query, limit)
+            for t in rows:
+                chunk.append(f"<tr><td>{t.id}</td><td>{escape(t.title)}</td>"
+                             f"<td>{escape(t.owner.username) if t.owner else ''}</td>"
+                             f"<td>{t.created_at.strftime('%Y-%m-%d %H:%M:%S')}</td></tr>")
+                if len(chunk) >= STREAM_BATCH_SIZE:
+                    yield "\n".join(chunk) + "\n"
+                    chunk = []
+            if chunk:
+                yield "\n".join(chunk) + "\n"
+            yield "          </tbody>\n        </table>\n"
+            if rows.next_cursor:
+                yield f'        <p><a href="?limit={limit}&cursor={rows.next_cursor}">Next page</a></p>\n'
+            yield "        </body></html>\n"
+
+        return Response(stream_with_context(generate()), mimetype="text/html")
 
     return app, socketio
 
+def start_background_workers(app):
+    """Threads only the server process runs (scripts that call create_app
+    must not send mail): outbox delivery and the expired-code purge.
+    """
+    import mailer
+    mailer.init_app(app)
+    import otp
+    otp.init_app(app)
+
+
 if __name__ == "__main__":
     app, socketio = create_app()
-    # create db if not exists
+    # create or upgrade the schema (a single version check when current)
     with app.app_context():
-        db.create_all()
+        from migrations import upgrade
+        upgrade(db.engine)
+    start_background_workers(app)
     socketio.run(app, debug=True)
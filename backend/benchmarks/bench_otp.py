@@ -0,0 +1,81 @@
+"""Throughput of the OTP endpoints with keyed digests vs password hashes.
+
+Drives /auth/register, /auth/resend-otp and /auth/verify-otp through the
+Flask test client against a throwaway SQLite database, once with the HMAC
+codes and once with codes hashed by werkzeug's generate_password_hash (the
+previous scheme). Mail stays in the outbox; no worker threads run.
+
+    python benchmarks/bench_otp.py [--users 200]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _code(OutboundEmail, email):
+    msg = OutboundEmail.query.filter_by(to_addr=email).order_by(OutboundEmail.id.desc()).first()
+    return re.search(r"code is: (\d{6})", msg.body).group(1)
+
+
+def run(app, db, OutboundEmail, scheme, users):
+    client = app.test_client()
+    emails = [f"{scheme}{i}@student.kpu.ca" for i in range(users)]
+    timings = {}
+
+    t0 = time.perf_counter()
+    for email in emails:
+        assert client.post("/auth/register", json={"email": email, "password": "pw"}).status_code == 201
+    timings["register"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for email in emails:
+        assert client.post("/auth/resend-otp", json={"email": email}).status_code == 200
+    timings["resend"] = time.perf_counter() - t0
+
+    codes = {email: _code(OutboundEmail, email) for email in emails}
+    t0 = time.perf_counter()
+    for email in emails:
+        resp = client.post("/auth/verify-otp", json={"email": email, "otp": codes[email]})
+        assert resp.status_code == 200
+    timings["verify"] = time.perf_counter() - t0
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-otp-")
+    os.environ["DATABASE_URI"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ["SMTP_HOST"] = ""
+    os.environ["OTP_LOG"] = os.path.join(tmp, "otp_dev.log")
+    os.environ["MAIL_WORKERS"] = "0"
+    os.environ["OTP_PURGE_SECONDS"] = "0"
+    from werkzeug.security import generate_password_hash
+    from app import create_app
+    from database import db
+    from models.outbound_email import OutboundEmail
+    import otp
+
+    hmac_hash = otp.hash_code
+    app, _ = create_app()
+    with app.app_context():
+        db.create_all()
+        for scheme in ("pbkdf2", "hmac"):
+            otp.hash_code = hmac_hash if scheme == "hmac" else (lambda user_id, code: generate_password_hash(code))
+            timings = run(app, db, OutboundEmail, scheme, args.users)
+            for name, seconds in timings.items():
+                print(f"[{scheme:6}] {name:8} {args.users / seconds:8.1f} req/s  "
+                      f"({seconds * 1000 / args.users:6.2f} ms/req)")
+        otp.hash_code = hmac_hash
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Search latency on a synthetic corpus.
+
+Seeds N documents (half tasks, half study sessions) straight into the search
+index of a throwaway SQLite database, then times ranked first-page queries
+for the FTS5 and trigram backends.
+
+    python benchmarks/bench_search.py [--rows 100000] [--repeat 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+SUBJECTS = ("CPSC", "MATH", "BIOL", "CHEM", "PHYS", "ENGL", "PSYC", "ECON", "BUSI", "CRIM")
+QUERIES = ("cpsc 1150", "calculus", "library pickup", "pro", "midterm review notes", "zebra")
+
+
+def _words(rng, vocab, n):
+    return " ".join(rng.choice(vocab) for _ in range(n))
+
+
+def seed(search, conn, rows, batch=5000):
+    rng = random.Random(42)
+    vocab = ["programming", "calculus", "library", "pickup", "groceries", "midterm", "review",
+             "notes", "textbook", "surrey", "langley", "richmond", "lab", "essay", "tutor"]
+    vocab += [f"w{i:04d}" for i in range(5000)]
+    half = rows // 2
+    for kind, count in (("task", half), ("study", rows - half)):
+        for start in range(0, count, batch):
+            docs = []
+            for ref_id in range(start + 1, min(start + batch, count) + 1):
+                if kind == "study":
+                    title = f"{rng.choice(SUBJECTS)} {rng.randint(1000, 4999)}"
+                else:
+                    title = _words(rng, vocab, 4)
+                docs.append((ref_id, title, _words(rng, vocab, 25)))
+            search.index_documents(conn, kind, docs)
+
+
+def bench(search, session, repeat):
+    results = {}
+    for q in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            hits, _ = search.search(session, q, limit=20)
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        results[q] = (len(hits), statistics.median(timings), timings[int(len(timings) * 0.95) - 1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-search-")
+    os.environ["DATABASE_URI"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    from app import create_app
+    from database import db
+    import search
+
+    app, _ = create_app()
+    with app.app_context():
+        db.create_all()
+        for backend in ("fts5", "ngram"):
+            search.SEARCH_BACKEND = "auto" if backend == "fts5" else "ngram"
+            t0 = time.perf_counter()
+            with db.engine.begin() as conn:
+                conn.exec_driver_sql("DELETE FROM search_grams")
+                conn.exec_driver_sql("DELETE FROM search_documents")
+                seed(search, conn, args.rows)
+            print(f"[{backend}] indexed {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+            for q, (n, p50, p95) in bench(search, db.session, args.repeat).items():
+                print(f"[{backend}] {q!r:24} hits={n:3} p50={p50:6.2f}ms p95={p95:6.2f}ms")
+            db.session.rollback()
+
+
+if __name__ == "__main__":
+    main()
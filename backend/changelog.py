@@ -0,0 +1,120 @@
+"""Change log behind GET /sync.
+
+Every ORM write to a task, ride, study session or message replaces that
+row's entry in change_log with a fresh seq (a tombstone for deletes), in the
+same transaction as the write, through an after_flush hook like the search
+index's. A sync token is the highest seq a client has applied; the next
+sync returns the rows whose entries moved past it.
+
+A token is only safe if seqs are committed in the order they are handed
+out: a transaction that commits after a client synced past a higher seq
+would be skipped for good. SQLite runs one write transaction at a time, so
+this holds there for free. On other databases a before_flush hook first
+takes a row lock (the "sync" row of collection_versions) that is held until
+commit, so writes to synced rows are serialized. Writes that bypass the ORM
+must call lock_log and then log_changes themselves.
+"""
+import base64
+
+from sqlalchemy import and_, delete, event, insert, or_
+from sqlalchemy.orm import Session
+
+from models.change_log import ChangeLogEntry
+from models.message import Message
+from models.ride import Ride
+from models.study_session import StudySession
+from models.task import Task
+from versions import bump_versions
+
+_log = ChangeLogEntry.__table__
+
+
+def _public(obj):
+    return None, None
+
+
+# model -> (kind, audience of a row)
+_SOURCES = {
+    Task: ("task", _public),
+    Ride: ("ride", _public),
+    StudySession: ("study", _public),
+    Message: ("message", lambda m: (m.sender_id, m.receiver_id)),
+}
+MODELS = {kind: model for model, (kind, _) in _SOURCES.items()}
+# dialects that already run one write transaction at a time
+_SERIAL_DIALECTS = ("sqlite",)
+# collection_versions row whose lock orders the change log's writers
+SYNC_LOCK = "sync"
+
+
+def lock_log(conn):
+    """Hold the change-log lock until this transaction ends, so the seqs it
+    writes commit in order with everyone else's. Take it before writing
+    synced rows; a lock taken after other row locks can deadlock.
+    """
+    if conn.dialect.name not in _SERIAL_DIALECTS:
+        bump_versions(conn, [SYNC_LOCK])
+
+
+def log_changes(conn, kind, changes):
+    """Move the entries for `changes` [(ref_id, deleted, audience_a,
+    audience_b)] of one kind to new seqs, in the order given.
+    """
+    if not changes:
+        return
+    ref_ids = [c[0] for c in changes]
+    conn.execute(delete(_log).where(_log.c.kind == kind, _log.c.ref_id.in_(ref_ids)))
+    conn.execute(insert(_log), [
+        {"kind": kind, "ref_id": ref_id, "deleted": deleted, "audience_a": a, "audience_b": b}
+        for ref_id, deleted, a, b in changes
+    ])
+
+
+@event.listens_for(Session, "before_flush")
+def _lock_before_synced_writes(session, flush_context, instances):
+    if session.get_bind().dialect.name in _SERIAL_DIALECTS:
+        return
+    if any(type(obj) in _SOURCES for obj in session.new | session.dirty | session.deleted):
+        lock_log(session.connection())
+
+
+@event.listens_for(Session, "after_flush")
+def _log_synced_rows(session, flush_context):
+    changes = {}
+    for obj in session.new | session.dirty | session.deleted:
+        source = _SOURCES.get(type(obj))
+        if source is None:
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        kind, audience = source
+        changes.setdefault(kind, {})[obj.id] = (obj.id, obj in session.deleted, *audience(obj))
+    if changes:
+        conn = session.connection()
+        for kind, rows in changes.items():
+            log_changes(conn, kind, list(rows.values()))
+
+
+def encode_token(seq: int) -> str:
+    return base64.urlsafe_b64encode(f"seq:{seq}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str) -> int:
+    """The seq in a sync token (0 for none); raises ValueError if malformed."""
+    if not token:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode((token + "=" * (-len(token) % 4)).encode("ascii")).decode("ascii")
+        prefix, seq = raw.split(":", 1)
+        if prefix != "seq" or int(seq) < 0:
+            raise ValueError
+        return int(seq)
+    except Exception as e:
+        raise ValueError("Invalid sync token") from e
+
+
+def visible_to(user_id):
+    """Entries `user_id` may receive: public rows and their own messages."""
+    c = ChangeLogEntry
+    return or_(and_(c.audience_a.is_(None), c.audience_b.is_(None)),
+               c.audience_a == user_id, c.audience_b == user_id)
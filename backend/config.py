@@ -2,10 +2,46 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes")
+
+
+def engine_options(uri: str) -> dict:
+    """SQLAlchemy engine options from the environment.
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE (seconds), DB_POOL_TIMEOUT
+    (seconds) and DB_POOL_PRE_PING. Pre-ping defaults on for server databases,
+    whose connections can be dropped while idle, and off for SQLite files.
+    """
+    if uri.startswith("sqlite") and (uri in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in uri):
+        return {}  # single shared in-memory connection, nothing to pool
+    is_sqlite = uri.startswith("sqlite")
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "20")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "-1" if is_sqlite else "1800")),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", not is_sqlite),
+    }
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "supersecretkey")
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "DATABASE_URI", f"sqlite:///{os.path.join(BASE_DIR, 'errandbuddy.db')}"
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # per-connection SQLite PRAGMAs (see database.apply_sqlite_pragmas); WAL lets
+    # readers carry on while a chat write commits
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # negative values are KiB, so -65536 is a 64 MiB page cache per connection
+    SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", "-65536"))
+    # key for OTP digests; falls back to SECRET_KEY
+    OTP_SECRET = os.environ.get("OTP_SECRET")
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "jwt-secret-key")
+    # bearer token a scraper must send to read /metrics; unset turns the endpoint off
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
@@ -1,3 +1,28 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 db = SQLAlchemy()
+
+
+def apply_sqlite_pragmas(engine, config):
+    """Run the SQLITE_* PRAGMAs from `config` (a Flask config or Config) on
+    every new connection of `engine`. No-op for other databases.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    get = config.get if hasattr(config, "get") else (lambda key: getattr(config, key, None))
+    pragmas = [
+        ("journal_mode", get("SQLITE_JOURNAL_MODE")),
+        ("synchronous", get("SQLITE_SYNCHRONOUS")),
+        ("busy_timeout", get("SQLITE_BUSY_TIMEOUT_MS")),
+        ("mmap_size", get("SQLITE_MMAP_SIZE")),
+        ("cache_size", get("SQLITE_CACHE_SIZE")),
+    ]
+    pragmas = [(name, value) for name, value in pragmas if value not in (None, "")]
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, record):
+        cur = dbapi_conn.cursor()
+        for name, value in pragmas:
+            cur.execute(f"PRAGMA {name}={value}")
+        cur.close()
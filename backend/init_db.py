@@ -1,8 +1,9 @@
 from app import create_app
 from database import db
+from migrations import upgrade
 
 app, _ = create_app()
 
 with app.app_context():
-    db.create_all()
+    upgrade(db.engine)
     print("Database created.")
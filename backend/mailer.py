@@ -1,56 +1,154 @@
 import os
+import random
 import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 
+from sqlalchemy import and_, event, or_, select, update
 
-def send_email(to_addr: str, subject: str, body: str) -> bool:
+# Outbox delivery tuning (env overrides)
+MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", "2"))
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "20"))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "6"))
+MAIL_BACKOFF_SECONDS = float(os.getenv("MAIL_BACKOFF_SECONDS", "30"))
+MAIL_BACKOFF_MAX_SECONDS = float(os.getenv("MAIL_BACKOFF_MAX_SECONDS", "3600"))
+# a worker that dies mid-batch leaves rows "sending"; reclaim them after this.
+# The lease is renewed right before each send, so it covers one message
+# (connect, TLS, login and a reconnect at SMTP_TIMEOUT_SECONDS each), not a batch
+MAIL_CLAIM_LEASE_SECONDS = 300
+SMTP_TIMEOUT_SECONDS = 10
+# how long an idle worker sleeps between outbox checks when not woken
+MAIL_POLL_SECONDS = 5.0
+# idle SMTP sessions are checked with NOOP after this long and closed after MAIL_SMTP_IDLE_CLOSE
+MAIL_SMTP_NOOP_AFTER = 30.0
+MAIL_SMTP_IDLE_CLOSE = 120.0
+
+# set after a commit that enqueued mail so sleeping workers start right away
+_wake = threading.Event()
+
+
+def smtp_settings() -> dict:
     """
-    Best-effort email sender. If SMTP env vars are not configured,
-    prints the email to console and returns True so that local dev
-    can proceed without real delivery.
+    SMTP configuration from the environment. host is None when mail is not
+    configured, in which case messages are printed and written to OTP_LOG.
     Env vars:
-      SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_FROM, SMTP_USE_TLS
+      SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_FROM, SMTP_USE_TLS, SMTP_USE_SSL
     """
     host = os.getenv("SMTP_HOST")
     port = int(os.getenv("SMTP_PORT", "0") or 0)
     user = os.getenv("SMTP_USER")
-    pwd = os.getenv("SMTP_PASSWORD")
     from_addr = os.getenv("SMTP_FROM", user or "noreply@example.com")
     # SSL for port 465; TLS (STARTTLS) usually for 587
     use_ssl = os.getenv("SMTP_USE_SSL", "").lower() in ("1", "true", "yes") or port == 465
     use_tls = (os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")) and not use_ssl
+    return {
+        "host": host if (host and port and from_addr) else None,
+        "port": port,
+        "user": user,
+        "password": os.getenv("SMTP_PASSWORD"),
+        "from_addr": from_addr,
+        "use_ssl": use_ssl,
+        "use_tls": use_tls,
+    }
+
+
+def _dev_deliver(to_addr: str, subject: str, body: str):
+    print("[MAIL DEV] To:", to_addr)
+    print("[MAIL DEV] Subject:", subject)
+    print("[MAIL DEV] Body:\n", body)
+    # Also write to a local dev log for easy retrieval
+    try:
+        log_path = os.getenv("OTP_LOG") or os.path.join(os.path.dirname(__file__), "otp_dev.log")
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(f"To: {to_addr}\nSubject: {subject}\n{body}\n{'-'*40}\n")
+    except Exception as e:
+        print("[MAIL DEV] Failed to write OTP log:", e)
+
+
+class SmtpSession:
+    """One authenticated SMTP connection, opened lazily and reused across
+    sends. Idle connections are probed with NOOP before reuse and reopened
+    once if the server dropped them.
+    """
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+        self.server = None
+        self.last_used = 0.0
+        self.connects = 0
+
+    def _open(self):
+        s = self.settings
+        if s["use_ssl"]:
+            server = smtplib.SMTP_SSL(s["host"], s["port"], timeout=SMTP_TIMEOUT_SECONDS)
+        else:
+            server = smtplib.SMTP(s["host"], s["port"], timeout=SMTP_TIMEOUT_SECONDS)
+            if s["use_tls"]:
+                server.starttls()
+        if s["user"] and s["password"]:
+            server.login(s["user"], s["password"])
+        self.server = server
+        self.connects += 1
 
-    if not host or not port or not from_addr:
-        print("[MAIL DEV] To:", to_addr)
-        print("[MAIL DEV] Subject:", subject)
-        print("[MAIL DEV] Body:\n", body)
-        # Also write to a local dev log for easy retrieval
+    def _alive(self) -> bool:
+        if self.server is None:
+            return False
+        if time.monotonic() - self.last_used < MAIL_SMTP_NOOP_AFTER:
+            return True
         try:
-            log_path = os.getenv("OTP_LOG") or os.path.join(os.path.dirname(__file__), "otp_dev.log")
-            with open(log_path, "a", encoding="utf-8") as f:
-                f.write(f"To: {to_addr}\nSubject: {subject}\n{body}\n{'-'*40}\n")
-        except Exception as e:
-            print("[MAIL DEV] Failed to write OTP log:", e)
-        return True
+            return self.server.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    def send(self, to_addr: str, subject: str, body: str):
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = self.settings["from_addr"]
+        msg["To"] = to_addr
+        if not self._alive():
+            self.close()
+            self._open()
+        try:
+            self.server.sendmail(self.settings["from_addr"], [to_addr], msg.as_string())
+        except smtplib.SMTPServerDisconnected:
+            # dropped between the liveness check and the send: reconnect once
+            self.close()
+            self._open()
+            self.server.sendmail(self.settings["from_addr"], [to_addr], msg.as_string())
+        self.last_used = time.monotonic()
+
+    def close_if_idle(self):
+        if self.server is not None and time.monotonic() - self.last_used > MAIL_SMTP_IDLE_CLOSE:
+            self.close()
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
 
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = from_addr
-    msg["To"] = to_addr
 
+def send_email(to_addr: str, subject: str, body: str) -> bool:
+    """
+    Best-effort synchronous send on a one-off connection (scripts and
+    debugging; request handlers use enqueue_email). If SMTP env vars are not
+    configured, prints the email to console and returns True so that local
+    dev can proceed without real delivery.
+    """
+    settings = smtp_settings()
+    if not settings["host"]:
+        _dev_deliver(to_addr, subject, body)
+        return True
+    session = SmtpSession(settings)
     try:
-        if use_ssl:
-            with smtplib.SMTP_SSL(host, port, timeout=10) as server:
-                if user and pwd:
-                    server.login(user, pwd)
-                server.sendmail(from_addr, [to_addr], msg.as_string())
-        else:
-            with smtplib.SMTP(host, port, timeout=10) as server:
-                if use_tls:
-                    server.starttls()
-                if user and pwd:
-                    server.login(user, pwd)
-                server.sendmail(from_addr, [to_addr], msg.as_string())
+        session.send(to_addr, subject, body)
         return True
     except Exception as e:
         print("[MAIL ERROR]", e)
@@ -59,3 +157,155 @@ def send_email(to_addr: str, subject: str, body: str) -> bool:
         print("[MAIL FALLBACK] Subject:", subject)
         print("[MAIL FALLBACK] Body:\n", body)
         return False
+    finally:
+        session.close()
+
+
+def enqueue_email(to_addr: str, subject: str, body: str):
+    """Add a message to the outbox in the current transaction; the worker
+    pool is woken once it commits.
+    """
+    from database import db
+    from models.outbound_email import OutboundEmail
+    msg = OutboundEmail(to_addr=to_addr, subject=subject, body=body)
+    db.session.add(msg)
+    event.listen(db.session(), "after_commit", lambda session: _wake.set(), once=True)
+    return msg
+
+
+def _is_permanent(exc: Exception) -> bool:
+    """5xx replies will not succeed on retry."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code >= 500 and not isinstance(exc, smtplib.SMTPAuthenticationError)
+    return False
+
+
+def backoff_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the attempt that just failed."""
+    delay = min(MAIL_BACKOFF_MAX_SECONDS, MAIL_BACKOFF_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay + random.uniform(0, delay * 0.1)
+
+
+def claim_batch(session, limit: int = None) -> list:
+    """Atomically mark up to `limit` due messages as sending and return them.
+    Safe with several workers (or processes): a row is only claimed by the
+    UPDATE that flips it, identified by a per-batch token.
+    """
+    from models.outbound_email import OutboundEmail as E
+    now = datetime.utcnow()
+    due = or_(
+        and_(E.status == "pending", E.next_attempt_at <= now),
+        and_(E.status == "sending", E.claimed_at < now - timedelta(seconds=MAIL_CLAIM_LEASE_SECONDS)),
+    )
+    ids = [row_id for (row_id,) in session.execute(
+        select(E.id).where(due).order_by(E.next_attempt_at, E.id).limit(limit or MAIL_BATCH_SIZE))]
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    session.execute(update(E).where(E.id.in_(ids), due)
+                    .values(status="sending", claim_token=token, claimed_at=now)
+                    .execution_options(synchronize_session=False))
+    session.commit()
+    return session.query(E).filter_by(claim_token=token).order_by(E.id).all()
+
+
+def renew_claim(session, msg_id: int, token: str) -> bool:
+    """Restart the lease on one message of the batch claimed with `token`,
+    just before it is sent. False when the lease ran out and another worker
+    has reclaimed it.
+    """
+    from models.outbound_email import OutboundEmail as E
+    renewed = session.execute(update(E).where(E.id == msg_id, E.status == "sending", E.claim_token == token)
+                              .values(claimed_at=datetime.utcnow())
+                              .execution_options(synchronize_session=False)).rowcount
+    session.commit()
+    return bool(renewed)
+
+
+def deliver_batch(session, transport, limit: int = None) -> int:
+    """Claim one batch and send it over `transport` (an SmtpSession, or None
+    for dev delivery). Returns the number of messages handled.
+    """
+    batch = claim_batch(session, limit)
+    # read now: after the first commit the rows reload with whatever token
+    # they carry then, which may be another worker's
+    token = batch[0].claim_token if batch else None
+    handled = 0
+    for msg in batch:
+        if not renew_claim(session, msg.id, token):
+            # sends ahead of it outlasted the lease; the new owner delivers it
+            continue
+        handled += 1
+        try:
+            if transport is None:
+                _dev_deliver(msg.to_addr, msg.subject, msg.body)
+            else:
+                transport.send(msg.to_addr, msg.subject, msg.body)
+        except Exception as e:
+            msg.attempts = (msg.attempts or 0) + 1
+            msg.last_error = str(e)[:500]
+            msg.claim_token = None
+            if _is_permanent(e) or msg.attempts >= MAIL_MAX_ATTEMPTS:
+                msg.status = "failed"
+            else:
+                msg.status = "pending"
+                msg.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff_delay(msg.attempts))
+            if transport is not None and not _is_permanent(e):
+                # the connection may be unusable; start the next send fresh
+                transport.close()
+        else:
+            msg.status = "sent"
+            msg.sent_at = datetime.utcnow()
+            msg.attempts = (msg.attempts or 0) + 1
+            msg.claim_token = None
+        # commit per message so a crash never resends what was delivered
+        session.commit()
+    return handled
+
+
+class MailWorker(threading.Thread):
+    """Background sender owning one persistent SMTP session."""
+
+    def __init__(self, app, name="mail-worker"):
+        super().__init__(name=name, daemon=True)
+        self.app = app
+        self.stopping = threading.Event()
+
+    def run(self):
+        settings = smtp_settings()
+        transport = SmtpSession(settings) if settings["host"] else None
+        while not self.stopping.is_set():
+            handled = 0
+            try:
+                with self.app.app_context():
+                    from database import db
+                    try:
+                        handled = deliver_batch(db.session, transport)
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                print("[MAIL WORKER]", e)
+            if handled:
+                continue
+            if transport is not None:
+                transport.close_if_idle()
+            _wake.wait(MAIL_POLL_SECONDS)
+            _wake.clear()
+        if transport is not None:
+            transport.close()
+
+    def stop(self):
+        self.stopping.set()
+        _wake.set()
+
+
+def init_app(app, workers: int = None):
+    """Start the outbox worker pool for `app` (MAIL_WORKERS=0 disables it)."""
+    count = MAIL_WORKERS if workers is None else workers
+    pool = [MailWorker(app, name=f"mail-worker-{i}") for i in range(max(0, count))]
+    for w in pool:
+        w.start()
+    app.extensions["mailer"] = pool
+    return pool
@@ -0,0 +1,219 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# requests slower than this are written to the slow log with their top SQL
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_LOG = os.getenv("SLOW_REQUEST_LOG") or os.path.join(os.path.dirname(__file__), "slow_requests.log")
+SLOW_LOG_TOP_STATEMENTS = 5
+
+slow_log = logging.getLogger("errandbuddy.slow_requests")
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name, self.help, self.labels, self.buckets = name, help_text, labels, buckets
+        self.series = {}
+
+    def observe(self, key, value):
+        entry = self.series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][i] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.series.items()):
+            labels = _labels(self.labels, key)
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {n}')
+            lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name, self.help, self.labels = name, help_text, labels
+        self.series = defaultdict(float)
+
+    def inc(self, key, amount=1.0):
+        self.series[key] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, key)}}} {value:g}")
+        return lines
+
+
+def _labels(names, values):
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{n}="{esc(v)}"' for n, v in zip(names, values))
+
+
+class Registry:
+    """Process-wide metrics; every update takes the lock (request and
+    socket threads all write here).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter("http_requests_total", "HTTP requests by endpoint and status.",
+                                ("endpoint", "method", "status"))
+        self.latency = Histogram("http_request_duration_seconds", "HTTP request latency.",
+                                 ("endpoint", "method"), LATENCY_BUCKETS)
+        self.size = Histogram("http_response_size_bytes", "HTTP response body size.",
+                              ("endpoint",), SIZE_BUCKETS)
+        self.sql_per_request = Histogram("db_statements_per_request", "SQL statements run by one request.",
+                                         ("endpoint",), QUERY_COUNT_BUCKETS)
+        self.sql_count = Counter("db_statements_total", "SQL statements executed.", ("endpoint",))
+        self.sql_seconds = Counter("db_statement_seconds_total", "Time spent executing SQL.", ("endpoint",))
+        self.socket_events = Counter("socketio_events_total", "Socket.IO events handled or emitted.",
+                                     ("event", "direction"))
+
+    def record_request(self, endpoint, method, status, seconds, size, sql_count, sql_seconds):
+        with self.lock:
+            self.requests.inc((endpoint, method, str(status)))
+            self.latency.observe((endpoint, method), seconds)
+            if size is not None:
+                self.size.observe((endpoint,), size)
+            self.sql_per_request.observe((endpoint,), sql_count)
+            self.sql_count.inc((endpoint,), sql_count)
+            self.sql_seconds.inc((endpoint,), sql_seconds)
+
+    def record_background_sql(self, seconds):
+        with self.lock:
+            self.sql_count.inc(("",))
+            self.sql_seconds.inc(("",), seconds)
+
+    def record_socket_event(self, name, direction):
+        with self.lock:
+            self.socket_events.inc((name, direction))
+
+    def render(self) -> str:
+        with self.lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.size, self.sql_per_request,
+                           self.sql_count, self.sql_seconds, self.socket_events):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _request_state():
+    """Per-request collector, or None outside an instrumented HTTP request
+    (background threads, Socket.IO handlers).
+    """
+    if not has_request_context():
+        return None
+    return g.get("_metrics")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_metrics_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    state = _request_state()
+    if state is None:
+        REGISTRY.record_background_sql(elapsed)
+        return
+    state["sql_count"] += 1
+    state["sql_seconds"] += elapsed
+    per_statement = state["statements"].setdefault(statement, [0, 0.0])
+    per_statement[0] += 1
+    per_statement[1] += elapsed
+
+
+def _write_slow_log(method, path, endpoint, status, elapsed, state):
+    top = sorted(state["statements"].items(), key=lambda item: item[1][1], reverse=True)
+    lines = [f"{method} {path} endpoint={endpoint} status={status} "
+             f"{elapsed * 1000:.1f}ms sql={state['sql_count']} ({state['sql_seconds'] * 1000:.1f}ms)"]
+    for statement, (count, seconds) in top[:SLOW_LOG_TOP_STATEMENTS]:
+        lines.append(f"    {count:4d}x {seconds * 1000:8.1f}ms  {' '.join(statement.split())[:300]}")
+    slow_log.warning("\n".join(lines))
+
+
+def _count_socket_handlers(socketio):
+    """Wrap every registered Socket.IO handler to count incoming events."""
+    for namespace_handlers in socketio.server.handlers.values():
+        for name, handler in list(namespace_handlers.items()):
+            def counted(*args, _name=name, _handler=handler):
+                REGISTRY.record_socket_event(_name, "in")
+                return _handler(*args)
+            namespace_handlers[name] = counted
+
+    emit = socketio.emit
+
+    def counted_emit(event_name, *args, **kwargs):
+        REGISTRY.record_socket_event(event_name, "out")
+        return emit(event_name, *args, **kwargs)
+    socketio.emit = counted_emit
+
+
+def init_app(app, socketio=None, engine=None):
+    """Install request timing, SQL counting and (when given) Socket.IO
+    event counting. Call after blueprints and socket handlers are registered.
+    """
+    if not slow_log.handlers and SLOW_REQUEST_LOG:
+        handler = logging.FileHandler(SLOW_REQUEST_LOG, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_log.addHandler(handler)
+        slow_log.propagate = False
+
+    if engine is not None:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def _start_timer():
+        g._metrics = {"start": time.perf_counter(), "sql_count": 0, "sql_seconds": 0.0, "statements": {}}
+
+    @app.after_request
+    def _record(response):
+        state = g.get("_metrics")
+        if state is None:
+            return response
+        endpoint = request.endpoint or "<unmatched>"
+        method, path, status = request.method, request.full_path.rstrip("?"), response.status_code
+
+        def finish(size=None):
+            elapsed = time.perf_counter() - state["start"]
+            REGISTRY.record_request(endpoint, method, status, elapsed, size,
+                                    state["sql_count"], state["sql_seconds"])
+            if elapsed * 1000 >= SLOW_REQUEST_MS:
+                _write_slow_log(method, path, endpoint, status, elapsed, state)
+
+        if response.is_streamed:
+            # the body (and its SQL) runs after this hook, under stream_with_context;
+            # record once the server has consumed and closed it
+            response.call_on_close(finish)
+        else:
+            g.pop("_metrics", None)
+            finish(response.calculate_content_length())
+        return response
+
+    if socketio is not None:
+        _count_socket_handlers(socketio)
@@ -0,0 +1,37 @@
+"""Apply pending schema migrations to the configured database.
+
+    python migrate.py             # upgrade to the latest version
+    python migrate.py --to 1      # upgrade up to a given version
+    python migrate.py --status    # show the recorded and latest versions
+"""
+import argparse
+import os
+
+from dotenv import load_dotenv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--to", type=int, default=None, help="stop after this version")
+    parser.add_argument("--status", action="store_true", help="report versions without migrating")
+    args = parser.parse_args()
+
+    # same environment as create_app, without starting the app's background threads
+    load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+    from sqlalchemy import create_engine
+    from config import Config
+    from database import apply_sqlite_pragmas
+    from migrations import LATEST_VERSION, current_version, upgrade
+
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+    apply_sqlite_pragmas(engine, Config)
+    if args.status:
+        print(f"schema version {current_version(engine)} (latest {LATEST_VERSION})")
+        return
+    applied = upgrade(engine, target=args.to)
+    print(f"schema version {current_version(engine)}"
+          + ("" if applied else " (already up to date)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Versioned schema migrations.
+
+Each module in MIGRATIONS has a VERSION and an upgrade(engine) function.
+Applied versions are recorded in the schema_version table. Pending
+migrations run through `python migrate.py`; create_app only compares the
+recorded version with LATEST_VERSION.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, select
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from . import (m0001_baseline, m0002_collection_versions, m0003_change_log, m0004_study_grams,
+               m0005_task_status, m0006_drop_unread_counters)
+
+MIGRATIONS = (m0001_baseline, m0002_collection_versions, m0003_change_log, m0004_study_grams,
+              m0005_task_status, m0006_drop_unread_counters)
+LATEST_VERSION = MIGRATIONS[-1].VERSION
+
+# kept out of db.metadata so create_all/drop_all in tests and scripts leave it alone
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _name(migration) -> str:
+    return migration.__name__.rsplit(".", 1)[-1]
+
+
+def current_version(engine) -> int:
+    """Highest applied version in one query; 0 for an unversioned database."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        return 0
+
+
+def upgrade(engine, target: int = None, log=print) -> list:
+    """Apply pending migrations in order, up to `target` (default latest).
+    Each one is recorded as soon as it finishes. Returns the applied versions.
+    """
+    schema_version.create(engine, checkfirst=True)
+    current = current_version(engine)
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.VERSION <= current or (target is not None and migration.VERSION > target):
+            continue
+        log(f"Applying migration {migration.VERSION:04d} {_name(migration)}")
+        migration.upgrade(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(schema_version).values(
+                version=migration.VERSION, name=_name(migration), applied_at=datetime.utcnow()))
+        applied.append(migration.VERSION)
+    return applied
+
+
+def drop_schema_version(engine):
+    schema_version.drop(engine, checkfirst=True)
@@ -0,0 +1,150 @@
+"""Baseline: bring a database created before versioned migrations up to
+the current schema. Adds the columns older releases lacked, creates missing
+tables and indexes, and runs the one-time backfills. On a new database it
+just creates everything.
+"""
+from sqlalchemy import inspect, text
+
+from database import db
+from migrations.ops import create_indexes, missing_indexes
+
+VERSION = 1
+
+# columns added after the first release, per table (legacy SQLite/MySQL DDL)
+_ADDED_COLUMNS = {
+    "tasks": (
+        ("assignee_id", "INTEGER"),
+        ("status", "VARCHAR(50) DEFAULT 'open'"),
+        # typed task metadata promoted out of the description text
+        ("reward_cents", "INTEGER"),
+        ("deadline_at", "DATETIME"),
+        ("location", "VARCHAR(120)"),
+    ),
+    "messages": (
+        ("task_id", "INTEGER"),
+    ),
+    "users": (
+        ("first_name", "VARCHAR(80) DEFAULT ''"),
+        ("last_name", "VARCHAR(80) DEFAULT ''"),
+        # verification moved from email_otps.verified onto the user
+        ("email_verified", "BOOLEAN NOT NULL DEFAULT 0"),
+    ),
+    "study_sessions": (
+        ("campus", "VARCHAR(30) DEFAULT 'Surrey'"),
+        ("teacher", "VARCHAR(120) DEFAULT ''"),
+        ("description", "TEXT DEFAULT ''"),
+    ),
+    "rides": (
+        ("kind", "VARCHAR(20) DEFAULT 'offer'"),
+        ("description", "TEXT DEFAULT ''"),
+    ),
+}
+
+
+def _backfill_task_details(engine, batch_size=500):
+    """Populate reward_cents/deadline_at/location from legacy description text.
+    Walks the tasks table by primary key in batches so large tables are never
+    loaded at once and each batch commits on its own.
+    """
+    from models.task import parse_task_details
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text("SELECT id, description FROM tasks WHERE id > :last ORDER BY id LIMIT :n"),
+                {"last": last_id, "n": batch_size},
+            ).fetchall()
+            if not rows:
+                break
+            updates = []
+            for task_id, description in rows:
+                d = parse_task_details(description)
+                if any(v is not None for v in d.values()):
+                    updates.append({"id": task_id, **d})
+            if updates:
+                conn.execute(
+                    text("UPDATE tasks SET reward_cents = :reward_cents, deadline_at = :deadline_at, "
+                         "location = :location WHERE id = :id"),
+                    updates,
+                )
+            last_id = rows[-1][0]
+
+
+def _backfill_conversations(engine, batch_size=1000):
+    """Build the conversations table from existing messages.
+    Messages are streamed by primary key in batches; only one entry per thread
+    is kept in memory.
+    """
+    from sqlalchemy import select
+    from models.conversation import Conversation, conversation_key
+    from models.message import Message
+    m = Message.__table__.c
+    threads = {}
+    last_id = 0
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(m.id, m.sender_id, m.receiver_id, m.task_id, m.timestamp)
+                .where(m.id > last_id, m.receiver_id.isnot(None))
+                .order_by(m.id)
+                .limit(batch_size)
+            ).fetchall()
+        if not rows:
+            break
+        for msg_id, sender_id, receiver_id, task_id, ts in rows:
+            key = conversation_key(sender_id, receiver_id, task_id)
+            low, high = sorted((int(sender_id), int(receiver_id)))
+            threads[key] = {
+                "key": key, "kind": "task" if task_id else "dm",
+                "user_a_id": low, "user_b_id": high, "task_id": task_id,
+                "last_message_id": msg_id, "updated_at": ts,
+            }
+        last_id = rows[-1][0]
+    if threads:
+        values = list(threads.values())
+        with engine.begin() as conn:
+            for i in range(0, len(values), batch_size):
+                conn.execute(Conversation.__table__.insert(), values[i:i + batch_size])
+
+
+def _backfill_email_verified(engine, has_otps):
+    # users without a pending (unverified) code could already log in
+    stmt = "UPDATE users SET email_verified = 1"
+    if has_otps:
+        stmt += " WHERE id NOT IN (SELECT user_id FROM email_otps WHERE COALESCE(verified, 0) = 0)"
+    with engine.begin() as conn:
+        conn.execute(text(stmt))
+
+
+def upgrade(engine):
+    import models  # noqa: F401  (register every table on db.metadata)
+    insp = inspect(engine)
+    existing = set(insp.get_table_names())
+
+    added = set()
+    with engine.begin() as conn:
+        for table, columns in _ADDED_COLUMNS.items():
+            if table not in existing:
+                continue
+            have = {c["name"] for c in insp.get_columns(table)}
+            for name, ddl in columns:
+                if name not in have:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                    added.add((table, name))
+
+    # tables introduced since the database was made, with their indexes
+    db.metadata.create_all(engine)
+    # composite indexes (task feed, chat lookups, OTP expiry) on older tables
+    create_indexes(engine, missing_indexes(engine, existing))
+
+    if ("tasks", "location") in added:
+        _backfill_task_details(engine)
+    if ("users", "email_verified") in added:
+        _backfill_email_verified(engine, "email_otps" in existing)
+    # materialized conversation list, built from messages once
+    if "messages" in existing and "conversations" not in existing:
+        _backfill_conversations(engine)
+    # search index over tasks and study sessions, built once
+    if "tasks" in existing and "search_documents" not in existing:
+        from search import rebuild_search_index
+        rebuild_search_index(engine)
@@ -0,0 +1,9 @@
+"""Add the collection_versions table behind the ETags on list endpoints.
+Collections start unversioned; each gets its row on the first write.
+"""
+VERSION = 2
+
+
+def upgrade(engine):
+    from models.collection_version import CollectionVersion
+    CollectionVersion.__table__.create(engine, checkfirst=True)
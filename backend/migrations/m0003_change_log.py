@@ -0,0 +1,31 @@
+"""Add change_log for GET /sync and seed it with one entry per existing
+task, ride, study session and message, so a client's first sync sees
+everything. Each table is copied with a single INSERT ... SELECT in id
+order.
+"""
+from sqlalchemy import func, insert, literal, null, select
+
+VERSION = 3
+
+
+def upgrade(engine):
+    from models.change_log import ChangeLogEntry
+    from models.message import Message
+    from models.ride import Ride
+    from models.study_session import StudySession
+    from models.task import Task
+
+    log = ChangeLogEntry.__table__
+    log.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(log)).scalar():
+            return
+        sources = (
+            ("task", Task, null(), null()),
+            ("ride", Ride, null(), null()),
+            ("study", StudySession, null(), null()),
+            ("message", Message, Message.sender_id, Message.receiver_id),
+        )
+        for kind, model, audience_a, audience_b in sources:
+            rows = select(literal(kind), model.id, literal(False), audience_a, audience_b).order_by(model.id)
+            conn.execute(insert(log).from_select(["kind", "ref_id", "deleted", "audience_a", "audience_b"], rows))
@@ -0,0 +1,29 @@
+"""Index study session courses as trigrams on FTS5 databases too, for the
+substring filter of GET /study?q=. Only documents without postings are
+reindexed, in batches.
+"""
+from sqlalchemy import exists, select
+
+VERSION = 4
+BATCH_SIZE = 500
+
+
+def upgrade(engine):
+    from models.search import SearchDocument, SearchGram
+    from search import SUBSTRING_KINDS, index_documents
+
+    d = SearchDocument.__table__.c
+    g = SearchGram.__table__.c
+    for kind in SUBSTRING_KINDS:
+        last_id = 0
+        while True:
+            with engine.begin() as conn:
+                docs = conn.execute(
+                    select(d.ref_id, d.title, d.body)
+                    .where(d.kind == kind, d.ref_id > last_id, ~exists().where(g.doc_id == d.id))
+                    .order_by(d.ref_id).limit(BATCH_SIZE)
+                ).fetchall()
+                if not docs:
+                    break
+                index_documents(conn, kind, [tuple(r) for r in docs])
+                last_id = docs[-1][0]
@@ -0,0 +1,28 @@
+"""Give legacy tasks with a NULL or empty status the status 'open'. The
+client used to read those as open, and GET /tasks?status=open matches the
+column exactly. Rows are fixed in batches by primary key. The bulk UPDATE
+skips the ORM hooks, so each batch also writes its change-log entries and
+the task feed's ETag counter.
+"""
+from sqlalchemy import or_, select, update
+
+VERSION = 5
+BATCH_SIZE = 500
+
+
+def upgrade(engine):
+    from changelog import lock_log, log_changes
+    from models.task import Task
+    from versions import bump_versions
+
+    tasks = Task.__table__
+    unset = or_(tasks.c.status.is_(None), tasks.c.status == "")
+    while True:
+        with engine.begin() as conn:
+            lock_log(conn)
+            ids = conn.execute(select(tasks.c.id).where(unset).order_by(tasks.c.id).limit(BATCH_SIZE)).scalars().all()
+            if not ids:
+                break
+            conn.execute(update(tasks).where(tasks.c.id.in_(ids)).values(status="open"))
+            log_changes(conn, "task", [(task_id, False, None, None) for task_id in ids])
+            bump_versions(conn, ["tasks"])
@@ -0,0 +1,17 @@
+"""Drop conversations.unread_a/unread_b. Unread counts are derived from the
+read cursors, so nothing reads the counters any more. Databases created
+after the columns left the model never had them.
+"""
+from sqlalchemy import inspect
+
+VERSION = 6
+COLUMNS = ("unread_a", "unread_b")
+
+
+def upgrade(engine):
+    have = {c["name"] for c in inspect(engine).get_columns("conversations")}
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        for column in COLUMNS:
+            if column in have:
+                conn.exec_driver_sql(f"ALTER TABLE conversations DROP COLUMN {quote(column)}")
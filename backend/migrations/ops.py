@@ -0,0 +1,53 @@
+"""Schema operations shared by migration scripts."""
+from sqlalchemy import inspect
+
+from database import db
+
+
+def missing_indexes(engine, tables) -> list:
+    """Indexes declared on the models for `tables` that the database lacks."""
+    insp = inspect(engine)
+    missing = []
+    for name in sorted(tables):
+        table = db.metadata.tables.get(name)
+        if table is None:
+            continue
+        have = {i["name"] for i in insp.get_indexes(name)}
+        missing.extend(i for i in sorted(table.indexes, key=lambda i: i.name) if i.name not in have)
+    return missing
+
+
+def create_indexes(engine, indexes):
+    """Build indexes on existing (possibly large) tables as cheaply as the
+    backend allows. PostgreSQL builds each one CONCURRENTLY outside a
+    transaction so writes are not blocked. MySQL adds all of a table's
+    indexes in one online ALTER, so the table is scanned once. SQLite has
+    neither and builds them all in a single transaction.
+    """
+    if not indexes:
+        return
+    dialect = engine.dialect.name
+    quote = engine.dialect.identifier_preparer.quote
+
+    def columns(idx):
+        return ", ".join(quote(c.name) for c in idx.columns)
+
+    if dialect == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for idx in indexes:
+                unique = "UNIQUE " if idx.unique else ""
+                conn.exec_driver_sql(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {quote(idx.name)} "
+                                     f"ON {quote(idx.table.name)} ({columns(idx)})")
+    elif dialect in ("mysql", "mariadb"):
+        by_table = {}
+        for idx in indexes:
+            by_table.setdefault(idx.table.name, []).append(idx)
+        with engine.begin() as conn:
+            for table, group in by_table.items():
+                adds = ", ".join(f"ADD {'UNIQUE ' if idx.unique else ''}INDEX {quote(idx.name)} ({columns(idx)})"
+                                 for idx in group)
+                conn.exec_driver_sql(f"ALTER TABLE {quote(table)} {adds}, ALGORITHM=INPLACE, LOCK=NONE")
+    else:
+        with engine.begin() as conn:
+            for idx in indexes:
+                idx.create(conn)
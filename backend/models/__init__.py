@@ -3,4 +3,11 @@ from .user import User
 from .task import Task
 from .message import Message
 from .ride import Ride
+from .study_session import StudySession
 from .email_otp import EmailOTP
+from .conversation import Conversation
+from .read_cursor import ChatReadCursor
+from .search import SearchDocument, SearchGram
+from .outbound_email import OutboundEmail
+from .collection_version import CollectionVersion
+from .change_log import ChangeLogEntry
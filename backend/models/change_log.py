@@ -0,0 +1,23 @@
+from database import db
+
+
+class ChangeLogEntry(db.Model):
+    """Latest change to one synced row, written by the ORM hook in
+    changelog.py. Each (kind, ref_id) keeps a single entry that moves to a
+    new seq on every write, so the table is a compacted log: GET /sync
+    replays the entries after a client's seq, deleted ones as tombstones.
+    audience_a/audience_b name the only users who may see the row (message
+    participants); both are NULL for public rows.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        db.UniqueConstraint("kind", "ref_id", name="uq_change_log_kind_ref"),
+        # never reuse a seq: a client's token must not point at a later change
+        {"sqlite_autoincrement": True},
+    )
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    kind = db.Column(db.String(10), nullable=False)  # task, ride, study, message
+    ref_id = db.Column(db.Integer, nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+    audience_a = db.Column(db.Integer)
+    audience_b = db.Column(db.Integer)
@@ -0,0 +1,11 @@
+from database import db
+
+
+class CollectionVersion(db.Model):
+    """Generation counter for one cacheable collection ("tasks", "chat:7",
+    ...), bumped by the ORM hook in versions.py whenever a write touches it.
+    GET endpoints derive their ETag from these rows instead of the data.
+    """
+    __tablename__ = "collection_versions"
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
@@ -0,0 +1,33 @@
+from datetime import datetime
+from database import db
+
+
+def conversation_key(sender_id, receiver_id, task_id=None) -> str:
+    """Stable identifier for a thread: "task:<id>" or "dm:<low id>:<high id>"."""
+    if task_id:
+        return f"task:{task_id}"
+    low, high = sorted((int(sender_id), int(receiver_id)))
+    return f"dm:{low}:{high}"
+
+
+class Conversation(db.Model):
+    """One row per DM or task thread, maintained by the chat write paths so the
+    overview is a single indexed read instead of a scan over messages.
+    Participants are stored ordered (user_a_id < user_b_id).
+    """
+    __tablename__ = "conversations"
+    __table_args__ = (
+        db.Index("ix_conversations_user_a_updated", "user_a_id", "updated_at"),
+        db.Index("ix_conversations_user_b_updated", "user_b_id", "updated_at"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), unique=True, nullable=False)
+    kind = db.Column(db.String(10), nullable=False, default="dm")  # dm, task
+    user_a_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_b_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey("tasks.id"), nullable=True)
+    last_message_id = db.Column(db.Integer, db.ForeignKey("messages.id"), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def other_id(self, user_id: int) -> int:
+        return self.user_b_id if user_id == self.user_a_id else self.user_a_id
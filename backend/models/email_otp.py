@@ -7,7 +7,8 @@ class EmailOTP(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), unique=True, nullable=False)
     code_hash = db.Column(db.String(200), nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    # indexed for the purge of expired codes
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     attempts = db.Column(db.Integer, default=0)
     verified = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
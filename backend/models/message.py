@@ -4,6 +4,13 @@ from sqlalchemy import Integer, ForeignKey
 
 class Message(db.Model):
     __tablename__ = "messages"
+    # DM lookups filter on one (sender, receiver) pair per OR branch; task
+    # threads filter on task_id. All are ordered by timestamp.
+    __table_args__ = (
+        db.Index("ix_messages_sender_receiver_ts", "sender_id", "receiver_id", "timestamp"),
+        db.Index("ix_messages_receiver_sender_ts", "receiver_id", "sender_id", "timestamp"),
+        db.Index("ix_messages_task_ts", "task_id", "timestamp"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     receiver_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
@@ -0,0 +1,27 @@
+from datetime import datetime
+from database import db
+
+
+class OutboundEmail(db.Model):
+    """Transactional outbox for mail: rows are written with the request's
+    other changes and delivered later by the mailer worker pool.
+    Status moves pending -> sending -> sent, or back to pending with a later
+    next_attempt_at after a temporary failure, or to failed.
+    """
+    __tablename__ = "outbound_emails"
+    __table_args__ = (
+        db.Index("ix_outbound_emails_status_next", "status", "next_attempt_at"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    to_addr = db.Column(db.String(200), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # set while a worker holds the row; stale claims are picked up again
+    claim_token = db.Column(db.String(32), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
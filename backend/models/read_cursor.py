@@ -0,0 +1,17 @@
+from datetime import datetime
+from database import db
+
+
+class ChatReadCursor(db.Model):
+    """Highest message id a user has read in a conversation (keyed like
+    Conversation.key); unread counts are messages received after it.
+    """
+    __tablename__ = "chat_read_cursors"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "conversation_key", name="uq_chat_read_cursors_user_key"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    conversation_key = db.Column(db.String(64), nullable=False)
+    last_read_message_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,5 +1,23 @@
 from datetime import datetime
+from itertools import product
 from database import db
+from models.task import KNOWN_LOCATIONS, normalize_location
+
+RIDE_KINDS = ("offer", "request")
+# areas outside the known campuses share one topic
+OTHER_AREA = "other"
+
+
+def ride_area(text):
+    """Campus area a free-text origin/destination belongs to."""
+    loc = normalize_location(text)
+    return loc.lower() if loc in KNOWN_LOCATIONS else OTHER_AREA
+
+
+def ride_topic(kind=None, origin=None, destination=None):
+    """Socket room for a ride feed filter; None/"*" means any value."""
+    parts = [(v or "*").strip().lower() for v in (kind, origin, destination)]
+    return "rides:" + ":".join(parts)
 
 class Ride(db.Model):
     __tablename__ = "rides"
@@ -23,4 +41,12 @@ class Ride(db.Model):
             "kind": self.kind,
             "description": self.description,
             "created_at": self.created_at.isoformat(),
+            "origin_area": ride_area(self.origin),
+            "destination_area": ride_area(self.destination),
         }
+
+    def topics(self):
+        """Every feed room this ride matches, from exact to catch-all."""
+        kind = (self.kind or "offer").lower()
+        return [ride_topic(k, o, d) for k, o, d in product(
+            (kind, "*"), (ride_area(self.origin), "*"), (ride_area(self.destination), "*"))]
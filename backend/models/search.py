@@ -0,0 +1,61 @@
+from sqlalchemy import DDL, event
+from database import db
+
+
+class SearchDocument(db.Model):
+    """Searchable text for one task or study session, kept in sync by the ORM
+    hooks in search.py. On SQLite an FTS5 table mirrors it through triggers;
+    elsewhere search falls back to the SearchGram trigram postings.
+    """
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        db.UniqueConstraint("kind", "ref_id", name="uq_search_documents_kind_ref"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # task, study
+    ref_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(200), default="")
+    body = db.Column(db.Text, default="")
+
+
+class SearchGram(db.Model):
+    """Trigram posting list for the portable search backend; weight is higher
+    for grams taken from the title.
+    """
+    __tablename__ = "search_grams"
+    gram = db.Column(db.String(3), primary_key=True)
+    doc_id = db.Column(db.Integer, db.ForeignKey("search_documents.id"), primary_key=True)
+    weight = db.Column(db.Integer, nullable=False, default=1)
+
+
+_FTS_DDL = (
+    # external-content FTS5 table: the text lives in search_documents only
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "kind, title, body, content='search_documents', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_fts(rowid, kind, title, body) VALUES (new.id, new.kind, new.title, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, kind, title, body) "
+    "VALUES ('delete', old.id, old.kind, old.title, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, kind, title, body) "
+    "VALUES ('delete', old.id, old.kind, old.title, old.body); "
+    "INSERT INTO search_fts(rowid, kind, title, body) VALUES (new.id, new.kind, new.title, new.body); END",
+)
+
+
+def _fts5_available(ddl, target, bind, **kw):
+    if bind.dialect.name != "sqlite":
+        return False
+    try:
+        bind.exec_driver_sql("CREATE VIRTUAL TABLE temp.search_fts_probe USING fts5(x)")
+        bind.exec_driver_sql("DROP TABLE temp.search_fts_probe")
+        return True
+    except Exception:
+        return False
+
+
+for _stmt in _FTS_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(_stmt).execute_if(callable_=_fts5_available))
+event.listen(SearchDocument.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS search_fts").execute_if(dialect="sqlite"))
@@ -1,8 +1,98 @@
+import re
 from datetime import datetime
 from database import db
 
+# Campus names offered by the app; free-text locations are normalized to these
+KNOWN_LOCATIONS = ("Surrey", "Langley", "Richmond")
+DEADLINE_FORMATS = (
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d %H:%M",
+    "%Y/%m/%d",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+    "%b %d %Y",
+    "%B %d %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+)
+# "1,250.50" (comma thousands groups) or "12.5" / "12,50" (a comma is a
+# decimal point only with 1-2 digits after it and no more digits following)
+_AMOUNT_RE = re.compile(r"(?:(?P<grouped>\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?)"
+                        r"|(?P<plain>\d+(?:[.,]\d{1,2})?))(?!\d)")
+
+
+def parse_reward_cents(text):
+    """Return the first amount in `text` as integer cents, or None."""
+    m = _AMOUNT_RE.search(str(text or ""))
+    if not m:
+        return None
+    if m.group("grouped"):
+        amount = m.group("grouped").replace(",", "")
+    else:
+        amount = m.group("plain").replace(",", ".")
+    return int(round(float(amount) * 100))
+
+
+def parse_deadline(text):
+    """Parse a deadline string in one of DEADLINE_FORMATS (or ISO 8601); None if unparseable."""
+    text = str(text or "").strip()
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in DEADLINE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_location(text):
+    text = str(text or "").strip()
+    if not text:
+        return None
+    for name in KNOWN_LOCATIONS:
+        if name.lower() in text.lower():
+            return name
+    return text[:120]
+
+
+def parse_task_details(description):
+    """Extract typed metadata from legacy "Reward: … | Deadline: … | Location: …" text.
+    Returns a dict with reward_cents, deadline_at and location (any may be None).
+    """
+    details = {"reward_cents": None, "deadline_at": None, "location": None}
+    if not description:
+        return details
+    for part in str(description).replace("\n", " | ").split("|"):
+        part = part.strip()
+        low = part.lower()
+        value = part.split(":", 1)[1].strip() if ":" in part else ""
+        if low.startswith("reward:"):
+            details["reward_cents"] = parse_reward_cents(value)
+        elif low.startswith("deadline:"):
+            details["deadline_at"] = parse_deadline(value)
+        elif low.startswith("location:"):
+            details["location"] = normalize_location(value)
+    return details
+
+
 class Task(db.Model):
     __tablename__ = "tasks"
+    # Composite indexes backing the keyset-paginated feed in GET /tasks:
+    # each filter column leads, followed by the (created_at, id) sort key.
+    __table_args__ = (
+        db.Index("ix_tasks_created_id", "created_at", "id"),
+        db.Index("ix_tasks_status_created_id", "status", "created_at", "id"),
+        db.Index("ix_tasks_user_created_id", "user_id", "created_at", "id"),
+        db.Index("ix_tasks_assignee_created_id", "assignee_id", "created_at", "id"),
+        db.Index("ix_tasks_location_created_id", "location", "created_at", "id"),
+        db.Index("ix_tasks_deadline_id", "deadline_at", "id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.String(1000))
@@ -10,6 +100,10 @@ class Task(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     # user who accepted to perform the task (nullable until accepted)
     assignee_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    # typed metadata (previously embedded in the description text)
+    reward_cents = db.Column(db.Integer, nullable=True)
+    deadline_at = db.Column(db.DateTime, nullable=True)
+    location = db.Column(db.String(120), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
@@ -20,5 +114,8 @@ class Task(db.Model):
             "status": self.status,
             "user_id": self.user_id,
             "assignee_id": self.assignee_id,
+            "reward_cents": self.reward_cents,
+            "deadline_at": self.deadline_at.isoformat() if self.deadline_at else None,
+            "location": self.location,
             "created_at": self.created_at.isoformat(),
         }
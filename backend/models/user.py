@@ -11,6 +11,8 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
     bio = db.Column(db.String(300), default="")
+    # set once the registration OTP is confirmed; login requires it
+    email_verified = db.Column(db.Boolean, nullable=False, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Tasks created by this user
@@ -31,3 +33,12 @@ class User(db.Model):
             "bio": self.bio,
             "created_at": self.created_at.isoformat(),
         }
+
+    def to_public_dict(self):
+        """What other users may see: enough to show a name, no contact details."""
+        return {
+            "id": self.id,
+            "username": self.username,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+        }
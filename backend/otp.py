@@ -0,0 +1,114 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select
+from werkzeug.security import check_password_hash
+
+OTP_TTL_MINUTES = 10
+OTP_MAX_ATTEMPTS = 5
+# how often the purge thread deletes expired codes (0 disables it)
+OTP_PURGE_SECONDS = float(os.getenv("OTP_PURGE_SECONDS", "600"))
+OTP_PURGE_BATCH = 1000
+
+# codes are six random digits, so a keyed digest is enough: brute force is
+# bounded by OTP_MAX_ATTEMPTS and the expiry, not by hashing cost
+_PREFIX = "hmac-sha256$"
+
+
+def _key() -> bytes:
+    secret = current_app.config.get("OTP_SECRET") or current_app.config["SECRET_KEY"]
+    return secret.encode()
+
+
+def generate_code() -> str:
+    return f"{secrets.randbelow(1000000):06d}"
+
+
+def hash_code(user_id: int, code: str) -> str:
+    """Keyed digest of a code, bound to the user it was issued to."""
+    digest = hmac.new(_key(), f"{user_id}:{code}".encode(), hashlib.sha256).hexdigest()
+    return _PREFIX + digest
+
+
+def check_code(user_id: int, code_hash: str, code: str) -> bool:
+    """Constant-time check; codes issued before the switch still carry a
+    werkzeug password hash and are checked the old way until they expire.
+    """
+    if not code_hash.startswith(_PREFIX):
+        return check_password_hash(code_hash, code)
+    return hmac.compare_digest(code_hash, hash_code(user_id, code))
+
+
+def issue_otp(session, user) -> str:
+    """Create or replace the user's pending code and return it in clear for
+    the email. The caller commits.
+    """
+    from models.email_otp import EmailOTP
+    code = generate_code()
+    code_hash = hash_code(user.id, code)
+    expires = datetime.utcnow() + timedelta(minutes=OTP_TTL_MINUTES)
+    otp = session.query(EmailOTP).filter_by(user_id=user.id).first()
+    if not otp:
+        session.add(EmailOTP(user_id=user.id, code_hash=code_hash, expires_at=expires, attempts=0))
+    else:
+        otp.code_hash = code_hash
+        otp.expires_at = expires
+        otp.attempts = 0
+        otp.verified = False
+    return code
+
+
+def purge_expired(session, batch_size: int = OTP_PURGE_BATCH) -> int:
+    """Delete expired codes in batches through ix_email_otps_expires_at.
+    Returns the number of rows removed.
+    """
+    from models.email_otp import EmailOTP
+    total = 0
+    while True:
+        ids = select(EmailOTP.id).where(EmailOTP.expires_at < datetime.utcnow()).limit(batch_size)
+        removed = session.execute(delete(EmailOTP).where(EmailOTP.id.in_(ids))
+                                  .execution_options(synchronize_session=False)).rowcount
+        session.commit()
+        total += removed
+        if removed < batch_size:
+            return total
+
+
+class OtpPurger(threading.Thread):
+    """Background thread running purge_expired every `interval` seconds."""
+
+    def __init__(self, app, interval: float):
+        super().__init__(name="otp-purger", daemon=True)
+        self.app = app
+        self.interval = interval
+        self.stopping = threading.Event()
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    from database import db
+                    try:
+                        purge_expired(db.session)
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                print("[OTP PURGE]", e)
+
+    def stop(self):
+        self.stopping.set()
+
+
+def init_app(app, interval: float = None):
+    """Start the expired-code purge thread for `app` (OTP_PURGE_SECONDS=0 disables it)."""
+    interval = OTP_PURGE_SECONDS if interval is None else interval
+    purger = OtpPurger(app, interval) if interval > 0 else None
+    if purger is not None:
+        purger.start()
+    app.extensions["otp_purger"] = purger
+    return purger
@@ -0,0 +1,39 @@
+"""Keyset (cursor) pagination shared by the task feed, /overview and /admin/tasks.
+
+A cursor is the opaque, url-safe encoding of the (sort value, id) of the
+last row on a page; the next page starts strictly after it.
+"""
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    raw = f"{sort_value.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (sort_value, id) from an opaque cursor; raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        ts, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def clamp_limit(limit, default: int, maximum: int) -> int:
+    return max(1, min(limit or default, maximum))
+
+
+def after_cursor(query, sort_column, id_column, cursor: str, descending: bool = True):
+    """Restrict `query` (a Query or select()) to rows after `cursor` in
+    (sort_column, id_column) order. Raises ValueError for a malformed cursor.
+    """
+    value, row_id = decode_cursor(cursor)
+    if descending:
+        return query.where(or_(sort_column < value, and_(sort_column == value, id_column < row_id)))
+    return query.where(or_(sort_column > value, and_(sort_column == value, id_column > row_id)))
@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# werkzeug method string for new hashes; stored hashes with another method
+# are upgraded on the next successful login
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+# KDF processes (0 hashes inline on the request thread, e.g. in tests)
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+# hashes queued or running before new requests are turned away with 503
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", str(max(1, PASSWORD_WORKERS) * 8)))
+# a request gives up waiting for its hash after this long
+PASSWORD_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_TIMEOUT_SECONDS", "10"))
+
+_lock = threading.Lock()
+_pending = 0
+_pool = None
+_method_prefix = None
+
+
+class PasswordPoolBusy(Exception):
+    """The hashing queue is full (or a hash timed out); retry later."""
+
+
+def _executor():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # spawn, not fork: the server process runs socket and mail threads
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _release(*_):
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def _run(fn, *args):
+    global _pending
+    with _lock:
+        if _pending >= PASSWORD_MAX_PENDING:
+            raise PasswordPoolBusy()
+        _pending += 1
+    if PASSWORD_WORKERS <= 0:
+        try:
+            return fn(*args)
+        finally:
+            _release()
+    try:
+        future = _executor().submit(fn, *args)
+    except BaseException:
+        _release()
+        raise
+    # the slot is freed when the hash finishes, not when a timed-out request
+    # stops waiting for it: the job still occupies a worker until then
+    future.add_done_callback(_release)
+    try:
+        return future.result(timeout=PASSWORD_TIMEOUT_SECONDS)
+    except FutureTimeout:
+        raise PasswordPoolBusy()
+
+
+def hash_password(password: str) -> str:
+    """Hash with PASSWORD_HASH_METHOD in the KDF pool. Raises PasswordPoolBusy."""
+    return _run(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """Check a password in the KDF pool. Raises PasswordPoolBusy."""
+    return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """True when a stored hash was made with different KDF parameters."""
+    global _method_prefix
+    if _method_prefix is None:
+        # werkzeug fills in defaults (e.g. pbkdf2 iterations), so compare
+        # against what the configured method actually writes
+        _method_prefix = generate_password_hash("", PASSWORD_HASH_METHOD).split("$", 1)[0]
+    return password_hash.split("$", 1)[0] != _method_prefix
+
+
+def shutdown():
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
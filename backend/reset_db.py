@@ -1,12 +1,14 @@
 from app import create_app
 from database import db
+from migrations import drop_schema_version, upgrade
 
 
 def reset_all():
     app, _ = create_app()
     with app.app_context():
         db.drop_all()
-        db.create_all()
+        drop_schema_version(db.engine)
+        upgrade(db.engine)
         print("Database reset: dropped and recreated all tables.")
 
 
@@ -1,16 +1,22 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
 from database import db
 from models.user import User
 from models.email_otp import EmailOTP
 from flask_jwt_extended import create_access_token
-import secrets
 
-from mailer import send_email
+from mailer import enqueue_email
+from otp import OTP_MAX_ATTEMPTS, check_code, issue_otp
+from passwords import PasswordPoolBusy, hash_password, needs_rehash, verify_password
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
+
+def _busy():
+    resp = jsonify({"msg": "Server busy, please try again shortly."})
+    resp.headers["Retry-After"] = "2"
+    return resp, 503
+
+
 @bp.route("/register", methods=["POST"])
 def register():
     data = request.get_json() or {}
@@ -37,35 +43,27 @@ def register():
         return jsonify({"msg": "Email already registered"}), 409
 
     # Create the user record (unverified until OTP check passes)
-    hashed_pw = generate_password_hash(password)
+    try:
+        hashed_pw = hash_password(password)
+    except PasswordPoolBusy:
+        return _busy()
     user = User(username=username, first_name=first_name, last_name=last_name, email=email, password_hash=hashed_pw)
     db.session.add(user)
     db.session.commit()
 
-    # Generate a 6-digit OTP and store hash with 10-minute expiry
-    otp_code = f"{secrets.randbelow(1000000):06d}"
-    otp_hash = generate_password_hash(otp_code)
-    expires = datetime.utcnow() + timedelta(minutes=10)
-    # Upsert single active OTP per user
-    otp = EmailOTP.query.filter_by(user_id=user.id).first()
-    if not otp:
-        otp = EmailOTP(user_id=user.id, code_hash=otp_hash, expires_at=expires)
-        db.session.add(otp)
-    else:
-        otp.code_hash = otp_hash
-        otp.expires_at = expires
-        otp.attempts = 0
-        otp.verified = False
-    db.session.commit()
+    # 6-digit OTP, stored as a keyed digest with a 10-minute expiry
+    otp_code = issue_otp(db.session, user)
 
-    # Send OTP via email (or print to console in dev)
+    # Queue the OTP email in the same transaction; the mailer workers send it
+    # (or print it to the console in dev) after the response is returned
     subject = "ErrandBuddy Email Verification"
     body = (
         f"Hi {username},\n\n"
         f"Your verification code is: {otp_code}\n\n"
         f"This code expires in 10 minutes. If you did not request this, you can ignore this email.\n"
     )
-    send_email(user.email, subject, body)
+    enqueue_email(user.email, subject, body)
+    db.session.commit()
 
     return jsonify({
         "msg": "Verification code sent to your email.",
@@ -81,14 +79,24 @@ def login():
         return jsonify({"msg": "Missing credentials"}), 400
 
     user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.password_hash, password):
-        return jsonify({"msg": "Invalid credentials"}), 401
+    try:
+        if not user or not verify_password(user.password_hash, password):
+            return jsonify({"msg": "Invalid credentials"}), 401
+    except PasswordPoolBusy:
+        return _busy()
 
     # Require verified email via OTP before issuing tokens
-    otp = EmailOTP.query.filter_by(user_id=user.id).first()
-    if otp and not otp.verified:
+    if not user.email_verified:
         return jsonify({"msg": "Email not verified. Please enter the OTP sent to your email."}), 403
 
+    # upgrade hashes made with older KDF parameters while we have the password
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hash_password(password)
+            db.session.commit()
+        except PasswordPoolBusy:
+            pass
+
     # JWT 'sub' (subject) must be a string; store user id as string
     token = create_access_token(identity=str(user.id))
     return jsonify({"msg": "Login success", "user": user.to_dict(), "token": token}), 200
@@ -104,24 +112,25 @@ def verify_otp():
     user = User.query.filter_by(email=email).first()
     if not user:
         return jsonify({"msg": "User not found"}), 404
+    if user.email_verified:
+        return jsonify({"msg": "Email already verified"}), 200
     otp = EmailOTP.query.filter_by(user_id=user.id).first()
     if not otp:
-        return jsonify({"msg": "No OTP request found. Please register again."}), 400
-    if otp.verified:
-        return jsonify({"msg": "Email already verified"}), 200
+        return jsonify({"msg": "No OTP request found. Please request a new code."}), 400
     if otp.is_expired():
         return jsonify({"msg": "OTP expired. Please request a new code."}), 400
     # rate-limit attempts (basic)
-    if otp.attempts is not None and otp.attempts >= 5:
+    if otp.attempts is not None and otp.attempts >= OTP_MAX_ATTEMPTS:
         return jsonify({"msg": "Too many attempts. Please request a new code."}), 429
     # verify code
-    ok = check_password_hash(otp.code_hash, str(code).strip())
+    ok = check_code(user.id, otp.code_hash, str(code).strip())
     otp.attempts = (otp.attempts or 0) + 1
     if not ok:
         db.session.commit()
         return jsonify({"msg": "Invalid code"}), 401
-    # success
-    otp.verified = True
+    # success: the code has served its purpose
+    user.email_verified = True
+    db.session.delete(otp)
     db.session.commit()
     return jsonify({"msg": "Email verified successfully"}), 200
 
@@ -135,27 +144,16 @@ def resend_otp():
     user = User.query.filter_by(email=email).first()
     if not user:
         return jsonify({"msg": "User not found"}), 404
-    otp = EmailOTP.query.filter_by(user_id=user.id).first()
-    if otp and otp.verified:
+    if user.email_verified:
         return jsonify({"msg": "Email already verified"}), 200
     # generate new code
-    otp_code = f"{secrets.randbelow(1000000):06d}"
-    otp_hash = generate_password_hash(otp_code)
-    expires = datetime.utcnow() + timedelta(minutes=10)
-    if not otp:
-        otp = EmailOTP(user_id=user.id, code_hash=otp_hash, expires_at=expires)
-        db.session.add(otp)
-    else:
-        otp.code_hash = otp_hash
-        otp.expires_at = expires
-        otp.attempts = 0
-        otp.verified = False
-    db.session.commit()
+    otp_code = issue_otp(db.session, user)
     subject = "ErrandBuddy Email Verification (Resent)"
     body = (
         f"Hi {user.username},\n\n"
         f"Your verification code is: {otp_code}\n\n"
         f"This code expires in 10 minutes."
     )
-    send_email(user.email, subject, body)
+    enqueue_email(user.email, subject, body)
+    db.session.commit()
     return jsonify({"msg": "A new verification code has been sent."}), 200
@@ -1,20 +1,116 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.exc import IntegrityError
 from database import db
 from models.message import Message
+from models.conversation import Conversation, conversation_key
+from models.read_cursor import ChatReadCursor
 from models.user import User
 from models.task import Task
+from sockets.chat_events import publish_chat_message
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from versions import conditional
 
 bp = Blueprint("chat", __name__, url_prefix="/chat")
 
+DEFAULT_MESSAGE_PAGE = 50
+MAX_MESSAGE_PAGE = 200
+DEFAULT_OVERVIEW_LIMIT = 200
+MAX_OVERVIEW_LIMIT = 500
+
+
+def _record_conversation(msg: Message) -> Conversation:
+    """Upsert the thread row for a just-flushed message: bump last message and
+    updated_at. Unread counts are derived from read cursors (_unread_counts).
+    """
+    key = conversation_key(msg.sender_id, msg.receiver_id, msg.task_id)
+    conv = Conversation.query.filter_by(key=key).first()
+    if conv is None:
+        low, high = sorted((int(msg.sender_id), int(msg.receiver_id)))
+        conv = Conversation(key=key, kind="task" if msg.task_id else "dm",
+                            user_a_id=low, user_b_id=high, task_id=msg.task_id)
+        try:
+            with db.session.begin_nested():
+                db.session.add(conv)
+        except IntegrityError:
+            # created concurrently by the other participant
+            conv = Conversation.query.filter_by(key=key).one()
+    conv.last_message_id = msg.id
+    conv.updated_at = msg.timestamp
+    return conv
+
+
+def _unread_counts(user_id: int, conv_ids: list) -> dict:
+    """Exact unread counts per conversation id: messages received after the
+    user's read cursor. One grouped query that probes messages through the
+    (receiver_id, sender_id, timestamp) index for each thread.
+    """
+    if not conv_ids:
+        return {}
+    other = case((Conversation.user_a_id == user_id, Conversation.user_b_id), else_=Conversation.user_a_id)
+    same_thread = or_(
+        Message.task_id == Conversation.task_id,
+        and_(Conversation.task_id.is_(None), Message.task_id.is_(None)),
+    )
+    rows = (
+        db.session.query(Conversation.id, func.count(Message.id))
+        .join(Message, and_(Message.receiver_id == user_id, Message.sender_id == other, same_thread))
+        .outerjoin(ChatReadCursor, and_(ChatReadCursor.user_id == user_id,
+                                        ChatReadCursor.conversation_key == Conversation.key))
+        .filter(Conversation.id.in_(conv_ids))
+        .filter(Message.id > func.coalesce(ChatReadCursor.last_read_message_id, 0))
+        .group_by(Conversation.id)
+        .all()
+    )
+    return dict(rows)
+
+
+def _message_page(query):
+    """Apply the cursor query-string arguments to a conversation query.
+
+    - after_id / since: messages newer than the cursor, oldest first (polling)
+    - before_id and/or limit: the `limit` messages just before `before_id`
+      (or the latest ones), returned oldest first (scroll-back)
+    - no cursor: the whole conversation, for older clients
+    Raises ValueError on malformed arguments.
+    """
+    args = request.args
+    after_id = int(args["after_id"]) if args.get("after_id") else None
+    before_id = int(args["before_id"]) if args.get("before_id") else None
+    since = datetime.fromisoformat(args["since"]) if args.get("since") else None
+    limit = int(args["limit"]) if args.get("limit") else None
+    if limit is not None:
+        limit = max(1, min(limit, MAX_MESSAGE_PAGE))
+
+    if after_id is not None or since is not None:
+        if after_id is not None:
+            query = query.filter(Message.id > after_id)
+        if since is not None:
+            query = query.filter(Message.timestamp > since)
+        return query.order_by(Message.timestamp.asc(), Message.id.asc()).limit(limit or MAX_MESSAGE_PAGE).all()
+    if before_id is not None or limit is not None:
+        if before_id is not None:
+            query = query.filter(Message.id < before_id)
+        rows = query.order_by(Message.timestamp.desc(), Message.id.desc()).limit(limit or DEFAULT_MESSAGE_PAGE).all()
+        rows.reverse()
+        return rows
+    return query.order_by(Message.timestamp.asc()).all()
+
+
 @bp.route("/messages/<int:other_id>", methods=["GET"])
 @jwt_required()
 def get_conversation(other_id):
+    """Direct messages with another user; supports the cursors in _message_page."""
     user_id = int(get_jwt_identity())
-    msgs = Message.query.filter(
+    query = Message.query.filter(
         ((Message.sender_id == user_id) & (Message.receiver_id == other_id)) |
         ((Message.sender_id == other_id) & (Message.receiver_id == user_id))
-    ).order_by(Message.timestamp.asc()).all()
+    )
+    try:
+        msgs = _message_page(query)
+    except ValueError:
+        return jsonify({"msg": "Invalid cursor"}), 400
     return jsonify([m.to_dict() for m in msgs])
 
 @bp.route("/send", methods=["POST"])
@@ -32,78 +128,106 @@ def send_message():
         return jsonify({"msg": "Receiver not found"}), 404
     msg = Message(sender_id=user_id, receiver_id=receiver_id, content=content)
     db.session.add(msg)
+    db.session.flush()
+    _record_conversation(msg)
     db.session.commit()
+    publish_chat_message(msg)
     return jsonify({"msg": "Message sent", "message": msg.to_dict()}), 201
 
 
 @bp.route("/overview", methods=["GET"])
 @jwt_required()
+@conditional(lambda: [f"chat:{int(get_jwt_identity())}", "users"])
 def conversations_overview():
     """Return a list of active conversations for the current user, most recent first.
-    Each item may be a direct message (dm) or task chat.
+    Each item may be a direct message (dm) or task chat. Reads the materialized
+    conversations table, so every thread appears regardless of message volume.
     """
     user_id = int(get_jwt_identity())
-    msgs = (
-        Message.query
-        .filter((Message.sender_id == user_id) | (Message.receiver_id == user_id))
-        .order_by(Message.timestamp.desc())
-        .limit(500)
+    try:
+        limit = int(request.args.get("limit") or DEFAULT_OVERVIEW_LIMIT)
+    except ValueError:
+        return jsonify({"msg": "Invalid limit"}), 400
+    limit = max(1, min(limit, MAX_OVERVIEW_LIMIT))
+    rows = (
+        db.session.query(Conversation, Message)
+        .outerjoin(Message, Message.id == Conversation.last_message_id)
+        .filter(or_(Conversation.user_a_id == user_id, Conversation.user_b_id == user_id))
+        .order_by(Conversation.updated_at.desc())
+        .limit(limit)
         .all()
     )
-    convs = {}
-    other_ids = set()
-    for m in msgs:
-        if m.task_id:
-            key = ("task", m.task_id)
-            other_id = m.receiver_id if m.sender_id == user_id else m.sender_id
-            if key not in convs:
-                convs[key] = {
-                    "type": "task",
-                    "task_id": m.task_id,
-                    "other_id": other_id,
-                    "last_message": m.to_dict(),
-                    "updated_at": m.timestamp.isoformat(),
-                }
-                if other_id:
-                    other_ids.add(other_id)
-        else:
-            other_id = m.receiver_id if m.sender_id == user_id else m.sender_id
-            key = ("dm", other_id)
-            if key not in convs:
-                convs[key] = {
-                    "type": "dm",
-                    "other_id": other_id,
-                    "task_id": None,
-                    "last_message": m.to_dict(),
-                    "updated_at": m.timestamp.isoformat(),
-                }
-                if other_id:
-                    other_ids.add(other_id)
+    other_ids = {c.other_id(user_id) for c, _ in rows}
+    unread = _unread_counts(user_id, [c.id for c, _ in rows])
     users = {}
     if other_ids:
-        rows = User.query.filter(User.id.in_(list(other_ids))).all()
-        for u in rows:
-            users[u.id] = u.to_dict()
+        for u in User.query.filter(User.id.in_(list(other_ids))).all():
+            users[u.id] = u
     items = []
-    for v in convs.values():
-        o = users.get(v.get("other_id")) if v.get("other_id") else None
+    for conv, last in rows:
+        other_id = conv.other_id(user_id)
+        item = {
+            "type": conv.kind,
+            "task_id": conv.task_id,
+            "other_id": other_id,
+            "last_message": last.to_dict() if last else None,
+            "updated_at": conv.updated_at.isoformat() if conv.updated_at else None,
+            "unread": unread.get(conv.id, 0),
+        }
+        o = users.get(other_id)
         if o:
-            v["other"] = {
-                "id": o.get("id"),
-                "username": o.get("username"),
-                "first_name": o.get("first_name"),
-                "last_name": o.get("last_name"),
+            item["other"] = {
+                "id": o.id,
+                "username": o.username,
+                "first_name": o.first_name,
+                "last_name": o.last_name,
             }
-        items.append(v)
-    items.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+        items.append(item)
     return jsonify(items)
 
 
+@bp.route("/read", methods=["POST"])
+@jwt_required()
+def mark_read():
+    """Advance the current user's read cursor for a conversation.
+    Body: {"task_id": X} or {"other_id": Y}, optional "message_id" (defaults to
+    the latest message). Cursors never move backwards.
+    """
+    user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    try:
+        task_id = int(data["task_id"]) if data.get("task_id") else None
+        other_id = int(data["other_id"]) if data.get("other_id") else None
+        message_id = int(data["message_id"]) if data.get("message_id") else None
+    except (TypeError, ValueError):
+        return jsonify({"msg": "Invalid conversation"}), 400
+    if not task_id and not other_id:
+        return jsonify({"msg": "Missing task_id or other_id"}), 400
+    key = conversation_key(user_id, other_id, task_id) if not task_id else f"task:{task_id}"
+    conv = Conversation.query.filter_by(key=key).first()
+    if not conv:
+        return jsonify({"msg": "Conversation not found"}), 404
+    if user_id not in (conv.user_a_id, conv.user_b_id):
+        return jsonify({"msg": "Not authorized for this conversation."}), 403
+    if message_id is None or message_id > (conv.last_message_id or 0):
+        message_id = conv.last_message_id or 0
+    cursor = ChatReadCursor.query.filter_by(user_id=user_id, conversation_key=key).first()
+    if cursor is None:
+        cursor = ChatReadCursor(user_id=user_id, conversation_key=key, last_read_message_id=message_id)
+        db.session.add(cursor)
+    elif message_id > cursor.last_read_message_id:
+        cursor.last_read_message_id = message_id
+    db.session.commit()
+    unread = _unread_counts(user_id, [conv.id]).get(conv.id, 0)
+    return jsonify({"msg": "Marked read", "last_read_message_id": cursor.last_read_message_id,
+                    "unread": unread}), 200
+
+
 @bp.route("/task/<int:task_id>", methods=["GET"])
 @jwt_required()
 def task_conversation(task_id):
     """Return messages for a specific task between owner and assignee.
-    Only participants can view.
+    Only participants can view. Supports the cursors in _message_page.
     """
     user_id = int(get_jwt_identity())
     t = Task.query.get_or_404(task_id)
@@ -111,11 +235,10 @@ def task_conversation(task_id):
         return jsonify({"msg": "Task has no assignee yet."}), 400
     if user_id not in (t.user_id, t.assignee_id):
         return jsonify({"msg": "Not authorized for this conversation."}), 403
-    msgs = (
-        Message.query.filter(Message.task_id == task_id)
-        .order_by(Message.timestamp.asc())
-        .all()
-    )
+    try:
+        msgs = _message_page(Message.query.filter(Message.task_id == task_id))
+    except ValueError:
+        return jsonify({"msg": "Invalid cursor"}), 400
     return jsonify([m.to_dict() for m in msgs])
 
 
@@ -138,5 +261,8 @@ def task_send(task_id):
         return jsonify({"msg": "Message content required."}), 400
     msg = Message(sender_id=user_id, receiver_id=other_id, task_id=task_id, content=content)
     db.session.add(msg)
+    db.session.flush()
+    _record_conversation(msg)
     db.session.commit()
+    publish_chat_message(msg)
     return jsonify({"msg": "Message sent", "message": msg.to_dict()}), 201
@@ -2,11 +2,14 @@ from flask import Blueprint, request, jsonify
 from database import db
 from models.ride import Ride
 from models.user import User
+from sockets.ride_events import publish_ride_event
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from versions import conditional
 
 bp = Blueprint("rides", __name__, url_prefix="/rides")
 
 @bp.route("", methods=["GET"])
+@conditional("rides")
 def list_rides():
     rides = Ride.query.order_by(Ride.created_at.desc()).all()
     return jsonify([r.to_dict() for r in rides])
@@ -28,7 +31,9 @@ def create_ride():
     ride = Ride(driver_id=user_id, origin=origin, destination=destination, time=time, kind=kind, description=description)
     db.session.add(ride)
     db.session.commit()
-    return jsonify({"msg": "Ride created", "ride": ride.to_dict()}), 201
+    payload = ride.to_dict()
+    publish_ride_event("ride_created", payload, ride.topics())
+    return jsonify({"msg": "Ride created", "ride": payload}), 201
 
 
 @bp.route("/<int:ride_id>", methods=["DELETE"])
@@ -38,6 +43,9 @@ def delete_ride(ride_id: int):
     user_id = int(get_jwt_identity())
     if ride.driver_id != user_id:
         return jsonify({"msg": "Unauthorized"}), 403
+    # capture before commit expires the deleted instance
+    payload, topics = ride.to_dict(), ride.topics()
     db.session.delete(ride)
     db.session.commit()
+    publish_ride_event("ride_deleted", payload, topics)
     return jsonify({"msg": "Ride deleted"}), 200
@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify
+from database import db
+import search as search_index
+
+bp = Blueprint("search", __name__, url_prefix="/search")
+
+DEFAULT_SEARCH_PAGE = 20
+MAX_SEARCH_PAGE = 50
+
+
+@bp.route("", methods=["GET"])
+def search():
+    """Ranked matches over task title/description and study course/teacher/description.
+    Query params: q (required), kind=task|study (default both), limit, offset.
+    Returns {"results": [{"kind", "id", "score", "item"}], "next_offset"}.
+    """
+    q = (request.args.get("q") or "").strip()
+    kind = (request.args.get("kind") or "").strip().lower()
+    if kind and kind not in search_index.SEARCH_KINDS:
+        return jsonify({"msg": "Invalid kind", "allowed": list(search_index.SEARCH_KINDS)}), 400
+    try:
+        limit = int(request.args.get("limit") or DEFAULT_SEARCH_PAGE)
+        offset = int(request.args.get("offset") or 0)
+    except ValueError:
+        return jsonify({"msg": "Invalid limit or offset"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"msg": "Invalid limit or offset"}), 400
+    limit = min(limit, MAX_SEARCH_PAGE)
+    try:
+        hits, has_more = search_index.search(db.session, q, kinds=(kind,) if kind else search_index.SEARCH_KINDS,
+                                             limit=limit, offset=offset)
+    except ValueError:
+        return jsonify({"msg": "Query too short"}), 400
+
+    # hydrate each kind with one query, keeping rank order
+    items = {k: search_index.load_items(k, [ref_id for hk, ref_id, _ in hits if hk == k])
+             for k in {hk for hk, _, _ in hits}}
+    results = []
+    for hk, ref_id, score in hits:
+        row = items[hk].get(ref_id)
+        if row is not None:
+            results.append({"kind": hk, "id": ref_id, "score": round(float(score), 4), "item": row.to_dict()})
+    return jsonify({"results": results, "next_offset": offset + limit if has_more else None})
@@ -2,39 +2,44 @@ from flask import Blueprint, request, jsonify
 from database import db
 from models.study_session import StudySession
 from models.user import User
+import search as search_index
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from versions import conditional
 
 
 bp = Blueprint("study", __name__, url_prefix="/study")
 
 
 @bp.route("", methods=["GET"])
+@conditional("study", "users")
 def list_sessions():
     # Optional filtering by campus and course substring
     q = (request.args.get("q") or "").strip()
     campus = (request.args.get("campus") or "").strip().title()
 
-    query = StudySession.query
+    # owner fields come from the same query (outer join + column projection)
+    query = db.session.query(
+        StudySession, User.id, User.username, User.first_name, User.last_name,
+    ).outerjoin(User, User.id == StudySession.user_id)
     if campus:
         query = query.filter(StudySession.campus == campus)
     if q:
+        # course substring; the trigram postings narrow it down to a few
+        # candidates unless q is too short to have any
         try:
-            query = query.filter(StudySession.course.ilike(f"%{q}%"))
-        except Exception:
-            query = query.filter(StudySession.course.like(f"%{q}%"))
-    sessions = query.order_by(StudySession.created_at.desc()).all()
+            query = query.filter(StudySession.id.in_(search_index.substring_ids(db.session, "study", q)))
+        except ValueError:
+            pass
+        query = query.filter(StudySession.course.ilike(f"%{q}%"))
+    rows = query.order_by(StudySession.created_at.desc()).all()
 
     # Include basic owner info for convenience
     result = []
-    for s in sessions:
+    for s, owner_id, username, first_name, last_name in rows:
         item = s.to_dict()
-        try:
-            u = User.query.get(s.user_id)
-            if u:
-                item["owner"] = {"id": u.id, "username": u.username,
-                                  "first_name": u.first_name, "last_name": u.last_name}
-        except Exception:
-            pass
+        if owner_id is not None:
+            item["owner"] = {"id": owner_id, "username": username,
+                             "first_name": first_name, "last_name": last_name}
         result.append(item)
     return jsonify(result)
 
@@ -0,0 +1,79 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func
+from database import db
+from models.change_log import ChangeLogEntry
+import changelog
+from pagination import clamp_limit
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+bp = Blueprint("sync", __name__, url_prefix="/sync")
+
+DEFAULT_SYNC_PAGE = 500
+MAX_SYNC_PAGE = 2000
+# ids per IN (...) when loading the changed rows
+LOAD_CHUNK = 500
+# response key per change-log kind
+_SECTIONS = {"task": "tasks", "ride": "rides", "study": "study", "message": "messages"}
+
+
+def _load(kind, ids):
+    model = changelog.MODELS[kind]
+    found = {}
+    for i in range(0, len(ids), LOAD_CHUNK):
+        for row in model.query.filter(model.id.in_(ids[i:i + LOAD_CHUNK])):
+            found[row.id] = row
+    return found
+
+
+@bp.route("", methods=["GET"])
+@jwt_required()
+def sync():
+    """Changes since `since` (an opaque token from a previous call; omit it
+    for everything): per kind, the current version of every created or
+    updated row and the ids of deleted ones. Messages are limited to the
+    caller's own. At most `limit` changes are returned; while `more` is true
+    the client calls again with the new token. A token this database never
+    issued (e.g. after a reset) gets 410 and the client starts over.
+    """
+    user_id = int(get_jwt_identity())
+    try:
+        since = changelog.decode_token((request.args.get("since") or "").strip())
+        limit = int(request.args["limit"]) if request.args.get("limit") else None
+    except ValueError:
+        return jsonify({"msg": "Invalid sync token or limit"}), 400
+    limit = clamp_limit(limit, DEFAULT_SYNC_PAGE, MAX_SYNC_PAGE)
+    latest = db.session.query(func.max(ChangeLogEntry.seq)).scalar() or 0
+    if since > latest:
+        return jsonify({"msg": "Unknown sync token, sync from scratch"}), 410
+
+    entries = (ChangeLogEntry.query
+               .filter(ChangeLogEntry.seq > since, changelog.visible_to(user_id))
+               .order_by(ChangeLogEntry.seq)
+               .limit(limit + 1)
+               .all())
+    more = len(entries) > limit
+    entries = entries[:limit]
+
+    result = {section: {"upserted": [], "deleted": []} for section in _SECTIONS.values()}
+    upserts = {}
+    for e in entries:
+        if e.deleted:
+            result[_SECTIONS[e.kind]]["deleted"].append(e.ref_id)
+        else:
+            upserts.setdefault(e.kind, []).append(e.ref_id)
+    for kind, ids in upserts.items():
+        rows = _load(kind, ids)
+        section = result[_SECTIONS[kind]]
+        for ref_id in ids:
+            row = rows.get(ref_id)
+            if row is None:
+                # deleted after the entries were read; its tombstone comes next time
+                continue
+            section["upserted"].append(row.to_dict())
+
+    # with nothing left, skip past entries the caller cannot see as well;
+    # nothing below `latest` can still commit (see changelog.lock_log)
+    last = entries[-1].seq if entries else since
+    result["token"] = changelog.encode_token(last if more else max(last, latest))
+    result["more"] = more
+    return jsonify(result)
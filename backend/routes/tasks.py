@@ -1,15 +1,87 @@
 from flask import Blueprint, request, jsonify
 from database import db
-from models.task import Task
+from models.task import Task, parse_task_details, parse_reward_cents, parse_deadline, normalize_location
 from models.user import User
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from pagination import after_cursor, clamp_limit, encode_cursor
+from versions import conditional
 
 bp = Blueprint("tasks", __name__, url_prefix="/tasks")
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _int_arg(name: str):
+    value = (request.args.get(name) or "").strip()
+    if not value:
+        return None
+    return int(value)
+
+
 @bp.route("", methods=["GET"])
+@conditional("tasks")
 def list_tasks():
-    tasks = Task.query.order_by(Task.created_at.desc()).all()
-    return jsonify([t.to_dict() for t in tasks])
+    """List tasks newest first, optionally filtered server-side.
+
+    Filters: status, owner, exclude_owner, assignee (user ids) and location.
+    Passing `limit` and/or `cursor` switches to a keyset-paginated page
+    ordered by (created_at, id): {"tasks": [...], "next_cursor": str|None}.
+    Without them the full list is returned for older clients.
+    `sort=deadline` lists tasks that have a deadline, soonest first, keyed
+    on (deadline_at, id) instead.
+    """
+    try:
+        owner = _int_arg("owner")
+        exclude_owner = _int_arg("exclude_owner")
+        assignee = _int_arg("assignee")
+        limit = _int_arg("limit")
+    except ValueError:
+        return jsonify({"msg": "Invalid filter"}), 400
+    status = (request.args.get("status") or "").strip().lower()
+    location = (request.args.get("location") or "").strip()
+    cursor = (request.args.get("cursor") or "").strip()
+    sort = (request.args.get("sort") or "created").strip().lower()
+    if sort not in ("created", "deadline"):
+        return jsonify({"msg": "Invalid sort"}), 400
+
+    query = Task.query
+    if status:
+        query = query.filter(Task.status == status)
+    if owner is not None:
+        query = query.filter(Task.user_id == owner)
+    if exclude_owner is not None:
+        query = query.filter(Task.user_id != exclude_owner)
+    if assignee is not None:
+        query = query.filter(Task.assignee_id == assignee)
+    if location:
+        query = query.filter(Task.location == normalize_location(location))
+    if sort == "deadline":
+        query = query.filter(Task.deadline_at.isnot(None))
+        order = (Task.deadline_at.asc(), Task.id.asc())
+    else:
+        order = (Task.created_at.desc(), Task.id.desc())
+
+    if limit is None and not cursor:
+        tasks = query.order_by(*order).all()
+        return jsonify([t.to_dict() for t in tasks])
+
+    limit = clamp_limit(limit, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    if cursor:
+        try:
+            if sort == "deadline":
+                query = after_cursor(query, Task.deadline_at, Task.id, cursor, descending=False)
+            else:
+                query = after_cursor(query, Task.created_at, Task.id, cursor)
+        except ValueError:
+            return jsonify({"msg": "Invalid cursor"}), 400
+    rows = query.order_by(*order).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last.deadline_at if sort == "deadline" else last.created_at, last.id)
+    return jsonify({"tasks": [t.to_dict() for t in page], "next_cursor": next_cursor})
 
 @bp.route("/mine", methods=["GET"])
 @jwt_required()
@@ -18,6 +90,27 @@ def list_my_tasks():
     tasks = Task.query.filter_by(user_id=user_id).order_by(Task.created_at.desc()).all()
     return jsonify([t.to_dict() for t in tasks])
 
+def _details_from_payload(data: dict, description: str) -> dict:
+    """Resolve typed metadata from explicit reward/deadline/location fields,
+    falling back to legacy "Reward: … | Deadline: …" text in the description.
+    Raises ValueError with a user-facing message for unparseable values.
+    """
+    details = parse_task_details(description)
+    if "reward" in data:
+        raw = data.get("reward")
+        details["reward_cents"] = parse_reward_cents(raw) if raw not in (None, "") else None
+        if raw not in (None, "") and details["reward_cents"] is None:
+            raise ValueError("Invalid reward")
+    if "deadline" in data:
+        raw = data.get("deadline")
+        details["deadline_at"] = parse_deadline(raw) if raw else None
+        if raw and details["deadline_at"] is None:
+            raise ValueError("Invalid deadline, use YYYY-MM-DD or YYYY-MM-DD HH:MM")
+    if "location" in data:
+        details["location"] = normalize_location(data.get("location"))
+    return details
+
+
 @bp.route("", methods=["POST"])
 @jwt_required()
 def create_task():
@@ -26,11 +119,15 @@ def create_task():
     description = data.get("description", "")
     if not title:
         return jsonify({"msg": "Missing title"}), 400
+    try:
+        details = _details_from_payload(data, description)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
     if not user:
         return jsonify({"msg": "User not found"}), 404
-    task = Task(title=title, description=description, user_id=user_id)
+    task = Task(title=title, description=description, user_id=user_id, **details)
     db.session.add(task)
     db.session.commit()
     return jsonify({"msg": "Task created", "task": task.to_dict()}), 201
@@ -48,9 +145,23 @@ def update_task(task_id):
     user_id = int(get_jwt_identity())
     if t.user_id != user_id:
         return jsonify({"msg": "Unauthorized"}), 403
+    if "description" in data or any(k in data for k in ("reward", "deadline", "location")):
+        try:
+            details = _details_from_payload(data, data.get("description", t.description))
+        except ValueError as e:
+            return jsonify({"msg": str(e)}), 400
+        # explicit fields always win. A new description only changes the
+        # details written in it, or clears one the old text had and the edit
+        # removed; plain text leaves the stored values alone
+        new_text = parse_task_details(data["description"]) if "description" in data else {}
+        old_text = parse_task_details(t.description) if "description" in data else {}
+        for column, field in (("reward_cents", "reward"), ("deadline_at", "deadline"), ("location", "location")):
+            if field in data or new_text.get(column) is not None or old_text.get(column) is not None:
+                setattr(t, column, details[column])
     t.title = data.get("title", t.title)
     t.description = data.get("description", t.description)
-    t.status = data.get("status", t.status)
+    # an empty status would drop the task out of the status=open feed
+    t.status = data.get("status") or t.status
     db.session.commit()
     return jsonify({"msg": "Task updated", "task": t.to_dict()})
 
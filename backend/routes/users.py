@@ -2,9 +2,35 @@ from flask import Blueprint, request, jsonify
 from database import db
 from models.user import User
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from versions import conditional
 
 bp = Blueprint("users", __name__, url_prefix="/users")
 
+# ids accepted by one GET /users?ids= call
+MAX_BATCH_IDS = 100
+
+
+@bp.route("", methods=["GET"])
+@jwt_required()
+def get_users():
+    """Batch lookup: GET /users?ids=1,2,3 -> {"users": [...]} in request
+    order, duplicates collapsed. Unknown ids are simply left out. Only the
+    public fields are returned, so the endpoint cannot be used to collect
+    email addresses.
+    """
+    raw = (request.args.get("ids") or "").strip()
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw.split(",") if part.strip()))
+    except ValueError:
+        return jsonify({"msg": "Invalid ids"}), 400
+    if not ids:
+        return jsonify({"msg": "Missing ids"}), 400
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({"msg": f"At most {MAX_BATCH_IDS} ids per request"}), 400
+    found = {u.id: u for u in User.query.filter(User.id.in_(ids))}
+    return jsonify({"users": [found[i].to_public_dict() for i in ids if i in found]})
+
+
 @bp.route("/me", methods=["GET"])
 @jwt_required()
 def me():
@@ -13,6 +39,7 @@ def me():
     return jsonify(user.to_dict())
 
 @bp.route("/<int:user_id>", methods=["GET"])
+@conditional(lambda user_id: [f"user:{user_id}"])
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
     return jsonify(user.to_dict())
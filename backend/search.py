@@ -0,0 +1,260 @@
+"""Full-text search over tasks and study sessions.
+
+Every Task/StudySession write is mirrored into search_documents by an ORM
+after_flush hook, in the same transaction as the write. On SQLite with FTS5
+the document table feeds an external-content FTS5 index through triggers
+(see models/search.py) and results are ranked with bm25. Other databases, or
+SEARCH_BACKEND=ngram, use a trigram posting table ranked by matched title
+and body grams. Both backends treat each query word as a prefix and require
+every word to match. Study sessions keep trigram postings on either backend
+so that GET /study?q= can match course substrings.
+"""
+import os
+import re
+
+from sqlalchemy import column, delete, event, func, inspect as sa_inspect, insert, literal, literal_column, select, table, union_all
+from sqlalchemy.orm import Session
+
+from models.search import SearchDocument, SearchGram
+from models.study_session import StudySession
+from models.task import Task
+
+# "auto" picks FTS5 when the search_fts table exists, else the trigram table
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto").strip().lower()
+SEARCH_KINDS = ("task", "study")
+# kinds whose titles are also matched as substrings (GET /study?q=); they
+# keep trigram postings even when FTS5 does the ranked search
+SUBSTRING_KINDS = ("study",)
+MIN_TOKEN_LENGTH = 2
+MAX_QUERY_TOKENS = 8
+TITLE_WEIGHT = 3
+# postings counted per query gram when picking the rarest one
+GRAM_COUNT_CAP = 2000
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# the FTS5 table is created by DDL hooks, not mapped
+_search_fts = table("search_fts", column("rowid"))
+_fts_tables = {}  # engine url -> whether search_fts exists
+
+
+def _task_document(t):
+    body = "\n".join(p for p in (t.description, t.location) if p)
+    return t.title or "", body
+
+
+def _study_document(s):
+    body = "\n".join(p for p in (s.teacher, s.description) if p)
+    return s.course or "", body
+
+
+# model -> (kind, document builder, attributes the document is built from)
+_SOURCES = {
+    Task: ("task", _task_document, ("title", "description", "location")),
+    StudySession: ("study", _study_document, ("course", "teacher", "description")),
+}
+_MODELS = {kind: model for model, (kind, _, _) in _SOURCES.items()}
+
+
+def tokenize(text_value):
+    """Lowercased words of at least MIN_TOKEN_LENGTH characters."""
+    words = _TOKEN_RE.findall(str(text_value or "").lower())
+    return [w for w in words if len(w) >= MIN_TOKEN_LENGTH]
+
+
+def document_grams(title, body):
+    """Trigrams of each word padded with spaces, weighted by field."""
+    grams = {}
+    for weight, value in ((TITLE_WEIGHT, title), (1, body)):
+        for word in tokenize(value):
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                g = padded[i:i + 3]
+                grams[g] = max(grams.get(g, 0), weight)
+    return grams
+
+
+def query_grams(words):
+    """Trigrams a document must contain for every word to match as a prefix."""
+    grams = set()
+    for word in words:
+        padded = f" {word}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+def uses_fts(conn):
+    if SEARCH_BACKEND == "ngram":
+        return False
+    if conn.dialect.name != "sqlite":
+        return False
+    key = str(conn.engine.url)
+    if key not in _fts_tables:
+        _fts_tables[key] = sa_inspect(conn).has_table("search_fts")
+    return _fts_tables[key]
+
+
+def _remove(conn, kind, ref_ids):
+    d = SearchDocument.__table__.c
+    doc_ids = select(d.id).where(d.kind == kind, d.ref_id.in_(ref_ids))
+    conn.execute(delete(SearchGram.__table__).where(SearchGram.__table__.c.doc_id.in_(doc_ids)))
+    conn.execute(delete(SearchDocument.__table__).where(d.kind == kind, d.ref_id.in_(ref_ids)))
+
+
+def index_documents(conn, kind, docs):
+    """Replace the documents for (ref_id, title, body) tuples of one kind."""
+    if not docs:
+        return
+    _remove(conn, kind, [ref_id for ref_id, _, _ in docs])
+    fts = uses_fts(conn)
+    rows = [{"kind": kind, "ref_id": ref_id, "title": (title or "")[:200], "body": body or ""}
+            for ref_id, title, body in docs]
+    conn.execute(insert(SearchDocument.__table__), rows)
+    if fts and kind not in SUBSTRING_KINDS:
+        return
+    d = SearchDocument.__table__.c
+    by_ref = {row["ref_id"]: row for row in rows}
+    grams = []
+    for doc_id, ref_id in conn.execute(select(d.id, d.ref_id).where(d.kind == kind, d.ref_id.in_(list(by_ref)))):
+        row = by_ref[ref_id]
+        grams.extend({"gram": g, "doc_id": doc_id, "weight": w}
+                     for g, w in document_grams(row["title"], row["body"]).items())
+    if grams:
+        conn.execute(insert(SearchGram.__table__), grams)
+
+
+def remove_documents(conn, kind, ref_ids):
+    if ref_ids:
+        _remove(conn, kind, list(ref_ids))
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session, flush_context):
+    changed, removed = {}, {}
+    for obj in session.new | session.dirty:
+        source = _SOURCES.get(type(obj))
+        if source is None:
+            continue
+        kind, build, attrs = source
+        if obj in session.dirty:
+            state = sa_inspect(obj)
+            if not any(state.attrs[a].history.has_changes() for a in attrs):
+                continue
+        changed.setdefault(kind, []).append((obj.id, *build(obj)))
+    for obj in session.deleted:
+        source = _SOURCES.get(type(obj))
+        if source is not None:
+            removed.setdefault(source[0], []).append(obj.id)
+    if not changed and not removed:
+        return
+    conn = session.connection()
+    for kind, ref_ids in removed.items():
+        remove_documents(conn, kind, ref_ids)
+    for kind, docs in changed.items():
+        index_documents(conn, kind, docs)
+
+
+def rebuild_search_index(engine, batch_size=500):
+    """(Re)index every task and study session, walking each table by id."""
+    with engine.begin() as conn:
+        conn.execute(delete(SearchGram.__table__))
+        conn.execute(delete(SearchDocument.__table__))
+    for model, (kind, build, _) in _SOURCES.items():
+        last_id = 0
+        while True:
+            with Session(bind=engine) as session:
+                rows = (session.query(model).filter(model.id > last_id)
+                        .order_by(model.id).limit(batch_size).all())
+                if not rows:
+                    break
+                docs = [(r.id, *build(r)) for r in rows]
+                last_id = rows[-1].id
+            with engine.begin() as conn:
+                index_documents(conn, kind, docs)
+
+
+def _fts_match(words):
+    # user words only match title/body; each one is a prefix
+    return "{title body} : (" + " ".join(f'"{w}"*' for w in words) + ")"
+
+
+def _ranked(conn, words, kinds):
+    """Select (kind, ref_id, score) ordered best first."""
+    d = SearchDocument.__table__.c
+    if uses_fts(conn):
+        # column weights: kind, title, body
+        score = func.bm25(literal_column("search_fts"), 0.0, 10.0, 1.0)
+        return (
+            select(d.kind, d.ref_id, score.label("score"))
+            .select_from(_search_fts.join(SearchDocument.__table__, d.id == _search_fts.c.rowid))
+            .where(literal_column("search_fts").op("MATCH")(_fts_match(words)), d.kind.in_(kinds))
+            .order_by(score, d.id.desc())
+        )
+    grams = query_grams(words)
+    g = SearchGram.__table__
+    # drive the match from the rarest gram; the others are primary-key probes
+    capped = [select(literal(gram).label("gram"), func.count().label("n")).select_from(
+        select(g.c.doc_id).where(g.c.gram == gram).limit(GRAM_COUNT_CAP).subquery())
+        for gram in grams]
+    counts = dict(conn.execute(union_all(*capped)).fetchall()) if len(grams) > 1 else {}
+    grams.sort(key=lambda gram: counts.get(gram, 0))
+    postings = [g.alias(f"g{i}") for i in range(len(grams))]
+    first = postings[0]
+    hits = (select(first.c.doc_id, sum(p.c.weight for p in postings).label("weight"))
+            .select_from(first).where(first.c.gram == grams[0]))
+    for probe, gram in zip(postings[1:], grams[1:]):
+        hits = hits.join(probe, (probe.c.doc_id == first.c.doc_id) & (probe.c.gram == gram))
+    hits = hits.subquery()
+    # negated so that, as with bm25, lower scores rank first
+    return (
+        select(d.kind, d.ref_id, (-hits.c.weight).label("score"))
+        .join(hits, hits.c.doc_id == d.id)
+        .where(d.kind.in_(kinds))
+        .order_by(hits.c.weight.desc(), d.id.desc())
+    )
+
+
+def _query_words(q):
+    words = tokenize(q)[:MAX_QUERY_TOKENS]
+    if not words:
+        raise ValueError("Query too short")
+    return words
+
+
+def search(session, q, kinds=SEARCH_KINDS, limit=20, offset=0):
+    """Ranked page of matches: ([(kind, ref_id, score)], has_more)."""
+    words = _query_words(q)
+    conn = session.connection()
+    rows = conn.execute(_ranked(conn, words, kinds).limit(limit + 1).offset(offset)).fetchall()
+    return [tuple(r) for r in rows[:limit]], len(rows) > limit
+
+
+def matching_ids(session, kind, q):
+    """Select of every ref_id of `kind` matching q, for use in an IN filter."""
+    words = _query_words(q)
+    ranked = _ranked(session.connection(), words, (kind,)).order_by(None).subquery()
+    return select(ranked.c.ref_id)
+
+
+def substring_ids(session, kind, q):
+    """Select of the ref_ids of `kind` whose title may contain q, for an IN
+    filter. Candidates only: every trigram of q's words is in the title, so
+    callers still compare the text. Raises ValueError when q has no word of
+    three or more characters.
+    """
+    words = [w for w in _TOKEN_RE.findall(str(q or "").lower()) if len(w) >= 3][:MAX_QUERY_TOKENS]
+    if not words:
+        raise ValueError("Query too short")
+    grams = sorted({w[i:i + 3] for w in words for i in range(len(w) - 2)})
+    g = SearchGram.__table__.c
+    d = SearchDocument.__table__.c
+    docs = (select(g.doc_id).where(g.gram.in_(grams), g.weight >= TITLE_WEIGHT)
+            .group_by(g.doc_id).having(func.count() == len(grams)))
+    return select(d.ref_id).where(d.kind == kind, d.id.in_(docs))
+
+
+def load_items(kind, ids):
+    """Fetch the rows behind a page of results, keyed by id."""
+    if not ids:
+        return {}
+    model = _MODELS[kind]
+    return {row.id: row for row in model.query.filter(model.id.in_(ids))}
@@ -1,23 +1,92 @@
-# basic socketio handlers (requires hooking into socketio instance in app if needed)
-# This file is a template; in this skeleton we use HTTP chat endpoints primarily.
+# Socket.IO chat delivery. Messages are persisted over HTTP in routes/chat.py;
+# once committed they are pushed to a per-conversation room named by its
+# conversation key, so open chat screens no longer need to poll.
+from flask import current_app, request
+from flask_jwt_extended import decode_token
 from flask_socketio import emit, join_room, leave_room
 
+from models.conversation import conversation_key
+from models.task import Task
+
+# socket id -> authenticated user id
+_socket_users = {}
+
+
+def _token_from(auth):
+    if isinstance(auth, dict) and auth.get("token"):
+        return auth["token"]
+    header = request.headers.get("Authorization") or ""
+    if header.startswith("Bearer "):
+        return header[len("Bearer "):]
+    return None
+
+
+def socket_user_id():
+    """User id bound to the current socket connection, or None."""
+    return _socket_users.get(request.sid)
+
+
+def _room_for(user_id, data):
+    """Conversation key the user may join for a join/leave payload, or None."""
+    data = data or {}
+    try:
+        task_id = int(data["task_id"]) if data.get("task_id") else None
+        other_id = int(data["other_id"]) if data.get("other_id") else None
+    except (TypeError, ValueError):
+        return None
+    if task_id:
+        t = Task.query.get(task_id)
+        if not t or not t.assignee_id or user_id not in (t.user_id, t.assignee_id):
+            return None
+        return conversation_key(t.user_id, t.assignee_id, task_id)
+    if other_id and other_id != user_id:
+        return conversation_key(user_id, other_id)
+    return None
+
+
+def publish_chat_message(msg):
+    """Emit a committed message to its conversation room."""
+    socketio = current_app.extensions.get("socketio")
+    if socketio is None or msg.receiver_id is None:
+        return
+    room = conversation_key(msg.sender_id, msg.receiver_id, msg.task_id)
+    try:
+        socketio.emit("chat_message", msg.to_dict(), to=room)
+    except Exception as e:
+        # delivery is best-effort; clients still catch up over HTTP
+        print("Chat push failed:", e)
+
 
 def register_socket_handlers(socketio):
+    @socketio.on("connect")
+    def handle_connect(auth=None):
+        token = _token_from(auth)
+        if not token:
+            return False
+        try:
+            user_id = int(decode_token(token)["sub"])
+        except Exception:
+            return False
+        _socket_users[request.sid] = user_id
+
+    @socketio.on("disconnect")
+    def handle_disconnect(*args):
+        _socket_users.pop(request.sid, None)
+
     @socketio.on("join")
     def handle_join(data):
-        room = data.get("room")
+        user_id = socket_user_id()
+        room = _room_for(user_id, data) if user_id else None
+        if not room:
+            emit("error", {"msg": "Not authorized for this conversation."})
+            return {"ok": False}
         join_room(room)
-        emit("status", {"msg": f"{data.get('username')} joined."}, room=room)
+        return {"ok": True, "room": room}
 
     @socketio.on("leave")
     def handle_leave(data):
-        room = data.get("room")
-        leave_room(room)
-        emit("status", {"msg": f"{data.get('username')} left."}, room=room)
-
-    @socketio.on("message")
-    def handle_message(data):
-        room = data.get("room")
-        emit("message", data, room=room)
-
+        user_id = socket_user_id()
+        room = _room_for(user_id, data) if user_id else None
+        if room:
+            leave_room(room)
+        return {"ok": bool(room)}
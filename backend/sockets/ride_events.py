@@ -1,6 +1,61 @@
+# Ride feed pushes. routes/rides.py publishes committed creates/deletes to
+# topic rooms (see Ride.topics); each client subscribes to the single room
+# matching its filter, so an event only reaches interested sockets.
+from flask import current_app
+from flask_socketio import join_room, leave_room, rooms
+
+from models.ride import OTHER_AREA, RIDE_KINDS, ride_topic
+from models.task import KNOWN_LOCATIONS
+from sockets.chat_events import socket_user_id
+
+_AREAS = {loc.lower() for loc in KNOWN_LOCATIONS} | {OTHER_AREA}
+
+
+def _leave_ride_rooms(keep=None):
+    for room in rooms():
+        if room.startswith("rides:") and room != keep:
+            leave_room(room)
+
+
+def _filter_value(data, key, allowed):
+    value = str(data.get(key) or "*").strip().lower()
+    if value in ("*", "any"):
+        return "*"
+    if value not in allowed:
+        raise ValueError(key)
+    return value
+
+
+def publish_ride_event(event, payload, topics):
+    """Emit a committed ride change (Ride.to_dict) to its topic rooms."""
+    socketio = current_app.extensions.get("socketio")
+    if socketio is None:
+        return
+    try:
+        socketio.emit(event, payload, to=topics)
+    except Exception as e:
+        print("Ride push failed:", e)
+
+
 def register_ride_handlers(socketio):
-    @socketio.on("ride_create")
-    def handle_ride_create(data):
-        # broadcast new ride
-        socketio.emit("new_ride", data)
+    @socketio.on("subscribe_rides")
+    def handle_subscribe(data):
+        if not socket_user_id():
+            return {"ok": False, "msg": "Not authenticated"}
+        data = data or {}
+        try:
+            room = ride_topic(
+                _filter_value(data, "kind", RIDE_KINDS),
+                _filter_value(data, "origin", _AREAS),
+                _filter_value(data, "destination", _AREAS),
+            )
+        except ValueError as e:
+            return {"ok": False, "msg": f"Invalid {e}"}
+        _leave_ride_rooms(keep=room)
+        join_room(room)
+        return {"ok": True, "room": room}
 
+    @socketio.on("unsubscribe_rides")
+    def handle_unsubscribe(*args):
+        _leave_ride_rooms()
+        return {"ok": True}
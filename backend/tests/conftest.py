@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Point the app at a throwaway database and keep tests from reaching a real
+# SMTP relay (backend/.env is loaded by create_app but never overrides).
+_TMP_DIR = tempfile.mkdtemp(prefix="errandbuddy-tests-")
+os.environ["DATABASE_URI"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["SMTP_HOST"] = ""
+os.environ["OTP_LOG"] = os.path.join(_TMP_DIR, "otp_dev.log")
+os.environ["SLOW_REQUEST_LOG"] = os.path.join(_TMP_DIR, "slow_requests.log")
+# tests drive the mail outbox explicitly instead of through worker threads
+os.environ["MAIL_WORKERS"] = "0"
+os.environ["OTP_PURGE_SECONDS"] = "0"
+# hash passwords inline; test_auth starts the process pool on its own
+os.environ["PASSWORD_WORKERS"] = "0"
+
+from app import create_app  # noqa: E402
+from database import db  # noqa: E402
+
+
+@pytest.fixture()
+def app():
+    app, _ = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture()
+def make_user(app):
+    from werkzeug.security import generate_password_hash
+    from models.user import User
+
+    def _make(email="alice@student.kpu.ca", username=None, password="secret"):
+        user = User(username=username or email.split("@")[0], email=email,
+                    password_hash=generate_password_hash(password), email_verified=True)
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return _make
+
+
+@pytest.fixture()
+def auth_headers(app):
+    from flask_jwt_extended import create_access_token
+
+    def _headers(user):
+        token = create_access_token(identity=str(user.id))
+        return {"Authorization": f"Bearer {token}"}
+
+    return _headers
@@ -0,0 +1,121 @@
+import re
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import otp
+import passwords
+from database import db
+from models.email_otp import EmailOTP
+from models.outbound_email import OutboundEmail
+
+
+def _sent_code(email):
+    msg = OutboundEmail.query.filter_by(to_addr=email).order_by(OutboundEmail.id.desc()).first()
+    return re.search(r"code is: (\d{6})", msg.body).group(1)
+
+
+def _register(client, email="new@student.kpu.ca"):
+    resp = client.post("/auth/register", json={"email": email, "password": "pw"})
+    assert resp.status_code == 201
+    return _sent_code(email)
+
+
+def test_register_verify_login(client):
+    code = _register(client)
+    stored = EmailOTP.query.one()
+    assert stored.code_hash.startswith("hmac-sha256$")
+    assert code not in stored.code_hash
+
+    login = {"email": "new@student.kpu.ca", "password": "pw"}
+    assert client.post("/auth/login", json=login).status_code == 403
+
+    wrong = "000000" if code != "000000" else "111111"
+    assert client.post("/auth/verify-otp", json={"email": login["email"], "otp": wrong}).status_code == 401
+    assert client.post("/auth/verify-otp", json={"email": login["email"], "otp": code}).status_code == 200
+    # verified codes are not kept around
+    assert EmailOTP.query.count() == 0
+    assert client.post("/auth/login", json=login).status_code == 200
+    assert client.post("/auth/verify-otp", json={"email": login["email"], "otp": code}).json["msg"] == \
+        "Email already verified"
+
+
+def test_resend_replaces_code(client):
+    first = _register(client)
+    assert client.post("/auth/resend-otp", json={"email": "new@student.kpu.ca"}).status_code == 200
+    second = _sent_code("new@student.kpu.ca")
+    assert EmailOTP.query.count() == 1
+    if first != second:
+        resp = client.post("/auth/verify-otp", json={"email": "new@student.kpu.ca", "otp": first})
+        assert resp.status_code == 401
+    resp = client.post("/auth/verify-otp", json={"email": "new@student.kpu.ca", "otp": second})
+    assert resp.status_code == 200
+
+
+def test_legacy_password_hashed_code_still_verifies(client):
+    _register(client)
+    stored = EmailOTP.query.one()
+    stored.code_hash = generate_password_hash("123456")
+    db.session.commit()
+    resp = client.post("/auth/verify-otp", json={"email": "new@student.kpu.ca", "otp": "123456"})
+    assert resp.status_code == 200
+
+
+def test_purge_expired_deletes_only_expired(app, make_user):
+    now = datetime.utcnow()
+    users = [make_user(email=f"u{i}@student.kpu.ca") for i in range(5)]
+    for i, user in enumerate(users):
+        db.session.add(EmailOTP(user_id=user.id, code_hash="x",
+                                expires_at=now + timedelta(minutes=5 if i < 2 else -5)))
+    db.session.commit()
+    assert otp.purge_expired(db.session, batch_size=2) == 3
+    assert {o.user_id for o in EmailOTP.query} == {users[0].id, users[1].id}
+
+
+def test_login_upgrades_old_password_hashes(client, make_user):
+    user = make_user(password="pw")
+    user.password_hash = generate_password_hash("pw", method="pbkdf2:sha256:1000")
+    db.session.commit()
+    resp = client.post("/auth/login", json={"email": user.email, "password": "pw"})
+    assert resp.status_code == 200
+    db.session.refresh(user)
+    assert not passwords.needs_rehash(user.password_hash)
+    assert passwords.verify_password(user.password_hash, "pw")
+
+
+def test_full_hash_queue_sheds_with_503(client, make_user, monkeypatch):
+    user = make_user(password="pw")
+    monkeypatch.setattr(passwords, "PASSWORD_MAX_PENDING", 0)
+    resp = client.post("/auth/login", json={"email": user.email, "password": "pw"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"]
+    resp = client.post("/auth/register", json={"email": "new@student.kpu.ca", "password": "pw"})
+    assert resp.status_code == 503
+
+
+def test_process_pool_hashes_off_thread(monkeypatch):
+    monkeypatch.setattr(passwords, "PASSWORD_WORKERS", 1)
+    try:
+        hashed = passwords.hash_password("pw")
+        assert passwords.verify_password(hashed, "pw")
+        assert not passwords.verify_password(hashed, "nope")
+    finally:
+        passwords.shutdown()
+
+
+def test_timed_out_hash_holds_its_slot_until_it_finishes(monkeypatch):
+    monkeypatch.setattr(passwords, "PASSWORD_WORKERS", 1)
+    monkeypatch.setattr(passwords, "PASSWORD_TIMEOUT_SECONDS", 0.05)
+    try:
+        with pytest.raises(passwords.PasswordPoolBusy):
+            passwords._run(time.sleep, 1)
+        # the request gave up, but the job is still running in the pool
+        assert passwords._pending == 1
+        deadline = time.monotonic() + 30
+        while passwords._pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert passwords._pending == 0
+    finally:
+        passwords.shutdown()
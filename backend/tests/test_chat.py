@@ -0,0 +1,221 @@
+from database import db
+from models.message import Message
+from models.task import Task
+
+
+def _dm(client, headers, receiver, content):
+    resp = client.post("/chat/send", headers=headers, json={"receiver_id": receiver.id, "content": content})
+    assert resp.status_code == 201
+    return resp.get_json()["message"]
+
+
+def test_conversation_cursors(client, make_user, auth_headers):
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    ha, hb = auth_headers(alice), auth_headers(bob)
+    ids = [_dm(client, ha if i % 2 else hb, bob if i % 2 else alice, f"m{i}")["id"] for i in range(6)]
+
+    full = client.get(f"/chat/messages/{bob.id}", headers=ha).get_json()
+    assert [m["id"] for m in full] == ids
+
+    latest = client.get(f"/chat/messages/{bob.id}?limit=2", headers=ha).get_json()
+    assert [m["id"] for m in latest] == ids[-2:]
+    older = client.get(f"/chat/messages/{bob.id}?before_id={ids[-2]}&limit=3", headers=ha).get_json()
+    assert [m["id"] for m in older] == ids[1:4]
+    newer = client.get(f"/chat/messages/{bob.id}?after_id={ids[3]}", headers=ha).get_json()
+    assert [m["id"] for m in newer] == ids[4:]
+    assert client.get(f"/chat/messages/{bob.id}?after_id={ids[-1]}", headers=ha).get_json() == []
+    assert client.get(f"/chat/messages/{bob.id}?after_id=x", headers=ha).status_code == 400
+
+
+def test_task_conversation_since(client, make_user, auth_headers):
+    owner = make_user()
+    helper = make_user(email="helper@student.kpu.ca")
+    task = Task(title="Errand", user_id=owner.id, assignee_id=helper.id, status="assigned")
+    db.session.add(task)
+    db.session.commit()
+    url = f"/chat/task/{task.id}"
+    first = client.post(f"{url}/send", headers=auth_headers(owner), json={"content": "hi"}).get_json()["message"]
+    second = client.post(f"{url}/send", headers=auth_headers(helper), json={"content": "hey"}).get_json()["message"]
+
+    since = client.get(f"{url}?since={first['timestamp']}", headers=auth_headers(owner)).get_json()
+    assert [m["id"] for m in since] == [second["id"]]
+    assert Message.query.count() == 2
+
+
+def test_overview_lists_every_thread_with_unread_counts(client, make_user, auth_headers):
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    carol = make_user(email="carol@student.kpu.ca")
+    task = Task(title="Errand", user_id=alice.id, assignee_id=carol.id, status="assigned")
+    db.session.add(task)
+    db.session.commit()
+    ha, hb = auth_headers(alice), auth_headers(bob)
+
+    _dm(client, hb, alice, "old thread")
+    client.post(f"/chat/task/{task.id}/send", headers=auth_headers(carol), json={"content": "on my way"})
+    for i in range(3):
+        _dm(client, ha, carol, f"newer {i}")
+
+    items = client.get("/chat/overview", headers=ha).get_json()
+    assert [(i["type"], i["other_id"]) for i in items] == [("dm", carol.id), ("task", carol.id), ("dm", bob.id)]
+    assert [i["unread"] for i in items] == [0, 1, 1]
+    assert items[0]["last_message"]["content"] == "newer 2"
+    assert items[1]["task_id"] == task.id
+    assert items[2]["other"]["username"] == "bob"
+
+    carol_view = client.get("/chat/overview", headers=auth_headers(carol)).get_json()
+    assert [i["unread"] for i in carol_view] == [3, 0]
+
+
+def test_read_cursor_drives_unread_counts(client, make_user, auth_headers):
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    ha, hb = auth_headers(alice), auth_headers(bob)
+    first = _dm(client, hb, alice, "one")
+    _dm(client, hb, alice, "two")
+    assert client.get("/chat/overview", headers=ha).get_json()[0]["unread"] == 2
+
+    resp = client.post("/chat/read", headers=ha, json={"other_id": bob.id, "message_id": first["id"]})
+    assert resp.status_code == 200
+    assert resp.get_json()["unread"] == 1
+    # cursors never move backwards
+    client.post("/chat/read", headers=ha, json={"other_id": bob.id})
+    client.post("/chat/read", headers=ha, json={"other_id": bob.id, "message_id": first["id"]})
+    assert client.get("/chat/overview", headers=ha).get_json()[0]["unread"] == 0
+
+    _dm(client, hb, alice, "three")
+    assert client.get("/chat/overview", headers=ha).get_json()[0]["unread"] == 1
+    assert client.get("/chat/overview", headers=hb).get_json()[0]["unread"] == 0
+
+    carol = make_user(email="carol@student.kpu.ca")
+    assert client.post("/chat/read", headers=auth_headers(carol), json={"other_id": bob.id}).status_code == 404
+    assert client.post("/chat/read", headers=ha, json={}).status_code == 400
+
+
+def test_conversations_backfill_from_messages(app, make_user):
+    from migrations.m0001_baseline import _backfill_conversations
+    from models.conversation import Conversation
+
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    for i in range(5):
+        db.session.add(Message(sender_id=alice.id if i % 2 else bob.id,
+                               receiver_id=bob.id if i % 2 else alice.id, content=f"m{i}"))
+    db.session.commit()
+    last = Message.query.order_by(Message.id.desc()).first()
+
+    _backfill_conversations(db.engine, batch_size=2)
+    conv = Conversation.query.one()
+    assert conv.key == f"dm:{alice.id}:{bob.id}"
+    assert conv.last_message_id == last.id
+
+
+def _captured_selects(engine):
+    from sqlalchemy import event
+
+    captured = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before)
+    return captured, lambda: event.remove(engine, "before_cursor_execute", _before)
+
+
+def _table_scans(engine, statement, parameters):
+    """Return EXPLAIN QUERY PLAN lines that read a whole table without an index."""
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        details = [row[-1] for row in cur.fetchall()]
+    finally:
+        raw.close()
+    return [d for d in details if d.startswith("SCAN ") and " USING " not in d and "CONSTANT ROW" not in d]
+
+
+def test_chat_queries_do_not_scan_tables(client, make_user, auth_headers):
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    task = Task(title="Errand", user_id=alice.id, assignee_id=bob.id, status="assigned")
+    db.session.add(task)
+    db.session.commit()
+    ha = auth_headers(alice)
+    for i in range(3):
+        _dm(client, ha, bob, f"dm {i}")
+        client.post(f"/chat/task/{task.id}/send", headers=ha, json={"content": f"task {i}"})
+
+    engine = db.engine
+    captured, stop = _captured_selects(engine)
+    try:
+        for url in (
+            f"/chat/messages/{bob.id}",
+            f"/chat/messages/{bob.id}?limit=2",
+            f"/chat/messages/{bob.id}?after_id=1",
+            f"/chat/messages/{bob.id}?before_id=5&limit=2",
+            f"/chat/task/{task.id}",
+            f"/chat/task/{task.id}?after_id=1",
+            f"/chat/task/{task.id}?before_id=5&limit=2",
+            "/chat/overview",
+        ):
+            assert client.get(url, headers=ha).status_code == 200, url
+    finally:
+        stop()
+
+    assert captured
+    for statement, parameters in captured:
+        scans = _table_scans(engine, statement, parameters)
+        assert not scans, f"full table scan {scans} in:\n{statement}"
+
+
+def _socket(app, client, token=None):
+    socketio = app.extensions["socketio"]
+    auth = {"token": token} if token else None
+    return socketio.test_client(app, flask_test_client=client, auth=auth)
+
+
+def test_socket_requires_jwt_and_participation(app, client, make_user, auth_headers):
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    carol = make_user(email="carol@student.kpu.ca")
+    task = Task(title="Errand", user_id=alice.id, assignee_id=bob.id, status="assigned")
+    db.session.add(task)
+    db.session.commit()
+
+    assert not _socket(app, client).is_connected()
+    assert not _socket(app, client, "not-a-jwt").is_connected()
+
+    token = auth_headers(carol)["Authorization"].split()[1]
+    sock = _socket(app, client, token)
+    assert sock.is_connected()
+    assert sock.emit("join", {"task_id": task.id}, callback=True) == {"ok": False}
+    assert sock.emit("join", {"other_id": alice.id}, callback=True)["ok"] is True
+    sock.disconnect()
+
+
+def test_sent_messages_are_pushed_to_the_conversation_room(app, client, make_user, auth_headers):
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    carol = make_user(email="carol@student.kpu.ca")
+    task = Task(title="Errand", user_id=alice.id, assignee_id=bob.id, status="assigned")
+    db.session.add(task)
+    db.session.commit()
+
+    bob_sock = _socket(app, client, auth_headers(bob)["Authorization"].split()[1])
+    carol_sock = _socket(app, client, auth_headers(carol)["Authorization"].split()[1])
+    bob_sock.emit("join", {"task_id": task.id}, callback=True)
+    bob_sock.emit("join", {"other_id": alice.id}, callback=True)
+    carol_sock.emit("join", {"other_id": alice.id}, callback=True)
+    bob_sock.get_received()
+    carol_sock.get_received()
+
+    sent = _dm(client, auth_headers(alice), bob, "hello bob")
+    client.post(f"/chat/task/{task.id}/send", headers=auth_headers(alice), json={"content": "task note"})
+
+    pushed = [e["args"][0] for e in bob_sock.get_received() if e["name"] == "chat_message"]
+    assert [m["content"] for m in pushed] == ["hello bob", "task note"]
+    assert pushed[0]["id"] == sent["id"]
+    # carol's room with alice is a different conversation
+    assert carol_sock.get_received() == []
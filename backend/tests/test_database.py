@@ -0,0 +1,22 @@
+from sqlalchemy import text
+
+from config import engine_options
+from database import db
+
+
+def test_sqlite_connections_use_wal_and_pragmas(app):
+    with db.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == app.config["SQLITE_BUSY_TIMEOUT_MS"]
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == app.config["SQLITE_CACHE_SIZE"]
+
+
+def test_engine_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "1")
+    opts = engine_options("mysql+pymysql://u:p@db/errandbuddy")
+    assert (opts["pool_size"], opts["max_overflow"], opts["pool_recycle"]) == (3, 1, 1800)
+    assert opts["pool_pre_ping"] is True
+    assert engine_options("sqlite:///x.db")["pool_pre_ping"] is False
+    assert engine_options("sqlite://") == {}
@@ -0,0 +1,62 @@
+from sqlalchemy import event
+
+from database import db
+
+
+def _revalidate(client, url, etag, headers=None):
+    """GET with If-None-Match; returns (response, SQL statements run)."""
+    statements = []
+
+    def _before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before)
+    try:
+        resp = client.get(url, headers={**(headers or {}), "If-None-Match": f'W/"{etag}"'})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before)
+    return resp, statements
+
+
+def _etag(resp):
+    assert resp.status_code == 200
+    etag, weak = resp.get_etag()
+    assert weak and etag
+    return etag
+
+
+def test_unchanged_lists_answer_304_from_the_version_table(client, make_user, auth_headers):
+    headers = auth_headers(make_user())
+    client.post("/tasks", headers=headers, json={"title": "Library pickup"})
+    for url in ("/tasks", "/tasks?limit=1", "/rides", "/study"):
+        etag = _etag(client.get(url))
+        resp, statements = _revalidate(client, url, etag)
+        assert resp.status_code == 304 and resp.get_data() == b""
+        assert resp.get_etag() == (etag, True)
+        # one lookup of the counters; the listed rows are never read
+        assert len(statements) == 1 and "collection_versions" in statements[0]
+
+
+def test_writes_change_only_the_tags_they_affect(client, make_user, auth_headers):
+    alice, bob = make_user(), make_user(email="bob@student.kpu.ca")
+    ha, hb = auth_headers(alice), auth_headers(bob)
+    tasks, rides = _etag(client.get("/tasks")), _etag(client.get("/rides"))
+    bob_profile = _etag(client.get(f"/users/{bob.id}"))
+
+    client.post("/tasks", headers=ha, json={"title": "Groceries"})
+    assert _revalidate(client, "/tasks", tasks)[0].status_code == 200
+    assert _revalidate(client, "/rides", rides)[0].status_code == 304
+
+    inbox = _etag(client.get("/chat/overview", headers=hb))
+    client.post("/chat/send", headers=ha, json={"receiver_id": bob.id, "content": "hi"})
+    resp = _revalidate(client, "/chat/overview", inbox, hb)[0]
+    assert resp.status_code == 200 and resp.get_json()[0]["unread"] == 1
+    inbox = _etag(resp)
+    client.post("/chat/read", headers=hb, json={"other_id": alice.id})
+    assert _revalidate(client, "/chat/overview", inbox, hb)[0].status_code == 200
+
+    # alice's profile change is visible in bob's overview, not in bob's profile
+    inbox = _etag(client.get("/chat/overview", headers=hb))
+    client.put("/users/me", headers=ha, json={"first_name": "Alice"})
+    assert _revalidate(client, "/chat/overview", inbox, hb)[0].status_code == 200
+    assert _revalidate(client, f"/users/{bob.id}", bob_profile)[0].status_code == 304
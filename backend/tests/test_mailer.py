@@ -0,0 +1,177 @@
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+import mailer
+from database import db
+from models.outbound_email import OutboundEmail
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough of RFC 5321 (plus AUTH PLAIN) for smtplib."""
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply("220 localhost test SMTP")
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "AUTH":
+                server.logins += 1
+                self.reply("235 Authentication successful")
+            elif verb == "MAIL":
+                self.rcpt = None
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                self.rcpt = line.split(":", 1)[1].strip(" <>")
+                code = server.rcpt_replies.pop(0) if server.rcpt_replies else 250
+                self.reply(f"{code} {'OK' if code == 250 else 'Rejected'}")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                server.delivered.append(self.rcpt)
+                self.reply("250 Queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+@pytest.fixture()
+def smtp_server(monkeypatch):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpHandler)
+    server.daemon_threads = True
+    server.connections, server.logins, server.delivered, server.rcpt_replies = 0, 0, [], []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for key, value in {"SMTP_HOST": "127.0.0.1", "SMTP_PORT": str(server.server_address[1]),
+                       "SMTP_USER": "relay", "SMTP_PASSWORD": "secret", "SMTP_FROM": "noreply@kpu.test",
+                       "SMTP_USE_TLS": "false", "SMTP_USE_SSL": "false"}.items():
+        monkeypatch.setenv(key, value)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_register_only_enqueues(client):
+    resp = client.post("/auth/register", json={"email": "new@student.kpu.ca", "password": "pw"})
+    assert resp.status_code == 201
+    queued = OutboundEmail.query.one()
+    assert queued.to_addr == "new@student.kpu.ca"
+    assert queued.status == "pending"
+    assert "verification code" in queued.body
+
+
+def test_batch_reuses_one_authenticated_session(app, smtp_server):
+    for i in range(5):
+        mailer.enqueue_email(f"user{i}@student.kpu.ca", "Hi", "Body")
+    db.session.commit()
+
+    transport = mailer.SmtpSession(mailer.smtp_settings())
+    assert mailer.deliver_batch(db.session, transport, limit=3) == 3
+    assert mailer.deliver_batch(db.session, transport) == 2
+    assert mailer.deliver_batch(db.session, transport) == 0
+    transport.close()
+
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+    assert len(smtp_server.delivered) == 5
+    assert {m.status for m in OutboundEmail.query} == {"sent"}
+
+
+def test_temporary_failures_back_off_and_permanent_ones_stop(app, smtp_server):
+    temp = mailer.enqueue_email("later@student.kpu.ca", "Hi", "Body")
+    bad = mailer.enqueue_email("nobody@student.kpu.ca", "Hi", "Body")
+    db.session.commit()
+    smtp_server.rcpt_replies = [451, 550]
+
+    transport = mailer.SmtpSession(mailer.smtp_settings())
+    mailer.deliver_batch(db.session, transport)
+    db.session.refresh(temp)
+    db.session.refresh(bad)
+    assert (temp.status, temp.attempts) == ("pending", 1)
+    assert temp.next_attempt_at > datetime.utcnow() + timedelta(seconds=mailer.MAIL_BACKOFF_SECONDS - 1)
+    assert bad.status == "failed"
+    # not due yet
+    assert mailer.deliver_batch(db.session, transport) == 0
+
+    temp.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    assert mailer.deliver_batch(db.session, transport) == 1
+    db.session.refresh(temp)
+    assert (temp.status, temp.attempts) == ("sent", 2)
+    transport.close()
+    assert smtp_server.delivered == ["later@student.kpu.ca"]
+
+
+def test_worker_pool_delivers_after_commit(app, smtp_server):
+    pool = mailer.init_app(app, workers=2)
+    try:
+        mailer.enqueue_email("a@student.kpu.ca", "Hi", "Body")
+        mailer.enqueue_email("b@student.kpu.ca", "Hi", "Body")
+        db.session.commit()
+        for _ in range(100):
+            if len(smtp_server.delivered) == 2:
+                break
+            threading.Event().wait(0.05)
+    finally:
+        for worker in pool:
+            worker.stop()
+        for worker in pool:
+            worker.join(timeout=5)
+    assert sorted(smtp_server.delivered) == ["a@student.kpu.ca", "b@student.kpu.ca"]
+
+
+def test_messages_reclaimed_mid_batch_are_not_sent_twice(app):
+    first = mailer.enqueue_email("a@student.kpu.ca", "Hi", "Body")
+    second = mailer.enqueue_email("b@student.kpu.ca", "Hi", "Body")
+    db.session.commit()
+    first_id, second_id = first.id, second.id
+    reclaimed = []
+
+    class SlowTransport:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, to_addr, subject, body):
+            self.sent.append(to_addr)
+            if len(self.sent) == 1:
+                # this send outlasts the lease on the rest of the batch,
+                # and another worker picks up what is left
+                with Session(db.engine) as other:
+                    other.execute(update(OutboundEmail).where(OutboundEmail.id == second_id).values(
+                        claimed_at=datetime.utcnow() - timedelta(seconds=mailer.MAIL_CLAIM_LEASE_SECONDS + 1)))
+                    other.commit()
+                    reclaimed.extend(m.id for m in mailer.claim_batch(other))
+
+        def close(self):
+            pass
+
+    transport = SlowTransport()
+    assert mailer.deliver_batch(db.session, transport) == 1
+    assert reclaimed == [second_id]
+    assert transport.sent == ["a@student.kpu.ca"]
+    assert db.session.get(OutboundEmail, first_id).status == "sent"
+
+
+def test_create_app_leaves_the_workers_to_the_server(app):
+    # scripts build the app too; only app.py's server starts the senders
+    assert "mailer" not in app.extensions and "otp_purger" not in app.extensions
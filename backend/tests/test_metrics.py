@@ -0,0 +1,75 @@
+import os
+
+import metrics
+
+
+def _scrape(client):
+    client.application.config["METRICS_TOKEN"] = "scrape-secret"
+    resp = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain")
+    return resp.get_data(as_text=True)
+
+
+def test_requests_and_sql_show_up_in_metrics(client, make_user, auth_headers):
+    user = make_user()
+    assert client.get("/tasks", headers=auth_headers(user)).status_code == 200
+    # werkzeug error bodies are iterators, recorded when the server closes them
+    client.get("/no-such-page").close()
+
+    body = _scrape(client)
+    assert 'http_requests_total{endpoint="tasks.list_tasks",method="GET",status="200"}' in body
+    assert 'http_requests_total{endpoint="<unmatched>",method="GET",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{endpoint="tasks.list_tasks",method="GET",le="+Inf"}' in body
+    assert 'http_response_size_bytes_count{endpoint="tasks.list_tasks"}' in body
+    sql_line = next(line for line in body.splitlines()
+                    if line.startswith('db_statements_total{endpoint="tasks.list_tasks"}'))
+    assert float(sql_line.split()[-1]) >= 1
+
+
+def test_slow_requests_are_logged_with_their_sql(client, make_user, auth_headers, monkeypatch):
+    monkeypatch.setattr(metrics, "SLOW_REQUEST_MS", 0)
+    user = make_user()
+    client.get("/tasks", headers=auth_headers(user))
+    for handler in metrics.slow_log.handlers:
+        handler.flush()
+    with open(os.environ["SLOW_REQUEST_LOG"], encoding="utf-8") as f:
+        log = f.read()
+    assert "GET /tasks endpoint=tasks.list_tasks status=200" in log
+    assert "SELECT" in log
+
+
+def test_socket_events_are_counted(app, client, make_user, auth_headers):
+    user = make_user()
+    token = auth_headers(user)["Authorization"].split()[1]
+    sock = app.extensions["socketio"].test_client(app, flask_test_client=client, auth={"token": token})
+    assert sock.is_connected()
+    sock.emit("join", {"other_id": user.id + 1}, callback=True)
+    sock.disconnect()
+
+    body = _scrape(client)
+    assert 'socketio_events_total{event="connect",direction="in"}' in body
+    assert 'socketio_events_total{event="join",direction="in"}' in body
+
+
+def test_metrics_need_the_scrape_token(client):
+    client.application.config["METRICS_TOKEN"] = None
+    assert client.get("/metrics").status_code == 404
+    client.application.config["METRICS_TOKEN"] = "scrape-secret"
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+
+def test_streamed_responses_count_the_sql_of_their_body(client, make_user, auth_headers):
+    user = make_user()
+    for i in range(3):
+        client.post("/tasks", headers=auth_headers(user), json={"title": f"Task {i}"})
+    with client.get("/overview") as resp:
+        assert resp.is_streamed
+        assert resp.get_json()["count"] == 3
+
+    body = _scrape(client)
+    assert 'http_requests_total{endpoint="overview",method="GET",status="200"}' in body
+    sql_line = next(line for line in body.splitlines()
+                    if line.startswith('db_statements_total{endpoint="overview"}'))
+    assert float(sql_line.split()[-1]) >= 1
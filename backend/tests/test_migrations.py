@@ -0,0 +1,90 @@
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+
+_LEGACY_SCHEMA = (
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL, "
+    "email VARCHAR(120) NOT NULL UNIQUE, password_hash VARCHAR(200) NOT NULL, bio VARCHAR(300), "
+    "created_at DATETIME)",
+    "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, description VARCHAR(1000), "
+    "user_id INTEGER NOT NULL, created_at DATETIME)",
+    "CREATE TABLE messages (id INTEGER PRIMARY KEY, sender_id INTEGER NOT NULL, receiver_id INTEGER, "
+    "content VARCHAR(2000), timestamp DATETIME)",
+    "CREATE TABLE email_otps (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL UNIQUE, "
+    "code_hash VARCHAR(200) NOT NULL, expires_at DATETIME NOT NULL, attempts INTEGER, verified BOOLEAN, "
+    "created_at DATETIME, updated_at DATETIME)",
+    "INSERT INTO users (id, username, email, password_hash) VALUES "
+    "(1, 'a', 'a@student.kpu.ca', 'x'), (2, 'b', 'b@student.kpu.ca', 'x')",
+    "INSERT INTO email_otps (user_id, code_hash, expires_at, verified) VALUES (2, 'x', '2020-01-01', 0)",
+    "INSERT INTO tasks (id, title, description, user_id, created_at) VALUES "
+    "(1, 'Library pickup', 'Return my books\nLocation: Surrey', 1, '2024-01-01')",
+    "INSERT INTO messages (sender_id, receiver_id, content, timestamp) VALUES (1, 2, 'hi', '2024-01-01')",
+)
+
+
+def test_baseline_upgrades_a_legacy_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for stmt in _LEGACY_SCHEMA:
+            conn.execute(text(stmt))
+    assert migrations.current_version(engine) == 0
+
+    assert migrations.upgrade(engine, log=lambda *_: None) == [m.VERSION for m in migrations.MIGRATIONS]
+    assert migrations.current_version(engine) == migrations.LATEST_VERSION
+
+    insp = inspect(engine)
+    assert {"location", "reward_cents", "assignee_id"} <= {c["name"] for c in insp.get_columns("tasks")}
+    assert "ix_tasks_created_id" in {i["name"] for i in insp.get_indexes("tasks")}
+    assert "ix_email_otps_expires_at" in {i["name"] for i in insp.get_indexes("email_otps")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT location FROM tasks")).scalar() == "Surrey"
+        assert conn.execute(text("SELECT id FROM users WHERE email_verified ORDER BY id")).fetchall() == [(1,)]
+        assert conn.execute(text("SELECT COUNT(*) FROM conversations")).scalar() == 1
+        assert conn.execute(text("SELECT COUNT(*) FROM search_documents")).scalar() == 1
+        # existing rows are in the sync log from the start
+        assert conn.execute(text("SELECT kind FROM change_log ORDER BY seq")).scalars().all() == ["task", "message"]
+
+    # a second run is only the version check
+    assert migrations.upgrade(engine) == []
+    engine.dispose()
+
+
+def test_new_database_gets_the_full_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    migrations.upgrade(engine, log=lambda *_: None)
+    tables = set(inspect(engine).get_table_names())
+    assert {"users", "tasks", "conversations", "outbound_emails", "schema_version"} <= tables
+    assert migrations.current_version(engine) == migrations.LATEST_VERSION
+    engine.dispose()
+
+
+def test_tasks_without_a_status_become_open(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'status.db'}")
+    migrations.upgrade(engine, target=4, log=lambda *_: None)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, username, email, password_hash, email_verified) "
+                          "VALUES (1, 'a', 'a@x', 'x', 1)"))
+        conn.execute(text("INSERT INTO tasks (id, title, user_id, status) VALUES "
+                          "(1, 'legacy', 1, NULL), (2, 'blank', 1, ''), (3, 'done', 1, 'done')"))
+        conn.execute(text("DELETE FROM change_log"))
+
+    migrations.upgrade(engine, log=lambda *_: None)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT status FROM tasks ORDER BY id")).scalars().all() == ["open", "open", "done"]
+        # synced clients get the fixed rows
+        assert conn.execute(text("SELECT ref_id FROM change_log ORDER BY seq")).scalars().all() == [1, 2]
+    engine.dispose()
+
+
+def test_unread_counters_are_dropped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'unread.db'}")
+    migrations.upgrade(engine, target=5, log=lambda *_: None)
+    with engine.begin() as conn:
+        # databases migrated while the model still had the counters
+        conn.execute(text("ALTER TABLE conversations ADD COLUMN unread_a INTEGER"))
+        conn.execute(text("ALTER TABLE conversations ADD COLUMN unread_b INTEGER"))
+
+    assert migrations.upgrade(engine, log=lambda *_: None) == [6]
+    columns = {c["name"] for c in inspect(engine).get_columns("conversations")}
+    assert not columns & {"unread_a", "unread_b"}
+    engine.dispose()
@@ -0,0 +1,72 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from database import db
+from models.task import Task
+from models.user import User
+
+
+def _seed(count):
+    users = [User(username=f"owner{i}", email=f"owner{i}@student.kpu.ca", password_hash="x") for i in range(count)]
+    db.session.add_all(users)
+    db.session.flush()
+    base = datetime(2024, 1, 1)
+    db.session.add_all([Task(title=f"Task {i}", description="", user_id=u.id, created_at=base + timedelta(minutes=i))
+                        for i, u in enumerate(users)])
+    db.session.commit()
+
+
+def _get(client, url):
+    statements = []
+
+    def _before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before)
+    try:
+        resp = client.get(url)
+        body = resp.get_data(as_text=True)  # the stream runs here
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before)
+    assert resp.status_code == 200
+    assert "Content-Length" not in resp.headers  # streamed, not buffered
+    return body, statements
+
+
+def test_overview_streams_all_tasks_in_one_query(client):
+    _seed(450)
+    body, statements = _get(client, "/overview")
+    data = json.loads(body)
+    assert data["count"] == 450
+    assert data["tasks"][0]["title"] == "Task 449"
+    assert data["tasks"][0]["username"] == "owner449"
+    # owners come from the join, not one lazy load per task
+    assert len([s for s in statements if "FROM tasks" in s]) == 1
+    assert not [s for s in statements if "FROM users" in s and "tasks" not in s]
+
+
+def test_overview_pages_follow_the_cursor(client):
+    _seed(5)
+    seen, url = [], "/overview?limit=2"
+    while url:
+        data = json.loads(_get(client, url)[0])
+        assert data["count"] <= 2
+        seen += [t["title"] for t in data["tasks"]]
+        url = f"/overview?limit=2&cursor={data['next_cursor']}" if data["next_cursor"] else None
+    assert seen == [f"Task {i}" for i in range(4, -1, -1)]
+    assert client.get("/overview?cursor=garbage").status_code == 400
+
+
+def test_admin_tasks_escapes_and_links_next_page(client, make_user):
+    owner = make_user()
+    db.session.add_all([Task(title="<script>x</script>", user_id=owner.id),
+                        Task(title="Plain", user_id=owner.id)])
+    db.session.commit()
+    body, _ = _get(client, "/admin/tasks?limit=1")
+    assert body.count("<tr><td>") == 1
+    assert "Next page" in body
+    body, _ = _get(client, "/admin/tasks")
+    assert "&lt;script&gt;" in body and "<script>" not in body
+    assert "Next page" not in body
@@ -0,0 +1,53 @@
+from models.ride import Ride, ride_area, ride_topic
+
+
+def _socket(app, client, headers):
+    token = headers["Authorization"].split()[1]
+    return app.extensions["socketio"].test_client(app, flask_test_client=client, auth={"token": token})
+
+
+def _pushed(sock, name):
+    return [e["args"][0] for e in sock.get_received() if e["name"] == name]
+
+
+def test_ride_topics_cover_every_filter_combination():
+    ride = Ride(origin="KPU Surrey campus", destination="Downtown", kind="offer")
+    assert ride_area(ride.origin) == "surrey"
+    assert ride_area(ride.destination) == "other"
+    topics = ride.topics()
+    assert len(set(topics)) == 8
+    assert ride_topic("offer", "surrey", "other") in topics
+    assert ride_topic() in topics
+    assert ride_topic("request") not in topics
+
+
+def test_ride_events_reach_only_matching_subscribers(app, client, make_user, auth_headers):
+    driver = make_user()
+    headers = auth_headers(driver)
+    surrey = _socket(app, client, auth_headers(make_user(email="s@student.kpu.ca")))
+    requests_only = _socket(app, client, auth_headers(make_user(email="r@student.kpu.ca")))
+    everything = _socket(app, client, auth_headers(make_user(email="e@student.kpu.ca")))
+    assert surrey.emit("subscribe_rides", {"origin": "Surrey"}, callback=True)["ok"]
+    assert requests_only.emit("subscribe_rides", {"kind": "request"}, callback=True)["ok"]
+    assert everything.emit("subscribe_rides", {}, callback=True)["room"] == ride_topic()
+    assert not everything.emit("subscribe_rides", {"origin": "Mars"}, callback=True)["ok"]
+
+    resp = client.post("/rides", headers=headers,
+                       json={"origin": "Surrey", "destination": "Langley", "time": "9am"})
+    ride_id = resp.get_json()["ride"]["id"]
+    assert [r["id"] for r in _pushed(surrey, "ride_created")] == [ride_id]
+    assert [r["id"] for r in _pushed(everything, "ride_created")] == [ride_id]
+    assert requests_only.get_received() == []
+
+    client.delete(f"/rides/{ride_id}", headers=headers)
+    assert [r["id"] for r in _pushed(surrey, "ride_deleted")] == [ride_id]
+
+    # changing the filter moves the socket to a single new room
+    surrey.emit("subscribe_rides", {"origin": "Richmond"}, callback=True)
+    client.post("/rides", headers=headers, json={"origin": "Surrey", "destination": "x", "time": "1pm"})
+    assert surrey.get_received() == []
+
+
+def test_ride_subscription_requires_authenticated_socket(app, client):
+    sock = app.extensions["socketio"].test_client(app, flask_test_client=client)
+    assert not sock.is_connected()
@@ -0,0 +1,73 @@
+import pytest
+
+import search
+from database import db
+from models.search import SearchDocument
+from models.study_session import StudySession
+from models.task import Task
+
+
+def _seed(owner):
+    db.session.add_all([
+        StudySession(user_id=owner.id, course="CPSC 1150", teacher="Dr. Lee", description="Intro to programming"),
+        StudySession(user_id=owner.id, course="MATH 1120", description="Calculus review, some programming"),
+        StudySession(user_id=owner.id, course="BIOL 1110", description="Cells"),
+        Task(title="Pick up programming textbook", description="From the Surrey library", user_id=owner.id),
+        Task(title="Groceries", description="Milk and eggs", user_id=owner.id),
+    ])
+    db.session.commit()
+
+
+@pytest.fixture(params=["fts5", "ngram"])
+def backend(request, monkeypatch):
+    if request.param == "ngram":
+        monkeypatch.setattr(search, "SEARCH_BACKEND", "ngram")
+    return request.param
+
+
+def test_search_ranks_title_matches_first(client, make_user, backend):
+    _seed(make_user())
+    data = client.get("/search?q=program").get_json()
+    titles = [r["item"].get("title") or r["item"].get("course") for r in data["results"]]
+    assert set(titles) == {"CPSC 1150", "MATH 1120", "Pick up programming textbook"}
+    assert titles[0] == "Pick up programming textbook"  # the only title match
+    assert data["next_offset"] is None
+
+    first = client.get("/search?q=program&kind=study&limit=1").get_json()
+    assert first["next_offset"] == 1
+    second = client.get("/search?q=program&kind=study&limit=1&offset=1").get_json()
+    assert second["next_offset"] is None
+    courses = {r["item"]["course"] for r in first["results"] + second["results"]}
+    assert courses == {"CPSC 1150", "MATH 1120"}
+    assert client.get("/search?q=cps 115").get_json()["results"][0]["item"]["course"] == "CPSC 1150"
+    assert client.get("/search?q=surrey library").get_json()["results"][0]["kind"] == "task"
+    assert client.get("/search?q=x").status_code == 400
+
+
+def test_index_follows_writes(client, make_user, auth_headers, backend):
+    owner = make_user()
+    headers = auth_headers(owner)
+    created = client.post("/study", headers=headers, json={"course": "CHEM 1210"}).get_json()["session"]
+    assert [s["id"] for s in client.get("/study?q=chem").get_json()] == [created["id"]]
+
+    client.put(f"/study/{created['id']}", headers=headers, json={"course": "PHYS 1100"})
+    assert client.get("/study?q=chem").get_json() == []
+    assert len(client.get("/study?q=phys").get_json()) == 1
+
+    task = client.post("/tasks", headers=headers, json={"title": "Return keys"}).get_json()["task"]
+    assert client.get("/search?q=keys").get_json()["results"][0]["id"] == task["id"]
+    client.delete(f"/tasks/{task['id']}", headers=headers)
+    assert client.get("/search?q=keys").get_json()["results"] == []
+    assert SearchDocument.query.filter_by(kind="task").count() == 0
+
+
+def test_rebuild_indexes_existing_rows(app, make_user):
+    _seed(make_user())
+    db.session.query(SearchDocument).delete()
+    db.session.commit()
+    assert search.search(db.session, "cells")[0] == []
+
+    search.rebuild_search_index(db.engine, batch_size=2)
+    hits, _ = search.search(db.session, "cells")
+    assert [kind for kind, _, _ in hits] == ["study"]
+    assert SearchDocument.query.count() == 5
@@ -0,0 +1,66 @@
+from sqlalchemy import event
+
+from database import db
+from models.study_session import StudySession
+
+
+def _count_statements(client, url):
+    count = 0
+
+    def _before(*args):
+        nonlocal count
+        count += 1
+
+    event.listen(db.engine, "before_cursor_execute", _before)
+    try:
+        resp = client.get(url)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before)
+    assert resp.status_code == 200
+    return count, resp.get_json()
+
+
+def _seed_sessions(count):
+    from models.user import User
+    start = User.query.count()
+    users = [User(username=f"user{start + i}", email=f"user{start + i}@student.kpu.ca", password_hash="x",
+                  first_name="First", last_name=f"Last{i}") for i in range(count)]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add_all([StudySession(user_id=u.id, course=f"CPSC {1100 + i}", campus="Surrey")
+                        for i, u in enumerate(users)])
+    db.session.commit()
+
+
+def test_list_sessions_includes_owner_fields(client, make_user):
+    owner = make_user()
+    db.session.add(StudySession(user_id=owner.id, course="MATH 1120", campus="Langley"))
+    db.session.commit()
+    _, data = _count_statements(client, "/study?campus=langley&q=math")
+    assert data[0]["owner"] == {"id": owner.id, "username": "alice", "first_name": "", "last_name": ""}
+
+
+def test_list_sessions_query_count_is_constant(client):
+    _seed_sessions(3)
+    small, data = _count_statements(client, "/study")
+    assert len(data) == 3
+    _seed_sessions(40)
+    large, data = _count_statements(client, "/study")
+    assert len(data) == 43
+    assert all(item["owner"]["last_name"].startswith("Last") for item in data)
+    assert large == small <= 2
+
+
+def test_course_query_matches_substrings(client, make_user):
+    owner = make_user()
+    db.session.add_all([StudySession(user_id=owner.id, course=course, campus="Surrey")
+                        for course in ("CPSC1150", "MATH 1120", "CPSC 2221")])
+    db.session.commit()
+    courses = lambda q: sorted(s["course"] for s in client.get("/study", query_string={"q": q}).get_json())
+
+    assert courses("1150") == ["CPSC1150"]
+    assert courses("psc") == ["CPSC 2221", "CPSC1150"]
+    assert courses("SC 22") == ["CPSC 2221"]
+    # too short for trigrams: a plain substring scan
+    assert courses("5") == ["CPSC1150"]
+    assert courses("11") == ["CPSC1150", "MATH 1120"]
@@ -0,0 +1,77 @@
+import changelog
+from database import db
+from versions import current_versions
+
+
+def _sync(client, headers, since=None, **params):
+    if since:
+        params["since"] = since
+    resp = client.get("/sync", headers=headers, query_string=params)
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def _ids(section, key="upserted"):
+    return [r["id"] for r in section[key]] if key == "upserted" else section[key]
+
+
+def test_sync_returns_changes_and_tombstones_since_the_token(client, make_user, auth_headers):
+    alice, bob = make_user(), make_user(email="bob@student.kpu.ca")
+    carol, dave = make_user(email="carol@student.kpu.ca"), make_user(email="dave@student.kpu.ca")
+    ha = auth_headers(alice)
+    task = client.post("/tasks", headers=ha, json={"title": "Groceries"}).get_json()["task"]
+    ride = client.post("/rides", headers=ha, json={"origin": "Surrey", "destination": "Langley",
+                                                   "time": "9am"}).get_json()["ride"]
+    client.post("/study", headers=ha, json={"course": "INFO 1112", "available": True, "campus": "Surrey"})
+    client.post("/chat/send", headers=ha, json={"receiver_id": bob.id, "content": "hi bob"})
+    client.post("/chat/send", headers=auth_headers(carol), json={"receiver_id": dave.id, "content": "private"})
+
+    first = _sync(client, ha)
+    assert not first["more"]
+    assert _ids(first["tasks"]) == [task["id"]] and _ids(first["rides"]) == [ride["id"]]
+    assert [s["course"] for s in first["study"]["upserted"]] == ["INFO 1112"]
+    # only the caller's own messages
+    assert [m["content"] for m in first["messages"]["upserted"]] == ["hi bob"]
+
+    client.put(f"/tasks/{task['id']}", headers=ha, json={"title": "Groceries and mail"})
+    client.delete(f"/rides/{ride['id']}", headers=ha)
+    second = _sync(client, ha, first["token"])
+    assert [t["title"] for t in second["tasks"]["upserted"]] == ["Groceries and mail"]
+    assert _ids(second["rides"], "deleted") == [ride["id"]] and not second["rides"]["upserted"]
+    assert not second["study"]["upserted"] and not second["messages"]["upserted"]
+
+    third = _sync(client, ha, second["token"])
+    assert all(not s["upserted"] and not s["deleted"] for k, s in third.items() if k not in ("token", "more"))
+
+
+def test_sync_pages_and_rejects_foreign_tokens(client, make_user, auth_headers):
+    owner = make_user()
+    headers = auth_headers(owner)
+    for i in range(5):
+        client.post("/tasks", headers=headers, json={"title": f"Task {i}"})
+    seen, token, more = [], None, True
+    while more:
+        page = _sync(client, headers, token, limit=2)
+        assert len(page["tasks"]["upserted"]) <= 2
+        seen += [t["title"] for t in page["tasks"]["upserted"]]
+        token, more = page["token"], page["more"]
+    assert seen == [f"Task {i}" for i in range(5)]
+
+    assert client.get("/sync?since=garbage", headers=headers).status_code == 400
+    unknown = changelog.encode_token(changelog.decode_token(token) + 100)
+    assert client.get(f"/sync?since={unknown}", headers=headers).status_code == 410
+    assert client.get("/sync").status_code == 401
+
+
+def test_synced_writes_take_the_log_lock_where_commits_can_reorder(client, make_user, auth_headers, monkeypatch):
+    headers = auth_headers(make_user())
+    client.post("/tasks", headers=headers, json={"title": "On SQLite"})
+    assert current_versions(db.session, [changelog.SYNC_LOCK]) == {changelog.SYNC_LOCK: 0}
+
+    # as on a database whose transactions can commit out of seq order
+    monkeypatch.setattr(changelog, "_SERIAL_DIALECTS", ())
+    client.post("/tasks", headers=headers, json={"title": "Elsewhere"})
+    locked = current_versions(db.session, [changelog.SYNC_LOCK])[changelog.SYNC_LOCK]
+    assert locked
+    client.put("/users/me", headers=headers, json={"first_name": "Alice"})
+    assert current_versions(db.session, [changelog.SYNC_LOCK])[changelog.SYNC_LOCK] == locked
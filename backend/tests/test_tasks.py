@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+
+from database import db
+from models.task import Task
+
+
+def _seed_tasks(owner, count, **fields):
+    base = datetime(2024, 1, 1)
+    tasks = []
+    for i in range(count):
+        t = Task(title=f"Task {i}", description="", user_id=owner.id,
+                 created_at=base + timedelta(minutes=i), **fields)
+        db.session.add(t)
+        tasks.append(t)
+    db.session.commit()
+    return tasks
+
+
+def test_list_tasks_without_limit_returns_full_list(client, make_user):
+    owner = make_user()
+    _seed_tasks(owner, 3)
+    resp = client.get("/tasks")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert isinstance(data, list)
+    assert [t["title"] for t in data] == ["Task 2", "Task 1", "Task 0"]
+
+
+def test_keyset_pages_cover_feed_without_overlap(client, make_user):
+    owner = make_user()
+    _seed_tasks(owner, 7)
+    # two tasks sharing a timestamp exercise the id tie-breaker
+    same = datetime(2025, 1, 1)
+    db.session.add_all([
+        Task(title="Tie A", user_id=owner.id, created_at=same),
+        Task(title="Tie B", user_id=owner.id, created_at=same),
+    ])
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = "/tasks?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url).get_json()
+        assert len(page["tasks"]) <= 3
+        seen.extend(t["id"] for t in page["tasks"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    expected = [t.id for t in Task.query.order_by(Task.created_at.desc(), Task.id.desc())]
+    assert seen == expected
+
+
+def test_filters_by_status_owner_and_assignee(client, make_user):
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    _seed_tasks(alice, 2)
+    _seed_tasks(bob, 2, status="assigned", assignee_id=alice.id)
+
+    mine = client.get(f"/tasks?limit=10&owner={alice.id}").get_json()["tasks"]
+    assert {t["user_id"] for t in mine} == {alice.id}
+    others = client.get(f"/tasks?limit=10&exclude_owner={alice.id}").get_json()["tasks"]
+    assert {t["user_id"] for t in others} == {bob.id}
+    assigned = client.get(f"/tasks?limit=10&status=assigned&assignee={alice.id}").get_json()["tasks"]
+    assert len(assigned) == 2
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/tasks?cursor=not-a-cursor").status_code == 400
+    assert client.get("/tasks?owner=abc").status_code == 400
+
+
+def test_parse_task_details_from_legacy_description():
+    from models.task import parse_task_details
+
+    d = parse_task_details("Pick up books\nReward: 5.50 | Deadline: 2024-03-01 17:00 | Location: kpu surrey")
+    assert d["reward_cents"] == 550
+    assert d["deadline_at"] == datetime(2024, 3, 1, 17, 0)
+    assert d["location"] == "Surrey"
+    assert parse_task_details("Deadline: someday")["deadline_at"] is None
+
+
+def test_parse_reward_cents_reads_thousands_separators():
+    from models.task import parse_reward_cents
+
+    assert parse_reward_cents("1,000") == 100000
+    assert parse_reward_cents("$1,250.50") == 125050
+    # a comma with one or two digits after it is a decimal point
+    assert parse_reward_cents("5,50") == 550
+    assert parse_reward_cents("$10") == 1000
+
+
+def test_create_task_stores_typed_details(client, make_user, auth_headers):
+    user = make_user()
+    resp = client.post("/tasks", headers=auth_headers(user), json={
+        "title": "Groceries", "description": "Milk", "reward": "10",
+        "deadline": "2024-05-01", "location": "Langley",
+    })
+    assert resp.status_code == 201
+    task = resp.get_json()["task"]
+    assert task["reward_cents"] == 1000
+    assert task["deadline_at"] == "2024-05-01T00:00:00"
+    assert task["location"] == "Langley"
+
+    bad = client.post("/tasks", headers=auth_headers(user), json={"title": "x", "deadline": "soon"})
+    assert bad.status_code == 400
+
+
+def test_update_clears_details_removed_from_the_description(client, make_user, auth_headers):
+    headers = auth_headers(make_user())
+    task = client.post("/tasks", headers=headers, json={
+        "title": "Groceries", "description": "Milk | Reward: $5 | Deadline: 2024-05-01"}).get_json()["task"]
+    assert task["reward_cents"] == 500 and task["deadline_at"]
+
+    resp = client.put(f"/tasks/{task['id']}", headers=headers, json={"description": "Milk | Reward: $5"})
+    updated = resp.get_json()["task"]
+    assert updated["reward_cents"] == 500 and updated["deadline_at"] is None
+
+    # an explicit field alone leaves the rest as they were
+    resp = client.put(f"/tasks/{task['id']}", headers=headers, json={"location": "Surrey"})
+    updated = resp.get_json()["task"]
+    assert updated["reward_cents"] == 500 and updated["location"] == "Surrey"
+
+
+def test_plain_description_edit_keeps_explicit_details(client, make_user, auth_headers):
+    headers = auth_headers(make_user())
+    task = client.post("/tasks", headers=headers, json={
+        "title": "T", "description": "Milk", "reward": "5", "deadline": "2025-01-01",
+        "location": "Surrey"}).get_json()["task"]
+
+    updated = client.put(f"/tasks/{task['id']}", headers=headers,
+                         json={"description": "Milk and eggs"}).get_json()["task"]
+    assert (updated["reward_cents"], updated["deadline_at"], updated["location"]) == \
+        (500, "2025-01-01T00:00:00", "Surrey")
+
+    # details written in the new text apply; explicit fields still win over them
+    updated = client.put(f"/tasks/{task['id']}", headers=headers, json={
+        "description": "Milk | Reward: $8 | Location: Langley", "location": "Richmond"}).get_json()["task"]
+    assert (updated["reward_cents"], updated["deadline_at"], updated["location"]) == \
+        (800, "2025-01-01T00:00:00", "Richmond")
+
+
+def test_location_filter_and_deadline_sort(client, make_user):
+    owner = make_user()
+    db.session.add_all([
+        Task(title="late", user_id=owner.id, location="Surrey", deadline_at=datetime(2024, 6, 1)),
+        Task(title="soon", user_id=owner.id, location="Surrey", deadline_at=datetime(2024, 5, 1)),
+        Task(title="none", user_id=owner.id, location="Surrey"),
+        Task(title="elsewhere", user_id=owner.id, location="Richmond", deadline_at=datetime(2024, 4, 1)),
+    ])
+    db.session.commit()
+
+    surrey = client.get("/tasks?limit=10&location=surrey").get_json()["tasks"]
+    assert {t["title"] for t in surrey} == {"late", "soon", "none"}
+    first = client.get("/tasks?limit=1&sort=deadline&location=Surrey").get_json()
+    assert [t["title"] for t in first["tasks"]] == ["soon"]
+    second = client.get(f"/tasks?limit=1&sort=deadline&location=Surrey&cursor={first['next_cursor']}").get_json()
+    assert [t["title"] for t in second["tasks"]] == ["late"]
+    assert second["next_cursor"] is None
+
+
+def test_backfill_parses_legacy_descriptions_in_batches(app, make_user):
+    from migrations.m0001_baseline import _backfill_task_details
+
+    owner = make_user()
+    for i in range(5):
+        db.session.add(Task(title=f"legacy {i}", user_id=owner.id,
+                            description=f"Reward: {i} | Location: Richmond"))
+    db.session.add(Task(title="plain", user_id=owner.id, description="nothing to parse"))
+    db.session.commit()
+
+    _backfill_task_details(db.engine, batch_size=2)
+    db.session.expire_all()
+    legacy = Task.query.filter(Task.title.like("legacy%")).order_by(Task.id).all()
+    assert [t.reward_cents for t in legacy] == [0, 100, 200, 300, 400]
+    assert {t.location for t in legacy} == {"Richmond"}
+    assert Task.query.filter_by(title="plain").one().location is None
@@ -0,0 +1,22 @@
+def test_batch_lookup_keeps_request_order_and_skips_unknown_ids(client, make_user, auth_headers):
+    alice = make_user()
+    bob = make_user(email="bob@student.kpu.ca")
+    resp = client.get(f"/users?ids={bob.id},999,{alice.id},{bob.id}", headers=auth_headers(alice))
+    assert resp.status_code == 200
+    users = resp.get_json()["users"]
+    assert [u["id"] for u in users] == [bob.id, alice.id]
+    # names only: no email or other contact details
+    assert users[0] == {"id": bob.id, "username": "bob", "first_name": "", "last_name": ""}
+
+
+def test_batch_lookup_rejects_bad_input(client, make_user, auth_headers):
+    headers = auth_headers(make_user())
+    assert client.get("/users", headers=headers).status_code == 400
+    assert client.get("/users?ids=1,x", headers=headers).status_code == 400
+    ids = ",".join(str(i) for i in range(1, 102))
+    assert client.get(f"/users?ids={ids}", headers=headers).status_code == 400
+
+
+def test_batch_lookup_requires_login(client, make_user):
+    user = make_user()
+    assert client.get(f"/users?ids={user.id}").status_code == 401
@@ -0,0 +1,147 @@
+"""Collection versions and conditional GETs.
+
+Every ORM write bumps a generation counter for each collection it can
+change (the task feed, one user's chat overview, ...) in the same
+transaction, through an after_flush hook like the search index's. List
+endpoints wrapped in @conditional turn the counters they depend on into a
+weak ETag before running the view, so a client that already has the
+current payload gets a 304 after a single primary-key lookup.
+
+Writes that bypass the ORM (bulk query deletes, raw SQL) must call
+bump_versions themselves.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from flask import make_response, request
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models.collection_version import CollectionVersion
+from models.conversation import Conversation
+from models.message import Message
+from models.read_cursor import ChatReadCursor
+from models.ride import Ride
+from models.study_session import StudySession
+from models.task import Task
+from models.user import User
+
+# part of every ETag; bump when a response shape changes so clients drop
+# payloads cached by an older release
+PAYLOAD_REVISION = 1
+
+_versions = CollectionVersion.__table__
+
+
+def _user_collections(u):
+    # "users" covers payloads that embed other people's names
+    return ("users", f"user:{u.id}")
+
+
+def _pair(a, b):
+    return tuple(f"chat:{i}" for i in (a, b) if i is not None)
+
+
+# model -> collections a write to one of its rows can change
+_SCOPES = {
+    Task: lambda t: ("tasks",),
+    Ride: lambda r: ("rides",),
+    StudySession: lambda s: ("study",),
+    User: _user_collections,
+    Message: lambda m: _pair(m.sender_id, m.receiver_id),
+    Conversation: lambda c: _pair(c.user_a_id, c.user_b_id),
+    ChatReadCursor: lambda c: _pair(c.user_id, None),
+}
+
+
+def _new_version():
+    # a collection's first row starts from the clock rather than 1, so a
+    # recreated database never hands out a version an old client still holds
+    return int(time.time() * 1000)
+
+
+def bump_versions(conn, names):
+    """Advance the counters for `names` on `conn`, creating missing rows."""
+    names = sorted(set(names))
+    if not names:
+        return
+    dialect = conn.dialect.name
+    rows = [{"name": n, "version": _new_version()} for n in names]
+    bumped = {"version": _versions.c.version + 1}
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        conn.execute(insert(_versions).on_conflict_do_update(index_elements=["name"], set_=bumped), rows)
+    elif dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        conn.execute(insert(_versions).on_duplicate_key_update(**bumped), rows)
+    else:
+        existing = set(conn.execute(select(_versions.c.name).where(_versions.c.name.in_(names))).scalars())
+        if existing:
+            conn.execute(_versions.update().where(_versions.c.name.in_(existing)).values(**bumped))
+        missing = [r for r in rows if r["name"] not in existing]
+        if missing:
+            conn.execute(_versions.insert(), missing)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_changed_collections(session, flush_context):
+    names = set()
+    for obj in session.new | session.deleted:
+        scope = _SCOPES.get(type(obj))
+        if scope is not None:
+            names.update(scope(obj))
+    for obj in session.dirty:
+        scope = _SCOPES.get(type(obj))
+        if scope is not None and session.is_modified(obj, include_collections=False):
+            names.update(scope(obj))
+    if names:
+        bump_versions(session.connection(), names)
+
+
+def current_versions(session, names) -> dict:
+    """{name: version} in one query; collections never written are 0."""
+    names = list(names)
+    found = dict(session.execute(select(_versions.c.name, _versions.c.version)
+                                 .where(_versions.c.name.in_(names))).all())
+    return {n: found.get(n, 0) for n in names}
+
+
+def etag_for(session, names) -> str:
+    versions = current_versions(session, names)
+    key = ";".join(f"{n}={versions[n]}" for n in sorted(versions))
+    return hashlib.blake2b(f"{PAYLOAD_REVISION}|{key}".encode(), digest_size=8).hexdigest()
+
+
+def conditional(*scopes):
+    """Serve a GET view with a weak ETag over the named collections.
+
+    Each scope is a collection name or a callable taking the view's kwargs
+    and returning names (for per-user collections). A matching
+    If-None-Match gets a 304 without calling the view. The versions are read
+    before the view runs, so a write racing the request can only make the
+    tag older than the body, never newer.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            names = []
+            for scope in scopes:
+                names.extend(scope(**kwargs) if callable(scope) else (scope,))
+            etag = etag_for(db.session, names)
+            if request.if_none_match.contains_weak(etag):
+                resp = make_response("", 304)
+            else:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag, weak=True)
+            # cached copies are fine to keep but must be revalidated
+            resp.headers["Cache-Control"] = "no-cache"
+            return resp
+        return wrapper
+    return decorator
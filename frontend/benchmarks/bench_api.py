@@ -0,0 +1,81 @@
+"""Per-call latency of ApiService's pooled session vs one-off requests calls.
+
+Starts a local HTTP/1.1 stub server that answers every GET with a small
+JSON body (like GET /tasks?limit=20 would), then times N sequential calls
+made with module-level requests.get (a new TCP connection each time, the
+old behaviour) and with ApiService (keep-alive connections from the pool).
+
+    python frontend/benchmarks/bench_api.py [--calls 500]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, FRONTEND_DIR)
+
+import requests  # noqa: E402
+
+from services.api import ApiService  # noqa: E402
+
+_BODY = json.dumps({"tasks": [{"id": i, "title": f"Task {i}", "status": "open"} for i in range(20)],
+                    "next_cursor": None}).encode()
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        # one write for head and body: split writes on a kept-alive socket
+        # meet Nagle + delayed ACK and add ~40ms per call
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(_BODY)))
+        self._headers_buffer.append(b"\r\n" + _BODY)
+        self.flush_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _time(call, n):
+    timings = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        resp = call()
+        resp.content
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    api = ApiService()
+    api.base = base
+    runs = {
+        "requests.get": lambda: requests.get(f"{base}/tasks", params={"limit": 20}),
+        "ApiService": lambda: api.list_tasks(limit=20),
+    }
+    for name, call in runs.items():
+        call()  # warm up (imports, first connection)
+        p50, p95, mean = _time(call, args.calls)
+        print(f"[{name:12}] p50={p50:6.3f}ms p95={p95:6.3f}ms mean={mean:6.3f}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Time and widget count to show N tasks: one widget tree per row vs RecycleList.
+
+The "eager" run builds a _TaskRow for every task inside a BoxLayout, which
+is what the task feed did before. The "recycled" run hands the same tasks to
+a RecycleList as data rows; only the rows that fit the viewport get a view.
+Both are laid out once in a 400x700 viewport.
+
+    KIVY_NO_ARGS=1 python frontend/benchmarks/bench_lists.py [--rows 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, FRONTEND_DIR)
+
+from kivy.clock import Clock  # noqa: E402
+from kivy.uix.boxlayout import BoxLayout  # noqa: E402
+from kivy.uix.scrollview import ScrollView  # noqa: E402
+
+from components.recycle_list import RecycleList  # noqa: E402
+from screens.tasks import _TaskRow  # noqa: E402
+
+VIEWPORT = (400, 700)
+
+
+def _tasks(n):
+    return [{"id": i, "title": f"Task {i}", "status": ("open", "assigned", "done")[i % 3], "user_id": 2}
+            for i in range(n)]
+
+
+def _count(widget):
+    return 1 + sum(_count(c) for c in widget.children)
+
+
+def _settle():
+    for _ in range(5):
+        Clock.tick()
+
+
+def eager(tasks):
+    scroll = ScrollView(size=VIEWPORT, size_hint=(None, None))
+    box = BoxLayout(orientation="vertical", size_hint=(1, None))
+    box.bind(minimum_height=box.setter("height"))
+    scroll.add_widget(box)
+    for t in tasks:
+        row = _TaskRow()
+        row.update_row({"task": t})
+        box.add_widget(row)
+    _settle()
+    return scroll
+
+
+def recycled(tasks):
+    rv = RecycleList(size=VIEWPORT, size_hint=(None, None), row_height=64)
+    rv.set_rows([{"viewclass": "TaskRow", "task": t, "height": 64} for t in tasks])
+    _settle()
+    return rv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    tasks = _tasks(args.rows)
+    recycled(tasks[:10])  # warm up (font and texture caches)
+    for name, build in (("eager", eager), ("recycled", recycled)):
+        start = time.perf_counter()
+        root = build(tasks)
+        elapsed = time.perf_counter() - start
+        print(f"[{name:8}] {args.rows} rows: {elapsed * 1000:8.1f}ms  widgets={_count(root)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Time to first content after app start: cold (nothing local) vs warm.
+
+Boots the backend in-process on a throwaway SQLite database, seeds tasks
+and a few conversations, and serves it over HTTP. The "cold" run is a first
+start: the replica is empty, so the task feed and the chats list wait for
+the network. The "warm" run is the next start: the session and replica are
+reloaded from disk (as a fresh process would) and both screens draw
+before their refresh returns. --latency-ms delays every response to mimic
+a mobile link.
+
+    KIVY_NO_ARGS=1 python frontend/benchmarks/bench_startup.py [--tasks 500] [--latency-ms 150]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(FRONTEND_DIR, "..", "backend"))
+sys.path.insert(0, FRONTEND_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+_TMP_DIR = tempfile.mkdtemp(prefix="errandbuddy-bench-")
+os.environ["DATABASE_URI"] = f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}"
+os.environ["SMTP_HOST"] = ""
+os.environ["MAIL_WORKERS"] = "0"
+os.environ["PASSWORD_WORKERS"] = "0"
+os.environ["OTP_LOG"] = os.path.join(_TMP_DIR, "otp_dev.log")
+
+from kivy.clock import Clock  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from services.api import api  # noqa: E402
+from services.replica import replica  # noqa: E402
+from screens.tasks import TaskScreen  # noqa: E402
+from screens.chats_list import ChatsListScreen  # noqa: E402
+
+PASSWORD = "secret"
+TIMEOUT = 30.0
+
+
+def _seed(app, n_tasks, n_chats):
+    from flask_jwt_extended import create_access_token
+    from werkzeug.security import generate_password_hash
+    from database import db
+    from models.user import User
+
+    with app.app_context():
+        users = [User(username=f"user{i}", email=f"user{i}@student.kpu.ca", first_name=f"User{i}",
+                      password_hash=generate_password_hash(PASSWORD), email_verified=True)
+                 for i in range(n_chats + 1)]
+        db.session.add_all(users)
+        db.session.commit()
+        headers = [{"Authorization": f"Bearer {create_access_token(identity=str(u.id))}"} for u in users]
+    client = app.test_client()
+    for i in range(n_tasks):
+        client.post("/tasks", headers=headers[1 + i % n_chats], json={"title": f"Task {i}", "location": "Surrey"})
+    for i in range(1, n_chats + 1):
+        client.post("/chat/send", headers=headers[i], json={"receiver_id": users[0].id, "content": f"hi {i}"})
+    return users[0].email
+
+
+def _serve(app, latency_ms):
+    def delayed(environ, start_response):
+        time.sleep(latency_ms / 1000)
+        return app(environ, start_response)
+
+    server = make_server("127.0.0.1", 0, delayed if latency_ms else app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _wait_for(viewclass, rv):
+    # tick the clock (posting worker results) until a real row is in the list
+    start = time.perf_counter()
+    while time.perf_counter() - start < TIMEOUT:
+        Clock.tick()
+        if any(row.get("viewclass") == viewclass for row in rv.data):
+            return
+        time.sleep(0.001)
+    raise RuntimeError(f"no {viewclass} within {TIMEOUT}s")
+
+
+def _first_content(tasks, chats):
+    start = time.perf_counter()
+    tasks.load_tasks()
+    _wait_for("TaskRow", tasks.content)
+    feed = time.perf_counter() - start
+    start = time.perf_counter()
+    chats.refresh()
+    _wait_for("ChatRow", chats.list_box)
+    return feed, time.perf_counter() - start
+
+
+def _settle(tasks, chats):
+    # let the background sync and refreshes finish before the next start
+    deadline = time.perf_counter() + TIMEOUT
+    while (tasks._calls.busy or chats._calls.busy) and time.perf_counter() < deadline:
+        Clock.tick()
+        time.sleep(0.001)
+    replica.sync()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--latency-ms", type=int, default=150)
+    args = parser.parse_args()
+    for name in ("werkzeug", "urllib3"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    import migrations
+    from app import create_app
+    from database import db
+
+    app, _ = create_app()
+    with app.app_context():
+        migrations.upgrade(db.engine, log=lambda *a: None)
+    email = _seed(app, args.tasks, args.chats)
+    server = _serve(app, args.latency_ms)
+    api.base = f"http://127.0.0.1:{server.server_address[1]}"
+    replica.path = os.path.join(_TMP_DIR, "replica.db")
+
+    runs = []
+    for name in ("cold", "warm"):
+        if name == "cold":
+            replica.reset()
+            resp = api.login(email, PASSWORD)
+            assert resp.status_code == 200, resp.text
+        else:
+            # a fresh process: only what is on disk survives
+            session = {"token": api.token, "user": api.user}
+            api.logout()
+            replica._rows = None
+            api.token, api.user = session["token"], session["user"]
+        tasks, chats = TaskScreen(name="tasks"), ChatsListScreen(name="chats")
+        feed, inbox = _first_content(tasks, chats)
+        runs.append((name, feed, inbox))
+        _settle(tasks, chats)
+    for name, feed, inbox in runs:
+        print(f"[{name:4}] task feed {feed * 1000:8.1f}ms  chats list {inbox * 1000:8.1f}ms"
+              f"  (latency {args.latency_ms}ms)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
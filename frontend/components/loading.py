@@ -0,0 +1,20 @@
+# small "Loading..." badge pinned to the top of a screen
+from kivy.uix.label import Label
+
+
+class LoadingIndicator(Label):
+    """Shown while the owning screen's CallGroup is busy. Add it to the
+    Screen itself (not the rebuilt content) so it survives view swaps.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("text", "Loading...")
+        kwargs.setdefault("color", (0.10, 0.20, 0.55, 1))
+        kwargs.setdefault("size_hint", (None, None))
+        kwargs.setdefault("size", (120, 24))
+        kwargs.setdefault("pos_hint", {"center_x": 0.5, "top": 1})
+        super().__init__(**kwargs)
+        self.opacity = 0
+
+    def set_busy(self, busy: bool):
+        self.opacity = 1 if busy else 0
@@ -1,62 +1,88 @@
+from functools import lru_cache
+
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.anchorlayout import AnchorLayout
 from kivy.core.window import Window
+from kivy.factory import Factory
 from kivy.graphics import Color, RoundedRectangle
+from components.recycle_list import RecycleRow, text_size
+
+ROW_PADDING = [10, 4, 10, 4]
+BUBBLE_PADDING = [10, 6, 10, 6]
+
+
+def max_bubble_width():
+    try:
+        return int(max(180, min(0.72 * Window.width, 320)))
+    except Exception:
+        return 260
 
 
-class MessageBubble(BoxLayout):
+@lru_cache(maxsize=2048)
+def _label_size(text, max_width):
+    w, h = text_size(text, max_width)
+    return min(w, max_width), max(24, h)
+
+
+def bubble_row(message: dict, mine=False) -> dict:
+    """RecycleView data for one message. The bubble is measured here because
+    the layout needs every row's height before any view is built.
+    """
+    text = str(message.get("content", ""))
+    label_w, label_h = _label_size(text, max_bubble_width())
+    return {
+        'viewclass': 'MessageBubble',
+        'message_id': message.get('id'),
+        'text': text,
+        'mine': bool(mine),
+        'label_size': (label_w, label_h),
+        'height': label_h + BUBBLE_PADDING[1] + BUBBLE_PADDING[3] + ROW_PADDING[1] + ROW_PADDING[3],
+    }
+
+
+class MessageBubble(RecycleRow, BoxLayout):
     """
     Chat bubble aligned based on `mine`.
     - mine=True  -> align LEFT (sender/current user)
     - mine=False -> align RIGHT (received)
     Wraps long text to avoid overflow using ~70% of window width.
+    One view is reused for whichever message scrolls into its place.
     """
 
-    def __init__(self, message, mine=False, **kwargs):
-        super().__init__(orientation='vertical', size_hint=(1, None), padding=[10, 4, 10, 4], **kwargs)
+    def __init__(self, **kwargs):
+        super().__init__(orientation='vertical', size_hint=(1, None), padding=ROW_PADDING, **kwargs)
 
-        text = str(message.get("content", ""))
-        # Anchor left for own messages, right for received (per request)
-        anchor_x = 'left' if mine else 'right'
-        row = AnchorLayout(anchor_x=anchor_x, size_hint=(1, None))
-        self.add_widget(row)
+        self._row = AnchorLayout(size_hint=(1, None))
+        self.add_widget(self._row)
 
         # Label inside rounded bubble
-        lbl = Label(text=text, size_hint=(None, None), halign='left' if mine else 'right', valign='middle', color=(0, 0, 0, 1))
-        lbl.bind(texture_size=lambda *_: self._refresh_sizes(row, bubble, lbl))
+        self._lbl = Label(size_hint=(None, None), valign='middle', color=(0, 0, 0, 1))
 
-        bubble = BoxLayout(size_hint=(None, None), padding=[10, 6, 10, 6])
-        with bubble.canvas.before:
+        self._bubble = BoxLayout(size_hint=(None, None), padding=BUBBLE_PADDING)
+        with self._bubble.canvas.before:
             # light tint bubble
             Color(0.93, 0.93, 0.97, 1)
-            bubble._rect = RoundedRectangle(pos=bubble.pos, size=(0, 0), radius=[12])
-        bubble.bind(pos=lambda *_: self._update_rect(bubble), size=lambda *_: self._update_rect(bubble))
-        bubble.add_widget(lbl)
-        row.add_widget(bubble)
-
-        # Initial size compute
-        self._refresh_sizes(row, bubble, lbl)
-
-    def _max_width(self):
-        try:
-            return int(max(180, min(0.72 * Window.width, 320)))
-        except Exception:
-            return 260
-
-    def _refresh_sizes(self, row, bubble, lbl):
-        # wrap to max width
-        lbl.text_size = (self._max_width(), None)
-        lbl.texture_update()
-        lbl.size = (min(lbl.texture_size[0], self._max_width()), max(24, lbl.texture_size[1]))
-        bubble.size = (lbl.size[0] + bubble.padding[0] + bubble.padding[2], lbl.size[1] + bubble.padding[1] + bubble.padding[3])
-        row.height = bubble.height
-        self.height = bubble.height + self.padding[1] + self.padding[3]
-        self._update_rect(bubble)
-
-    def _update_rect(self, bubble):
-        try:
-            bubble._rect.pos = bubble.pos
-            bubble._rect.size = bubble.size
-        except Exception:
-            pass
+            self._rect = RoundedRectangle(pos=self._bubble.pos, size=(0, 0), radius=[12])
+        self._bubble.bind(pos=self._update_rect, size=self._update_rect)
+        self._bubble.add_widget(self._lbl)
+        self._row.add_widget(self._bubble)
+
+    def update_row(self, data: dict):
+        mine = data.get('mine', False)
+        # Anchor left for own messages, right for received (per request)
+        self._row.anchor_x = 'left' if mine else 'right'
+        self._lbl.halign = 'left' if mine else 'right'
+        self._lbl.text_size = (max_bubble_width(), None)
+        self._lbl.text = data.get('text', '')
+        self._lbl.size = data.get('label_size') or (0, 24)
+        self._bubble.size = (self._lbl.width + BUBBLE_PADDING[0] + BUBBLE_PADDING[2],
+                             self._lbl.height + BUBBLE_PADDING[1] + BUBBLE_PADDING[3])
+        self._row.height = self._bubble.height
+
+    def _update_rect(self, *args):
+        self._rect.pos = self._bubble.pos
+        self._rect.size = self._bubble.size
+
+
+Factory.register('MessageBubble', cls=MessageBubble)
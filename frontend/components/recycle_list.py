@@ -0,0 +1,114 @@
+# frontend/components/recycle_list.py
+# RecycleView wrapper shared by the list screens. Rows are plain dicts in
+# `data`; only the rows in (or near) the viewport get a widget, and those
+# widgets are reused for other rows as the list scrolls.
+from kivy.core.text import Label as CoreLabel
+from kivy.factory import Factory
+from kivy.metrics import sp
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+
+
+class RecycleRow(RecycleDataViewBehavior):
+    """Base for reusable row views.
+
+    Subclasses build their widgets once in __init__ and fill them in
+    update_row(data) every time the view is handed a different row.
+    """
+
+    index = None
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.index = index
+        self.update_row(data)
+
+    def update_row(self, data: dict):
+        raise NotImplementedError
+
+
+class HintRow(RecycleRow, Label):
+    """One line of text: empty-list hints, load errors, section headers."""
+
+    def update_row(self, data: dict):
+        self.markup = bool(data.get('markup'))
+        self.text = data.get('text', '')
+        self.color = data.get('color', (0.3, 0.3, 0.3, 1))
+
+
+Factory.register('HintRow', cls=HintRow)
+
+
+def hint_row(text: str, color=(0.3, 0.3, 0.3, 1), height=24, markup=False) -> dict:
+    return {'viewclass': 'HintRow', 'text': text, 'color': color, 'height': height, 'markup': markup}
+
+
+def text_size(text: str, width, font_size='15sp', **kwargs):
+    """Rendered (width, height) of text wrapped at width, without a widget.
+
+    Rows whose height depends on their text put this in their data, since
+    the layout needs every row's height before any view exists.
+    """
+    if isinstance(font_size, str):
+        font_size = sp(float(font_size.rstrip('sp')))
+    label = CoreLabel(text=text, font_size=font_size, text_size=(width, None), **kwargs)
+    label.refresh()
+    return label.texture.size if label.texture else (0, 0)
+
+
+class RecycleList(RecycleView):
+    """Vertical RecycleView of dict rows, each naming its viewclass.
+
+    set_rows() diffs the new rows against the current data and applies only
+    the changed slice, so an append, a prepend or a single edited row does
+    not rebuild everything on screen.
+    """
+
+    def __init__(self, spacing=0, padding=(0, 0, 0, 0), row_height=56, **kwargs):
+        kwargs.setdefault('size_hint', (1, 1))
+        super().__init__(**kwargs)
+        self.layout = RecycleBoxLayout(orientation='vertical', spacing=spacing, padding=padding,
+                                       size_hint=(1, None), default_size=(None, row_height),
+                                       default_size_hint=(1, None))
+        self.layout.bind(minimum_height=self.layout.setter('height'))
+        self.add_widget(self.layout)
+        self.key_viewclass = 'viewclass'
+
+    def set_rows(self, rows: list):
+        old = self.data
+        if old == rows:
+            return
+        n_old, n_new = len(old), len(rows)
+        head = 0
+        while head < min(n_old, n_new) and old[head] == rows[head]:
+            head += 1
+        if head == n_old:
+            self.data.extend(rows[head:])
+            return
+        tail = 0
+        while tail < min(n_old, n_new) - head and old[n_old - 1 - tail] == rows[n_new - 1 - tail]:
+            tail += 1
+        if n_old == n_new:
+            self.data[head:n_old - tail] = rows[head:n_new - tail]
+        elif head + tail == n_new:
+            del self.data[head:n_old - tail]
+        elif head + tail == n_old:
+            # rows inserted at `head` (e.g. older chat messages on top): one
+            # insert per row, since a slice assignment that changes the
+            # length re-measures every row
+            for row in reversed(rows[head:n_new - tail]):
+                self.data.insert(head, row)
+        else:
+            self.data = list(rows)
+
+    def append_rows(self, rows: list):
+        if rows:
+            self.data.extend(rows)
+
+    def clear(self):
+        self.data = []
+
+    def show_message(self, text: str, color=(0.3, 0.3, 0.3, 1)):
+        """Replace the list with a single line of text."""
+        self.set_rows([hint_row(text, color)])
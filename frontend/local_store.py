@@ -1,82 +1,310 @@
 import os
+import copy
 import json
+import atexit
+import sqlite3
+import tempfile
+import threading
 from datetime import datetime
 
+try:
+    import keyring
+except Exception:  # optional: without it the session token goes to an owner-only file
+    keyring = None
 
 _BASE = os.path.dirname(os.path.abspath(__file__))
 _PATH = os.path.join(_BASE, "local_store.json")
+_DB_PATH = os.path.join(_BASE, "local_store.db")
+# fallback for the session token when no OS keyring is available
+_TOKEN_PATH = os.path.join(_BASE, "session_token")
+KEYRING_SERVICE = "ErrandBuddy"
+KEYRING_USER = "session"
 
+# setters only mark the store dirty; one write covers everything changed
+# within this window
+FLUSH_DELAY_SECONDS = 1.0
+# once the JSON snapshot passes this size the store moves to SQLite, where a
+# flush writes only the changed keys instead of the whole file
+SQLITE_THRESHOLD_BYTES = 256 * 1024
 
-def _load() -> dict:
-    try:
-        with open(_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
 
+class _Store:
+    """Process-wide key/value store, loaded once and written behind.
 
-def _save(data: dict) -> None:
-    try:
-        with open(_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+    Values live in memory as {section: {key: value}}; getters never touch
+    the disk. Writes go to the backend after FLUSH_DELAY_SECONDS, either as
+    an atomic rename of a fresh JSON file or, for large stores, as upserts
+    into a SQLite table.
+    """
+
+    def __init__(self, json_path=_PATH, db_path=_DB_PATH):
+        self.json_path = json_path
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # one flush at a time, in order
+        self._data = None
+        self._dirty = set()  # (section, key) pairs changed since the last flush
+        self._timer = None
+        self._use_sqlite = False
+
+    # --- loading ---
+    def _ensure_loaded(self):
+        if self._data is not None:
+            return
+        # the JSON file is only deleted once a move to SQLite has committed,
+        # so while it exists it is the store
+        if os.path.exists(self.db_path) and not os.path.exists(self.json_path):
+            self._use_sqlite = True
+            self._data = self._load_sqlite()
+        else:
+            self._data = self._load_json()
+
+    def _load_json(self) -> dict:
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (section TEXT NOT NULL, key TEXT NOT NULL, "
+                     "value TEXT NOT NULL, PRIMARY KEY (section, key)) WITHOUT ROWID")
+        return conn
+
+    def _load_sqlite(self) -> dict:
+        data = {}
+        try:
+            conn = self._connect()
+            try:
+                for section, key, value in conn.execute("SELECT section, key, value FROM kv"):
+                    data.setdefault(section, {})[key] = json.loads(value)
+            finally:
+                conn.close()
+        except Exception:
+            pass
+        return data
+
+    # --- access ---
+    def get(self, section: str, key: str):
+        """A copy of the stored value: changes only stick through set()."""
+        with self._lock:
+            self._ensure_loaded()
+            return copy.deepcopy((self._data.get(section) or {}).get(key))
+
+    def set(self, section: str, key: str, value):
+        """Set (or, with value None, remove) one key and schedule a flush."""
+        with self._lock:
+            self._ensure_loaded()
+            values = self._data.setdefault(section, {})
+            if value is None:
+                if key not in values:
+                    return
+                values.pop(key)
+            elif values.get(key) == value:
+                return
+            else:
+                values[key] = copy.deepcopy(value)
+            self._dirty.add((section, key))
+            if self._timer is None:
+                self._timer = threading.Timer(FLUSH_DELAY_SECONDS, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    # --- writing ---
+    def flush(self):
+        """Write pending changes now. Safe to call at any time."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                dirty, self._dirty = self._dirty, set()
+                # snapshot under the lock; the disk write runs without it so
+                # getters on the UI thread never wait on I/O
+                if self._use_sqlite:
+                    changes = [(section, key, self._encoded(section, key)) for section, key in dirty]
+                else:
+                    payload = json.dumps(self._data, ensure_ascii=False, separators=(",", ":"))
+                    big = len(payload) > SQLITE_THRESHOLD_BYTES
+                    if big:
+                        changes = [(section, key, json.dumps(value, ensure_ascii=False))
+                                   for section, values in self._data.items() if isinstance(values, dict)
+                                   for key, value in values.items()]
+            try:
+                if self._use_sqlite:
+                    self._write_sqlite(changes)
+                elif big:
+                    self._write_sqlite(changes, replace_all=True)
+                    # the database is the store from now on
+                    self._use_sqlite = True
+                    try:
+                        os.remove(self.json_path)
+                    except OSError:
+                        pass
+                else:
+                    self._write_json(payload)
+            except Exception as e:
+                # keep the changes so the next flush retries them
+                with self._lock:
+                    self._dirty |= dirty
+                print("local_store: write failed:", e)
+
+    def _encoded(self, section, key):
+        value = (self._data.get(section) or {}).get(key)
+        return None if value is None else json.dumps(value, ensure_ascii=False)
+
+    def _write_json(self, payload: str):
+        # write a sibling temp file and rename it over the old one, so a
+        # crash mid-write never leaves a truncated store behind
+        fd, tmp = tempfile.mkstemp(prefix=".local_store.", suffix=".tmp", dir=os.path.dirname(self.json_path))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.json_path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _write_sqlite(self, changes, replace_all=False):
+        """Apply (section, key, encoded value or None to delete) in one transaction."""
+        conn = self._connect()
+        try:
+            with conn:
+                if replace_all:
+                    conn.execute("DELETE FROM kv")
+                conn.executemany("DELETE FROM kv WHERE section = ? AND key = ?",
+                                 [(section, key) for section, key, value in changes if value is None])
+                conn.executemany("INSERT OR REPLACE INTO kv (section, key, value) VALUES (?, ?, ?)",
+                                 [c for c in changes if c[2] is not None])
+        finally:
+            conn.close()
+
+
+_store = _Store()
+atexit.register(_store.flush)
+
+
+def flush() -> None:
+    _store.flush()
 
 
 def get_cleared_at(key: str) -> str | None:
     if not key:
         return None
-    data = _load()
-    section = data.get("chat_clear") or {}
-    return section.get(key)
+    return _store.get("chat_clear", key)
 
 
 def set_cleared_now(key: str) -> None:
     if not key:
         return
-    data = _load()
-    section = data.get("chat_clear") or {}
-    section[key] = datetime.utcnow().isoformat()
-    data["chat_clear"] = section
-    _save(data)
+    _store.set("chat_clear", key, datetime.utcnow().isoformat())
 
 
 # --- Read state ---
 def get_last_read(key: str) -> str | None:
     if not key:
         return None
-    data = _load()
-    section = data.get("chat_last_read") or {}
-    return section.get(key)
+    return _store.get("chat_last_read", key)
 
 
 def set_last_read_now(key: str) -> None:
     if not key:
         return
-    data = _load()
-    section = data.get("chat_last_read") or {}
-    section[key] = datetime.utcnow().isoformat()
-    data["chat_last_read"] = section
-    _save(data)
+    _store.set("chat_last_read", key, datetime.utcnow().isoformat())
 
 
 # --- Title overrides (e.g., Study Buddy Session (Course)) ---
 def get_title_override(key: str) -> str | None:
     if not key:
         return None
-    data = _load()
-    section = data.get("chat_title_overrides") or {}
-    return section.get(key)
+    return _store.get("chat_title_overrides", key)
 
 
 def set_title_override(key: str, value: str) -> None:
     if not key:
         return
-    data = _load()
-    section = data.get("chat_title_overrides") or {}
-    if value:
-        section[key] = value
-    else:
-        section.pop(key, None)
-    data["chat_title_overrides"] = section
-    _save(data)
+    _store.set("chat_title_overrides", key, value or None)
+
+
+# --- Signed-in session, restored at app start ---
+def _save_token(token: str) -> None:
+    if keyring is not None:
+        try:
+            keyring.set_password(KEYRING_SERVICE, KEYRING_USER, token)
+            _remove_token_file()
+            return
+        except Exception:
+            pass  # no usable backend (e.g. a headless Linux session)
+    fd = os.open(_TOKEN_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    # O_CREAT's mode does not apply to a file that already existed
+    os.chmod(_TOKEN_PATH, 0o600)
+
+
+def _load_token() -> str | None:
+    if keyring is not None:
+        try:
+            token = keyring.get_password(KEYRING_SERVICE, KEYRING_USER)
+            if token:
+                return token
+        except Exception:
+            pass
+    try:
+        with open(_TOKEN_PATH, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _remove_token_file() -> None:
+    try:
+        os.remove(_TOKEN_PATH)
+    except OSError:
+        pass
+
+
+def _delete_token() -> None:
+    if keyring is not None:
+        try:
+            keyring.delete_password(KEYRING_SERVICE, KEYRING_USER)
+        except Exception:
+            pass
+    _remove_token_file()
+
+
+def get_session() -> dict | None:
+    """{'token': ..., 'user': {...}} from the last login, if not signed out.
+    The token comes from the OS keyring (or an owner-only file); the store
+    only holds the user.
+    """
+    session = _store.get("session", "current")
+    if not isinstance(session, dict):
+        return None
+    if session.get("token"):
+        # saved by an older release in the plaintext store: move it out
+        set_session(session["token"], session.get("user"))
+    token = _load_token()
+    return {"token": token, "user": session.get("user") or {}} if token else None
+
+
+def set_session(token: str, user: dict) -> None:
+    if not token:
+        clear_session()
+        return
+    _save_token(token)
+    _store.set("session", "current", {"user": user or {}})
+
+
+def clear_session() -> None:
+    _delete_token()
+    _store.set("session", "current", None)
@@ -1,4 +1,5 @@
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.uix.screenmanager import ScreenManager
 # import screens
@@ -11,6 +12,11 @@ from screens.profile import ProfileScreen
 from screens.verify import VerifyEmailScreen
 from screens.study import StudyScreen
 from screens.chats_list import ChatsListScreen
+from services.api import api
+try:
+    from local_store import get_session, clear_session
+except Exception:
+    from frontend.local_store import get_session, clear_session
 
 # optional: simulate mobile window size in desktop
 Window.size = (360, 640)
@@ -36,8 +42,25 @@ class ErrandBuddyApp(App):
         sm.add_widget(VerifyEmailScreen(name="verify"))
         sm.add_widget(StudyScreen(name="study"))
         sm.add_widget(ChatsListScreen(name="chats"))
+        api.on_unauthorized = lambda: Clock.schedule_once(lambda dt: self._session_expired())
+        # a saved session opens straight onto the home screen, drawn from the
+        # local replica; the network refresh follows in the background
+        session = get_session()
+        if session:
+            api.token, api.user = session['token'], session.get('user')
+            sm.get_screen('tasks').show_home()
+            sm.current = 'tasks'
         return sm
 
+    def _session_expired(self):
+        # the restored token was rejected: back to the login screen
+        if not api.token:
+            return
+        api.logout()
+        clear_session()
+        if self.root and self.root.current not in ('login', 'register', 'verify'):
+            self.root.current = 'login'
+
 if __name__ == "__main__":
     ErrandBuddyApp().run()
 
@@ -5,6 +5,11 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.widget import Widget
 from services.api import api
+from services import sockets
+from services.background import CallGroup, run_async
+from services.replica import replica
+from services.user_cache import display_name, user_cache
+from components.loading import LoadingIndicator
 # Reuse shared button style from Tasks screen
 try:
     from screens.tasks import LightRoundedButton
@@ -14,21 +19,24 @@ try:
     from local_store import (
         get_cleared_at,
         set_cleared_now,
-        get_last_read,
-        set_last_read_now,
         get_title_override,
     )
 except Exception:
     from frontend.local_store import (
         get_cleared_at,
         set_cleared_now,
-        get_last_read,
-        set_last_read_now,
         get_title_override,
     )
 from datetime import datetime
 from kivy.clock import Clock
-from components.message_bubble import MessageBubble
+from components.message_bubble import bubble_row
+from components.recycle_list import RecycleList, hint_row
+
+# Messages fetched on open and per scroll-back page
+MESSAGE_PAGE_SIZE = 50
+# New messages are pushed over Socket.IO; polling only covers a dropped socket
+FALLBACK_POLL_SECONDS = 15.0
+
 
 class ChatScreen(Screen):
     def __init__(self, **kwargs):
@@ -43,6 +51,13 @@ class ChatScreen(Screen):
         self.other_user_id = None
         self._prev_screen = 'tasks'
         self._poll_ev = None
+        self._joined = None
+        # cursor state for incremental fetches
+        self._seen_ids = set()
+        self._oldest_id = None
+        self._newest_id = None
+        self._has_older = False
+        self._loading_older = False
         self.layout = BoxLayout(orientation="vertical", padding=8, spacing=8)
         self.header = BoxLayout(size_hint=(1, None), height=46, spacing=8)
         # Left-anchored title that doesn't shift when text grows
@@ -58,11 +73,11 @@ class ChatScreen(Screen):
         back_btn.bind(on_press=lambda *_: self._go_back())
         self.header.add_widget(back_btn)
         self.layout.add_widget(self.header)
-        from kivy.uix.scrollview import ScrollView
-        self.scroll = ScrollView(size_hint=(1, 1))
-        self.messages_box = BoxLayout(orientation="vertical", spacing=6, size_hint=(1, None))
-        self.messages_box.bind(minimum_height=self.messages_box.setter('height'))
-        self.scroll.add_widget(self.messages_box)
+        # only the bubbles in view are built; the rest are rows in scroll.data
+        self.scroll = RecycleList(spacing=6)
+        self.messages_box = self.scroll.layout
+        # lazy-load older messages when scrolled to the top
+        self.scroll.bind(scroll_y=self._on_scroll)
         self.layout.add_widget(self.scroll)
         self.input_box = BoxLayout(size_hint=(1, None), height=48, spacing=8)
         self.text = TextInput(hint_text="Message...", multiline=False)
@@ -72,6 +87,9 @@ class ChatScreen(Screen):
         self.input_box.add_widget(send)
         self.layout.add_widget(self.input_box)
         self.add_widget(self.layout)
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
 
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
@@ -79,9 +97,14 @@ class ChatScreen(Screen):
             self._bg.size = self.size
 
     def on_pre_enter(self, *args):
-        # start a light polling to keep messages fresh when the screen is visible
+        sockets.add_listener('chat_message', self._on_push)
+        sockets.add_listener('connect', self._on_socket_connect)
+        if api.token:
+            sockets.connect_async(api.token)
+        self._subscribe()
+        # slow fallback poll in case pushes are missed while the socket is down
         if self._poll_ev is None:
-            self._poll_ev = Clock.schedule_interval(lambda dt: self.refresh_messages(), 3.0)
+            self._poll_ev = Clock.schedule_interval(lambda dt: self.poll_new_messages(), FALLBACK_POLL_SECONDS)
 
     def on_leave(self, *args):
         if self._poll_ev is not None:
@@ -90,6 +113,49 @@ class ChatScreen(Screen):
             except Exception:
                 pass
             self._poll_ev = None
+        self._calls.cancel_all()
+        self._loading_older = False
+        sockets.remove_listener('chat_message', self._on_push)
+        sockets.remove_listener('connect', self._on_socket_connect)
+        self._unsubscribe()
+
+    def _subscribe(self):
+        """Join the socket room of the conversation on screen."""
+        target = (self.current_task_id, None if self.current_task_id else self.other_user_id)
+        if target == self._joined:
+            return
+        self._unsubscribe()
+        if target[0] or target[1]:
+            sockets.join_conversation(task_id=target[0], other_id=target[1])
+            self._joined = target
+
+    def _unsubscribe(self):
+        if self._joined:
+            sockets.leave_conversation(task_id=self._joined[0], other_id=self._joined[1])
+            self._joined = None
+
+    def _on_socket_connect(self, *_):
+        # pick up anything sent while the socket was down
+        self.poll_new_messages()
+
+    def _is_current(self, m: dict) -> bool:
+        if self.current_task_id:
+            return m.get('task_id') == self.current_task_id
+        if self.other_user_id and not m.get('task_id'):
+            return self.other_user_id in (m.get('sender_id'), m.get('receiver_id'))
+        return False
+
+    def _on_push(self, m):
+        """Show a message pushed by the server for this conversation."""
+        if not m or not self._is_current(m) or m.get('id') in self._seen_ids:
+            return
+        if not self._visible([m]):
+            return
+        # _newest_id stays the HTTP cursor so a catch-up poll still covers
+        # anything missed before this push; _seen_ids dedupes the overlap
+        self.scroll.append_rows([self._bubble(m)])
+        self._snap_scroll()
+        self._mark_read(m.get('id'))
 
     def _go_back(self):
         try:
@@ -107,25 +173,17 @@ class ChatScreen(Screen):
         self.current_task_id = task.get('id')
         self.other_user_id = None
         self._prev_screen = 'tasks'
-        # determine the other user's id from the task
-        try:
-            my_id = (api.user or {}).get('id')
-            owner_id = task.get('user_id')
-            assignee_id = task.get('assignee_id')
-            other_id = assignee_id if my_id == owner_id else owner_id
-            # fetch user to display name
-            name = None
-            if other_id:
-                r = api.get_user(other_id)
-                if r.status_code == 200:
-                    u = r.json() or {}
-                    fn = (u.get('first_name') or '').strip()
-                    ln = (u.get('last_name') or '').strip()
-                    name = (fn + ' ' + ln).strip() or u.get('username') or u.get('email')
-            self.title.text = name if name else f"Task #{self.current_task_id}"
-        except Exception:
-            self.title.text = f"Task #{self.current_task_id}"
+        self.title.text = f"Task #{self.current_task_id}"
+        # determine the other user's id from the task; their name replaces
+        # the placeholder title once it arrives
+        my_id = (api.user or {}).get('id')
+        owner_id = task.get('user_id')
+        assignee_id = task.get('assignee_id')
+        other_id = assignee_id if my_id == owner_id else owner_id
+        self._resolve_title(other_id)
         self.refresh_messages()
+        if self.manager and self.manager.current == self.name:
+            self._subscribe()
         # mark as read when opened
         self._mark_read()
 
@@ -135,19 +193,7 @@ class ChatScreen(Screen):
         self._prev_screen = prev_screen or 'tasks'
         # Set header title
         # Prefer provided display name; else fall back to user name
-        title_text = None
-        if display_name:
-            title_text = display_name
-        else:
-            try:
-                r = api.get_user(self.other_user_id)
-                if r.status_code == 200:
-                    u = r.json() or {}
-                    fn = (u.get('first_name') or '').strip()
-                    ln = (u.get('last_name') or '').strip()
-                    title_text = (fn + ' ' + ln).strip() or u.get('username')
-            except Exception:
-                pass
+        title_text = display_name or None
         # If a Study Buddy title override exists like "Study Buddy Session (COURSE)",
         # show just the course to keep the header short.
         try:
@@ -163,47 +209,184 @@ class ChatScreen(Screen):
         except Exception:
             pass
         self.title.text = title_text or 'Chat'
+        self._resolve_title(self.other_user_id if title_text is None else None)
         self.refresh_messages()
+        if self.manager and self.manager.current == self.name:
+            self._subscribe()
         self._mark_read()
 
+    def _resolve_title(self, user_id):
+        """Show the user's name as the title, from the cache when possible."""
+        self._calls.cancel('title')
+        if not user_id:
+            return
+        name = user_cache.name(user_id)
+        if name:
+            self.title.text = name
+            return
+        self._calls.submit(user_cache.get_many, [user_id], on_error=lambda e: None, key='title',
+                           on_success=lambda users: self._show_user_title(users.get(int(user_id))))
+
+    def _show_user_title(self, user):
+        name = display_name(user)
+        if name:
+            self.title.text = name
+
+    def _fetch_messages(self, **cursor):
+        if self.current_task_id:
+            return api.list_task_messages(self.current_task_id, **cursor)
+        if self.other_user_id:
+            return api.list_conversation(self.other_user_id, **cursor)
+        return None
+
+    def _visible(self, msgs: list) -> list:
+        """Drop messages older than the local clear threshold, if set."""
+        key = self._conversation_key()
+        try:
+            cut = get_cleared_at(key)
+            if not cut:
+                return msgs
+            cut_dt = datetime.fromisoformat(cut)
+        except Exception:
+            return msgs
+        def _after(m):
+            try:
+                return datetime.fromisoformat(m.get('timestamp')) > cut_dt
+            except Exception:
+                return True
+        return [m for m in msgs if _after(m)]
+
+    def _track(self, msgs: list):
+        ids = [m.get('id') for m in msgs if m.get('id') is not None]
+        if ids:
+            self._oldest_id = min(ids + ([self._oldest_id] if self._oldest_id is not None else []))
+            self._newest_id = max(ids + ([self._newest_id] if self._newest_id is not None else []))
+
+    def _bubble(self, m: dict):
+        my_id = (api.user or {}).get('id')
+        if m.get('id') is not None:
+            self._seen_ids.add(m.get('id'))
+        return bubble_row(m, mine=m.get('sender_id') == my_id)
+
     def refresh_messages(self):
-        self.messages_box.clear_widgets()
-        if not api.token:
+        """Reset the view and load the latest page of the conversation."""
+        self.scroll.clear()
+        self._seen_ids = set()
+        self._oldest_id = None
+        self._newest_id = None
+        self._has_older = False
+        self._loading_older = False
+        # replies for the previous view must not land in this one
+        self._calls.cancel('poll')
+        self._calls.cancel('older')
+        if not api.token or not (self.current_task_id or self.other_user_id):
+            self._calls.cancel('messages')
             return
+        # synced messages show at once; the server's latest page replaces them
+        local = self._visible(self._local_messages())
+        if local:
+            self.scroll.set_rows([self._bubble(m) for m in local])
+            self._snap_scroll()
+        self._calls.submit(self._fetch_messages, limit=MESSAGE_PAGE_SIZE, on_success=self._show_latest,
+                           on_error=self._show_load_error, key='messages')
+
+    def _local_messages(self) -> list:
+        """The newest MESSAGE_PAGE_SIZE replicated messages of this conversation."""
+        my_id = (api.user or {}).get('id')
         if self.current_task_id:
-            resp = api.list_task_messages(self.current_task_id)
-        elif self.other_user_id:
-            resp = api.list_conversation(self.other_user_id)
+            mine = [m for m in replica.rows('messages') if m.get('task_id') == self.current_task_id]
         else:
+            pair = {my_id, self.other_user_id}
+            mine = [m for m in replica.rows('messages')
+                    if not m.get('task_id') and {m.get('sender_id'), m.get('receiver_id')} == pair]
+        return sorted(mine, key=lambda m: m.get('id') or 0)[-MESSAGE_PAGE_SIZE:]
+
+    def _show_load_error(self, exc):
+        self.scroll.append_rows([hint_row("Failed to load messages: network error")])
+
+    def _show_latest(self, resp):
+        if resp is None:
             return
         if resp.status_code == 200:
             msgs = resp.json() or []
-            # Apply local clear threshold if set
-            key = self._conversation_key()
+            self._track(msgs)
+            visible = self._visible(msgs)
+            # a full page with nothing hidden by "Clear" means there may be more
+            self._has_older = len(msgs) >= MESSAGE_PAGE_SIZE and len(visible) == len(msgs)
+            self.scroll.set_rows([self._bubble(m) for m in visible])
+            self._snap_scroll()
+        else:
+            self.scroll.set_rows([hint_row(f"Failed to load messages: {getattr(resp,'text',resp)}")])
+
+    def poll_new_messages(self):
+        """Append only messages newer than the last one shown."""
+        if not api.token:
+            return
+        if self._newest_id is None:
+            if not self._calls.running('messages'):
+                self.refresh_messages()
+            return
+        self._calls.submit(self._fetch_messages, after_id=self._newest_id, on_success=self._append_new,
+                           on_error=lambda e: None, key='poll', quiet=True)
+
+    def _append_new(self, resp):
+        if resp is None or resp.status_code != 200:
+            return
+        msgs = resp.json() or []
+        self._track(msgs)
+        fresh = [m for m in self._visible(msgs) if m.get('id') not in self._seen_ids]
+        # appended rows are laid out on their own; the rest are untouched
+        self.scroll.append_rows([self._bubble(m) for m in fresh])
+        if fresh:
+            self._snap_scroll()
+            # the conversation is on screen, so new arrivals are read
+            self._mark_read()
+
+    def load_older_messages(self):
+        """Prepend the page of messages before the oldest one shown."""
+        if self._loading_older or not self._has_older or self._oldest_id is None:
+            return
+        self._loading_older = True
+        self._calls.submit(self._fetch_messages, before_id=self._oldest_id, limit=MESSAGE_PAGE_SIZE,
+                           on_success=self._prepend_older, on_error=self._older_failed, key='older')
+
+    def _older_failed(self, exc):
+        self._loading_older = False
+
+    def _prepend_older(self, resp):
+        try:
+            if resp is None or resp.status_code != 200:
+                return
+            msgs = resp.json() or []
+            self._track(msgs)
+            visible = self._visible(msgs)
+            self._has_older = len(msgs) >= MESSAGE_PAGE_SIZE and len(visible) == len(msgs)
+            old_height = self.messages_box.height
+            # oldest first, above everything already shown
+            older = [self._bubble(m) for m in visible if m.get('id') not in self._seen_ids]
+            if older:
+                self.scroll.set_rows(older + list(self.scroll.data))
+            self._keep_scroll_anchor(old_height)
+        except Exception:
+            pass
+        finally:
+            self._loading_older = False
+
+    def _on_scroll(self, inst, value):
+        if value >= 1 and self.messages_box.height > self.scroll.height:
+            self.load_older_messages()
+
+    def _keep_scroll_anchor(self, old_height):
+        """After prepending, keep the previously top-most message in view."""
+        def _do(*_):
             try:
-                cut = get_cleared_at(key)
-                if cut:
-                    try:
-                        cut_dt = datetime.fromisoformat(cut)
-                        def _after(m):
-                            ts = m.get('timestamp')
-                            try:
-                                mt = datetime.fromisoformat(ts)
-                                return mt > cut_dt
-                            except Exception:
-                                return True
-                        msgs = [m for m in msgs if _after(m)]
-                    except Exception:
-                        pass
+                added = self.messages_box.height - old_height
+                overflow = self.messages_box.height - self.scroll.height
+                if added > 0 and overflow > 0:
+                    self.scroll.scroll_y = max(0.0, min(1.0, 1 - added / overflow))
             except Exception:
                 pass
-            my_id = (api.user or {}).get('id')
-            for m in msgs:
-                mine = m.get('sender_id') == my_id
-                self.messages_box.add_widget(MessageBubble(m, mine=mine))
-            self._snap_scroll()
-        else:
-            self.messages_box.add_widget(Label(text=f"Failed to load messages: {getattr(resp,'text',resp)}"))
+        Clock.schedule_once(_do, 0)
 
     def send_message(self, instance):
         if not api.token:
@@ -213,17 +396,20 @@ class ChatScreen(Screen):
         if not content:
             return
         if self.current_task_id:
-            resp = api.send_task_message(self.current_task_id, content)
+            self._calls.submit(api.send_task_message, self.current_task_id, content,
+                               on_success=self._sent, on_error=lambda e: print("Send failed", e))
         elif self.other_user_id:
-            resp = api.send_message(self.other_user_id, content)
-        else:
-            return
+            self._calls.submit(api.send_message, self.other_user_id, content,
+                               on_success=self._sent, on_error=lambda e: print("Send failed", e))
+
+    def _sent(self, resp):
         if resp.status_code in (200, 201):
             try:
                 data = resp.json() or {}
                 m = data.get('message') or {}
-                # append locally for instant feedback
-                self.messages_box.add_widget(MessageBubble(m, mine=True))
+                # append locally for instant feedback; the next poll skips it by id
+                if m.get('id') not in self._seen_ids:
+                    self.scroll.append_rows([self._bubble(m)])
                 self._snap_scroll()
             except Exception:
                 self.refresh_messages()
@@ -267,10 +453,10 @@ class ChatScreen(Screen):
         set_cleared_now(key)
         self.refresh_messages()
 
-    def _mark_read(self):
-        key = self._conversation_key()
-        if key:
-            try:
-                set_last_read_now(key)
-            except Exception:
-                pass
+    def _mark_read(self, message_id=None):
+        """Advance the server-side read cursor to the newest message shown."""
+        if not api.token or not (self.current_task_id or self.other_user_id):
+            return
+        # fire-and-forget: nothing on screen waits for the read cursor
+        run_async(api.mark_chat_read, task_id=self.current_task_id, other_id=self.other_user_id,
+                  message_id=message_id or self._newest_id, on_error=lambda e: None)
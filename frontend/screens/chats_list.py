@@ -1,17 +1,54 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.button import Button
 from kivy.graphics import Color, Rectangle
+from kivy.factory import Factory
 from components.bottom_nav import BottomNav
 from services.api import api
+from services.background import CallGroup
+from services.replica import replica
+from services.user_cache import display_name, user_cache
+from components.loading import LoadingIndicator
+from components.recycle_list import RecycleList, RecycleRow
 try:
-    from local_store import get_last_read, get_title_override
+    from local_store import get_title_override
 except Exception:
-    from frontend.local_store import get_last_read, get_title_override
+    from frontend.local_store import get_title_override
 
 DARK_BLUE = (0.10, 0.20, 0.55, 1)
+# replica snapshot holding the last /chat/overview response
+SNAPSHOT = 'chat_overview'
+
+
+class _ChatRow(RecycleRow, BoxLayout):
+    """One conversation in the list; reused as the list scrolls."""
+
+    def __init__(self, **kwargs):
+        super().__init__(orientation='horizontal', size_hint=(1, None), height=56, padding=[8, 6, 8, 6], spacing=8, **kwargs)
+        self.item = {}
+        self.open_cb = None
+        # Left: title + snippet
+        box = BoxLayout(orientation='vertical')
+        self._title_lbl = Label(markup=True, color=DARK_BLUE, size_hint=(1, None), height=22)
+        box.add_widget(self._title_lbl)
+        # Status: New Message or Read
+        self._status_lbl = Label(color=(0,0,0,1), size_hint=(1, None), height=20)
+        box.add_widget(self._status_lbl)
+        self.add_widget(box)
+        # Right: Open button
+        btn = Button(text='Open', size_hint=(None, None), size=(80, 36))
+        btn.bind(on_press=lambda *_: self.open_cb and self.open_cb(self.item))
+        self.add_widget(btn)
+
+    def update_row(self, data: dict):
+        self.item = data.get('item') or {}
+        self.open_cb = data.get('open_cb')
+        self._title_lbl.text = f"[b]{data.get('title', '')}[/b]"
+        self._status_lbl.text = data.get('status', '')
+
+
+Factory.register('ChatRow', cls=_ChatRow)
 
 
 class ChatsListScreen(Screen):
@@ -28,14 +65,15 @@ class ChatsListScreen(Screen):
         title.bind(size=lambda i, v: setattr(i, 'text_size', i.size))
         self.layout.add_widget(title)
         # List
-        self.scroll = ScrollView(size_hint=(1, 1))
-        self.list_box = BoxLayout(orientation='vertical', size_hint=(1, None), spacing=6)
-        self.list_box.bind(minimum_height=self.list_box.setter('height'))
-        self.scroll.add_widget(self.list_box)
-        self.layout.add_widget(self.scroll)
+        self.list_box = RecycleList(spacing=6, row_height=56)
+        self.layout.add_widget(self.list_box)
         # Bottom nav
         self._add_bottom_nav()
         self.add_widget(self.layout)
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
+        self._showing_snapshot = False
 
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
@@ -45,46 +83,58 @@ class ChatsListScreen(Screen):
     def on_pre_enter(self, *args):
         self.refresh()
 
+    def on_leave(self, *args):
+        self._calls.cancel_all()
+
     def refresh(self):
-        self.list_box.clear_widgets()
         if not api.token:
-            self.list_box.add_widget(Label(text='Login to see your chats', color=DARK_BLUE, size_hint=(1, None), height=24))
+            self.list_box.show_message('Login to see your chats', DARK_BLUE)
             return
+        # last session's list goes up at once; the fetch patches what changed
+        cached = replica.snapshot(SNAPSHOT)
+        self._showing_snapshot = cached is not None
+        if cached is not None:
+            self._show_items(cached)
+        self._calls.submit(self._fetch_overview, on_success=self._show, on_error=self._show_error, key='refresh')
+
+    @staticmethod
+    def _fetch_overview():
+        # worker thread: keep the response for the next start
         resp = api.list_chat_overview()
+        if resp.status_code == 200:
+            replica.save_snapshot(SNAPSHOT, resp.json() or [])
+        return resp
+
+    def _show_error(self, exc):
+        if not self._showing_snapshot:
+            self.list_box.show_message('Failed to load chats: network error', DARK_BLUE)
+
+    def _show(self, resp):
         if resp.status_code != 200:
-            self.list_box.add_widget(Label(text=f'Failed to load chats: {getattr(resp,"text",resp)}', color=DARK_BLUE, size_hint=(1, None), height=24))
+            if not self._showing_snapshot:
+                self.list_box.show_message(f'Failed to load chats: {getattr(resp,"text",resp)}', DARK_BLUE)
             return
-        items = resp.json() or []
+        self._show_items(resp.json() or [])
+
+    def _show_items(self, items: list):
         if not items:
-            self.list_box.add_widget(Label(text='No active chats yet', color=DARK_BLUE, size_hint=(1, None), height=24))
+            self.list_box.show_message('No active chats yet', DARK_BLUE)
             return
-        for item in items:
-            self.list_box.add_widget(self._row(item))
+        # the overview already names everyone listed; other screens reuse them
+        user_cache.put_many(item.get('other') for item in items)
+        # unchanged conversations keep their rows; only the changed slice is refreshed
+        self.list_box.set_rows([self._row(item) for item in items])
 
-    def _row(self, item: dict):
-        row = BoxLayout(orientation='horizontal', size_hint=(1, None), height=56, padding=[8, 6, 8, 6], spacing=8)
-        # Left: title + snippet
-        box = BoxLayout(orientation='vertical')
-        title = self._title_for(item)
-        box.add_widget(Label(text=f'[b]{title}[/b]', markup=True, color=DARK_BLUE, size_hint=(1, None), height=22))
-        # Status: New Message or Read
-        status = self._status_for(item)
-        box.add_widget(Label(text=status, color=(0,0,0,1), size_hint=(1, None), height=20))
-        row.add_widget(box)
-        # Right: Open button
-        btn = Button(text='Open', size_hint=(None, None), size=(80, 36))
-        btn.bind(on_press=lambda *_: self._open(item))
-        row.add_widget(btn)
-        return row
+    def _row(self, item: dict) -> dict:
+        return {'viewclass': 'ChatRow', 'item': item, 'title': self._title_for(item),
+                'status': self._status_for(item), 'open_cb': self._open, 'height': 56}
 
     def _title_for(self, item: dict) -> str:
         if (item.get('type') or '') == 'task':
             tid = item.get('task_id')
-            other = (item.get('other') or {})
-            uname = ((other.get('first_name') or '') + ' ' + (other.get('last_name') or '')).strip() or other.get('username') or ''
+            uname = display_name(item.get('other')) or ''
             return f'Task #{tid} - {uname}'.strip(' -')
-        other = (item.get('other') or {})
-        uname = ((other.get('first_name') or '') + ' ' + (other.get('last_name') or '')).strip() or other.get('username') or 'Chat'
+        uname = display_name(item.get('other')) or 'Chat'
         # Try a local title override for Study Buddy Sessions; prefer course only in header
         key = f"user:{item.get('other_id')}"
         override = get_title_override(key)
@@ -98,21 +148,14 @@ class ChatsListScreen(Screen):
         return title.strip(' -')
 
     def _status_for(self, item: dict) -> str:
-        lm = (item.get('last_message') or {})
-        ts = lm.get('timestamp')
-        key = 'task:%s' % item.get('task_id') if (item.get('type') or '') == 'task' else 'user:%s' % item.get('other_id')
+        # unread count comes from the server-side read cursor
         try:
-            lr = get_last_read(key)
-            if not lr:
-                return 'New Message'
-            from datetime import datetime
-            lt = datetime.fromisoformat(lr)
-            mt = datetime.fromisoformat(ts) if ts else None
-            if mt and mt > lt:
-                return 'New Message'
-            return 'Read'
+            unread = int(item.get('unread') or 0)
         except Exception:
-            return 'New Message' if ts else 'Read'
+            unread = 0
+        if unread <= 0:
+            return 'Read'
+        return 'New Message' if unread == 1 else f'{unread} New Messages'
 
     def _open(self, item: dict):
         try:
@@ -1,13 +1,20 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.anchorlayout import AnchorLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 from kivy.graphics import Color, Rectangle, Line
+from kivy.factory import Factory
+from functools import lru_cache
 
 from services.api import api
+from services import sockets
+from services.background import CallGroup
+from services.replica import newest_first, replica
+from services.user_cache import display_name, user_cache
+from components.loading import LoadingIndicator
+from components.recycle_list import RecycleList, RecycleRow, text_size
 from components.bottom_nav import BottomNav
 
 # Reuse shared styles from Tasks screen
@@ -25,10 +32,30 @@ except Exception:
 
     DARK_BLUE = (0.10, 0.20, 0.55, 1)
 
+# Filter choices for ride origin/destination; rides outside the campuses are "Other"
+RIDE_AREAS = ('Any', 'Surrey', 'Langley', 'Richmond', 'Other')
 
-class _RideRow(BoxLayout):
-    def __init__(self, ride: dict, view_cb=None, dot_rgba=(0.10, 0.20, 0.55, 1), **kwargs):
-        super().__init__(orientation='horizontal', size_hint=(1, None), height=86, padding=[12, 8, 12, 8], spacing=10, **kwargs)
+
+# _RideRow geometry, also used to size rows before any view exists
+RIDE_ROW_PADDING = [12, 8, 12, 8]
+RIDE_ROW_SPACING = 10
+RIDE_ROW_BUTTON_WIDTH = 110
+
+
+@lru_cache(maxsize=1024)
+def ride_row_height(route: str, row_width) -> int:
+    """Row height for a route label wrapped to the row's middle column."""
+    pad_l, pad_t, pad_r, pad_b = RIDE_ROW_PADDING
+    route_w = max(40, row_width - pad_l - pad_r - RIDE_ROW_SPACING - RIDE_ROW_BUTTON_WIDTH)
+    route_h = text_size(route, route_w)[1]
+    # header 20 + time 18 + spacing between the three labels
+    return int(max(74, 20 + route_h + 18 + pad_t + pad_b + 2))
+
+
+class _RideRow(RecycleRow, BoxLayout):
+    def __init__(self, **kwargs):
+        super().__init__(orientation='horizontal', size_hint=(1, None), height=86, padding=RIDE_ROW_PADDING,
+                         spacing=RIDE_ROW_SPACING, **kwargs)
         with self.canvas.before:
             Color(1, 1, 1, 1)
             self._bg = Rectangle(pos=self.pos, size=self.size)
@@ -36,34 +63,37 @@ class _RideRow(BoxLayout):
             self._line = Line(points=[])
         self.bind(pos=self._update_bg, size=self._update_bg)
 
-        self.ride = ride or {}
-        self.view_cb = view_cb or (lambda *_: None)
+        self.ride = {}
+        self.view_cb = None
 
         # Middle: header (Offer/Request) + route + time
         mid = BoxLayout(orientation='vertical', size_hint=(1, 1), spacing=2)
-        orig = (self.ride.get('origin') or '').strip() or 'Origin'
-        dest = (self.ride.get('destination') or '').strip() or 'Destination'
-        kind = (self.ride.get('kind') or 'offer').strip().lower()
-        kind_label = 'Offer' if kind == 'offer' else 'Request'
-        self._head_lbl = Label(text=f"[b]{kind_label}[/b]", markup=True, color=DARK_BLUE, size_hint=(1, None), height=20)
+        self._head_lbl = Label(markup=True, color=DARK_BLUE, size_hint=(1, None), height=20)
         mid.add_widget(self._head_lbl)
-        # Route label wraps to available width, row height adjusts accordingly
-        self._route_lbl = Label(text=f"{orig} -> {dest}", color=(0, 0, 0, 1), size_hint=(1, None), halign='left', valign='middle')
-        self._route_lbl.bind(width=lambda i, w: setattr(i, 'text_size', (w, None)))
-        self._route_lbl.bind(texture_size=lambda i, v: (setattr(i, 'height', i.texture_size[1]), self._update_size()))
+        # Route label wraps to available width; the row height comes from the data
+        self._route_lbl = Label(color=(0, 0, 0, 1), size_hint=(1, 1), halign='left', valign='middle')
+        self._route_lbl.bind(size=lambda i, v: setattr(i, 'text_size', (i.width, None)))
         mid.add_widget(self._route_lbl)
-        when = (self.ride.get('time') or '').strip()
-        self._when_lbl = Label(text=(when or ''), color=(0, 0, 0, 1), size_hint=(1, None), height=18)
+        self._when_lbl = Label(color=(0, 0, 0, 1), size_hint=(1, None), height=18)
         mid.add_widget(self._when_lbl)
         self.add_widget(mid)
 
         # Right: View button
-        right = AnchorLayout(anchor_x='center', anchor_y='center', size_hint=(None, 1), width=110)
+        right = AnchorLayout(anchor_x='center', anchor_y='center', size_hint=(None, 1), width=RIDE_ROW_BUTTON_WIDTH)
         view_btn = LightRoundedButton(text='View', size_hint=(None, None), size=(80, 36))
-        view_btn.bind(on_press=lambda *_: self.view_cb())
+        view_btn.bind(on_press=lambda *_: self.view_cb and self.view_cb(self.ride))
         right.add_widget(view_btn)
         self.add_widget(right)
 
+    def update_row(self, data: dict):
+        self.ride = data.get('ride') or {}
+        self.view_cb = data.get('view_cb')
+        kind = (self.ride.get('kind') or 'offer').strip().lower()
+        kind_label = 'Offer' if kind == 'offer' else 'Request'
+        self._head_lbl.text = f"[b]{kind_label}[/b]"
+        self._route_lbl.text = data.get('route', '')
+        self._when_lbl.text = (self.ride.get('time') or '').strip()
+
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
             self._bg.pos = self.pos
@@ -72,16 +102,6 @@ class _RideRow(BoxLayout):
         w, h = self.size
         self._line.points = [x, y + h, x + w, y + h]
 
-    def _update_size(self, *args):
-        try:
-            head_h = getattr(self, '_head_lbl', None).height if hasattr(self, '_head_lbl') else 20
-            route_h = getattr(self, '_route_lbl', None).height if hasattr(self, '_route_lbl') else 20
-            when_h = getattr(self, '_when_lbl', None).height if hasattr(self, '_when_lbl') else 18
-            # vertical padding top+bottom = 16 from [12,8,12,8]
-            self.height = max(74, head_h + route_h + when_h + 16 + 2)
-        except Exception:
-            pass
-
 
 class CommuteScreen(Screen):
     def __init__(self, **kwargs):
@@ -116,14 +136,16 @@ class CommuteScreen(Screen):
         self.root_layout.add_widget(header)
 
         # Scrollable list of offers
-        self.scroll = ScrollView(size_hint=(1, 1))
-        self.list_box = BoxLayout(orientation='vertical', size_hint=(1, None), spacing=0, padding=[0, 0, 0, 8])
-        self.list_box.bind(minimum_height=self.list_box.setter('height'))
-        self.scroll.add_widget(self.list_box)
-        self.root_layout.add_widget(self.scroll)
+        self.list_box = RecycleList(spacing=0, padding=[0, 0, 0, 8], row_height=86)
+        # route labels rewrap, so row heights follow the list width
+        self.list_box.bind(width=lambda *_: self._render() if getattr(self, '_rides', None) else None)
+        self.root_layout.add_widget(self.list_box)
 
         # Bottom navigation bar
         self._add_bottom_nav()
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
 
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
@@ -131,31 +153,108 @@ class CommuteScreen(Screen):
             self._bg.size = self.size
 
     def on_pre_enter(self, *args):
+        sockets.add_listener('ride_created', self._on_ride_created)
+        sockets.add_listener('ride_deleted', self._on_ride_deleted)
+        sockets.add_listener('connect', self._on_socket_connect)
+        if api.token:
+            sockets.connect_async(api.token)
+        self._subscribe_feed()
+        # draw the synced copy at once; refresh() brings it up to date
+        if replica.has_data():
+            self._rides = newest_first(replica.rows('rides'))
+            self._render()
         self.refresh()
 
+    def on_leave(self, *args):
+        sockets.remove_listener('ride_created', self._on_ride_created)
+        sockets.remove_listener('ride_deleted', self._on_ride_deleted)
+        sockets.remove_listener('connect', self._on_socket_connect)
+        sockets.unsubscribe_rides()
+        self._calls.cancel_all()
+
+    def _filter_value(self, key):
+        value = (getattr(self, '_filter', {}) or {}).get(key) or 'Any'
+        return None if value == 'Any' else value.lower()
+
+    def _subscribe_feed(self):
+        """Follow only the server's ride room that matches the current filter."""
+        sockets.subscribe_rides(kind=self._filter_value('kind'),
+                                origin=self._filter_value('origin'),
+                                destination=self._filter_value('destination'))
+
+    def _on_socket_connect(self, *_):
+        # catch up on anything published while the socket was down
+        self.refresh()
+
+    def _on_ride_created(self, ride):
+        rides = getattr(self, '_rides', None)
+        if rides is None or not ride or any(r.get('id') == ride.get('id') for r in rides):
+            return
+        rides.insert(0, ride)
+        self._render()
+
+    def _on_ride_deleted(self, ride):
+        rides = getattr(self, '_rides', None)
+        if rides is None or not ride:
+            return
+        self._rides = [r for r in rides if r.get('id') != ride.get('id')]
+        self._render()
+
     def refresh(self):
-        self.list_box.clear_widgets()
-        try:
+        # the current list stays up until the new one arrives
+        self._calls.submit(self._fetch_rides, on_success=self._show, on_error=self._show_error, key='refresh')
+
+    @staticmethod
+    def _fetch_rides():
+        """Sync the replica, then one batch lookup of the drivers so the
+        popups open with names already cached. Runs on the API pool.
+        """
+        if api.token:
+            replica.sync()
+            rides = newest_first(replica.rows('rides'))
+        else:
+            # /sync needs a login; the public list does not
             resp = api.list_rides()
             if resp.status_code != 200:
-                raise Exception(getattr(resp, 'text', resp))
+                raise RuntimeError(getattr(resp, 'text', resp))
             rides = resp.json() or []
-        except Exception as e:
-            self.list_box.add_widget(Label(text=f'Failed to load rides: {e}', color=DARK_BLUE, size_hint=(1, None), height=24))
+        user_cache.prefetch([r.get('driver_id') for r in rides])
+        return rides
+
+    def _show(self, rides):
+        self._rides = rides
+        self._render()
+
+    def _show_error(self, e):
+        if getattr(self, '_rides', None) is not None:
+            # offline: keep showing the synced copy
+            print('Ride sync failed:', e)
             return
-        # Initialize and apply filter (Any/Offer/Request)
-        if not hasattr(self, '_filter'):
-            self._filter = {"kind": 'Any'}
-        kind_sel = (getattr(self, '_filter', {}) or {}).get('kind') or 'Any'
-        if kind_sel and kind_sel != 'Any':
-            want = 'offer' if kind_sel.lower() == 'offer' else 'request'
-            rides = [r for r in rides if (r.get('kind') or 'offer').strip().lower() == want]
+        self.list_box.show_message(f'Failed to load rides: {e}', DARK_BLUE)
+
+    def _render(self):
+        rides = list(getattr(self, '_rides', None) or [])
+        # Apply filter (kind, origin area, destination area)
+        kind_sel = self._filter_value('kind')
+        if kind_sel:
+            rides = [r for r in rides if (r.get('kind') or 'offer').strip().lower() == kind_sel]
+        for key in ('origin', 'destination'):
+            area = self._filter_value(key)
+            if area:
+                rides = [r for r in rides if (r.get(f'{key}_area') or 'other') == area]
         if not rides:
-            self.list_box.add_widget(Label(text='No car pool offers yet', color=DARK_BLUE, size_hint=(1, None), height=24))
+            self.list_box.show_message('No car pool offers yet', DARK_BLUE)
             return
+        width = self.list_box.width
+        rows = []
         for r in rides:
-            row = _RideRow(r, view_cb=(lambda __r=r: self._open_view_popup(__r)))
-            self.list_box.add_widget(row)
+            orig = (r.get('origin') or '').strip() or 'Origin'
+            dest = (r.get('destination') or '').strip() or 'Destination'
+            route = f"{orig} -> {dest}"
+            rows.append({'viewclass': 'RideRow', 'ride': r, 'route': route, 'view_cb': self._open_view_popup,
+                         'height': ride_row_height(route, width)})
+        # a deleted or edited ride only touches its own slice of the data
+        self.list_box.set_rows(rows)
 
     def _open_filter_popup(self):
         from kivy.uix.spinner import Spinner
@@ -171,20 +270,32 @@ class CommuteScreen(Screen):
         info = Label(text='Filter Car Pool', color=DARK_BLUE, size_hint=(1, None), height=24)
         cur = (getattr(self, '_filter', {}) or {}).get('kind') or 'Any'
         kind = Spinner(text=cur, values=('Any','Offer','Request'), size_hint=(1, None), height=40, color=DARK_BLUE)
+        cur_o = (getattr(self, '_filter', {}) or {}).get('origin') or 'Any'
+        origin = Spinner(text=cur_o, values=RIDE_AREAS, size_hint=(1, None), height=40, color=DARK_BLUE)
+        cur_d = (getattr(self, '_filter', {}) or {}).get('destination') or 'Any'
+        destination = Spinner(text=cur_d, values=RIDE_AREAS, size_hint=(1, None), height=40, color=DARK_BLUE)
         actions = BoxLayout(orientation='horizontal', spacing=8, size_hint=(1, None), height=44)
         apply_b = LightRoundedButton(text='Apply', size_hint=(1, 1))
         clear_b = LightRoundedButton(text='Clear', size_hint=(1, 1))
         cancel_b = LightRoundedButton(text='Cancel', size_hint=(1, 1))
         actions.add_widget(apply_b); actions.add_widget(clear_b); actions.add_widget(cancel_b)
-        box.add_widget(info); box.add_widget(kind); box.add_widget(actions)
-        popup = Popup(title='Filter', content=box, size_hint=(None, None), size=(320, 220), auto_dismiss=False, background_color=(0.90, 0.90, 0.94, 1))
+        box.add_widget(info); box.add_widget(kind)
+        for lbl, spinner in (('From', origin), ('To', destination)):
+            row = BoxLayout(orientation='horizontal', spacing=6, size_hint=(1, None), height=40)
+            row.add_widget(Label(text=lbl, color=DARK_BLUE, size_hint=(None, 1), width=44))
+            row.add_widget(spinner)
+            box.add_widget(row)
+        box.add_widget(actions)
+        popup = Popup(title='Filter', content=box, size_hint=(None, None), size=(320, 320), auto_dismiss=False, background_color=(0.90, 0.90, 0.94, 1))
 
         def do_apply(*_):
-            self._filter = {"kind": (kind.text or 'Any').strip() or 'Any'}
-            popup.dismiss(); self.refresh()
+            self._filter = {"kind": (kind.text or 'Any').strip() or 'Any',
+                            "origin": (origin.text or 'Any').strip() or 'Any',
+                            "destination": (destination.text or 'Any').strip() or 'Any'}
+            popup.dismiss(); self._subscribe_feed(); self.refresh()
         def do_clear(*_):
-            self._filter = {"kind": 'Any'}
-            popup.dismiss(); self.refresh()
+            self._filter = {"kind": 'Any', "origin": 'Any', "destination": 'Any'}
+            popup.dismiss(); self._subscribe_feed(); self.refresh()
         def do_cancel(*_):
             popup.dismiss()
         apply_b.bind(on_press=do_apply)
@@ -245,14 +356,13 @@ class CommuteScreen(Screen):
             if not (o and d and t):
                 print('Please fill all fields')
                 return
-            try:
-                r = api.create_ride(o, d, t, kind=k, description=description or None)
+            def done(r):
                 if r.status_code in (200, 201):
                     popup.dismiss(); self.refresh()
                 else:
                     print('Create failed', getattr(r, 'text', r))
-            except Exception as e:
-                print('Error creating ride', e)
+            self._calls.submit(api.create_ride, o, d, t, kind=k, description=description or None,
+                               on_success=done, on_error=lambda e: print('Error creating ride', e), key='create')
 
         def do_cancel(*_):
             popup.dismiss()
@@ -286,11 +396,20 @@ class CommuteScreen(Screen):
             row.add_widget(Label(text=value or '', color=(0, 0, 0, 1)))
             return row
 
+        def show_driver(user):
+            driver_row.children[0].text = display_name(user) or ''
+
         kind_text = (ride.get('kind') or 'offer').strip().lower()
         kind_text = 'Offer' if kind_text == 'offer' else 'Request'
         route_title = f"{kind_text}: {(ride.get('origin') or '').strip()} -> {(ride.get('destination') or '').strip()}"
         content.add_widget(Label(text=route_title, color=DARK_BLUE, size_hint=(1, None), height=24))
         content.add_widget(line('Type:', kind_text))
+        driver_row = line('Posted by:', user_cache.name(owner_id))
+        content.add_widget(driver_row)
+        if owner_id and not user_cache.get(owner_id):
+            # rides pushed over the socket may name a driver not cached yet
+            self._calls.submit(user_cache.get_many, [owner_id], key='driver', on_error=lambda e: None,
+                               on_success=lambda users: show_driver(users.get(int(owner_id))))
         content.add_widget(line('Origin:', ride.get('origin') or ''))
         content.add_widget(line('Destination:', ride.get('destination') or ''))
         content.add_widget(line('Time:', ride.get('time') or ''))
@@ -314,14 +433,13 @@ class CommuteScreen(Screen):
         if me and owner_id and me == owner_id:
             del_b = LightRoundedButton(text='Delete', size_hint=(1, 1))
             def do_delete(*_):
-                try:
-                    r = api.delete_ride(ride.get('id'))
+                def done(r):
                     if r.status_code == 200:
                         popup.dismiss(); self.refresh()
                     else:
                         print('Delete failed', getattr(r, 'text', r))
-                except Exception as e:
-                    print('Error deleting ride', e)
+                self._calls.submit(api.delete_ride, ride.get('id'), on_success=done,
+                                   on_error=lambda e: print('Error deleting ride', e), key='delete')
             del_b.bind(on_press=do_delete)
             actions.add_widget(del_b)
         else:
@@ -393,3 +511,6 @@ class CommuteScreen(Screen):
                 self.manager.current = name
             except Exception:
                 pass
+
+
+Factory.register('RideRow', cls=_RideRow)
@@ -9,6 +9,12 @@ from kivy.uix.popup import Popup
 from kivy.uix.label import Label
 from kivy.graphics import Color, RoundedRectangle, Line
 from services.api import api
+from services.background import CallGroup
+from components.loading import LoadingIndicator
+try:
+    from local_store import set_session
+except Exception:
+    from frontend.local_store import set_session
 import os
 
 # Resolve absolute assets directory so images load regardless of CWD
@@ -148,6 +154,12 @@ class LoginScreen(Screen):
             pass
         root.add_widget(card)
         self.add_widget(root)
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
+
+    def on_leave(self, *args):
+        self._calls.cancel_all()
 
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
@@ -160,17 +172,18 @@ class LoginScreen(Screen):
         if not email or not password:
             self._alert("Please enter Email & Password.")
             return
-        try:
-            resp = api.login(email, password)
-        except Exception:
-            self._alert("Network error. Please try again.")
-            return
+        self._calls.submit(api.login, email, password, on_success=self._login_done,
+                           on_error=lambda e: self._alert("Network error. Please try again."), key="login")
+
+    def _login_done(self, resp):
         try:
             status = resp.status_code
         except Exception:
             status = 0
         if status == 200:
             print("Login success")
+            # the next app start opens straight into the app with this session
+            set_session(api.token, api.user)
             try:
                 t = self.manager.get_screen('tasks')
                 if t:
@@ -4,6 +4,15 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from services.api import api
+from services.background import CallGroup
+from services.replica import replica
+from services.user_cache import user_cache
+try:
+    from local_store import clear_session
+except Exception:
+    from frontend.local_store import clear_session
+from components.loading import LoadingIndicator
+from services import sockets
 from components.bottom_nav import BottomNav
 # Reuse shared button style from Tasks screen
 try:
@@ -45,6 +54,12 @@ class ProfileScreen(Screen):
         # Bottom navigation bar
         self._add_bottom_nav()
         self.add_widget(self.layout)
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
+
+    def on_leave(self, *args):
+        self._calls.cancel_all()
 
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
@@ -58,24 +73,33 @@ class ProfileScreen(Screen):
             self.bio.text = api.user.get("bio", "")
 
     def save_profile(self, instance):
-        from requests import put
         if not api.token:
             print("Login first")
             return
-        payload = {
-            "first_name": self.first_name.text.strip(),
-            "last_name": self.last_name.text.strip(),
-            "username": (self.first_name.text.strip() + " " + self.last_name.text.strip()).strip(),
-            "bio": self.bio.text.strip(),
-        }
-        resp = put(f"{api.base}/users/me", json=payload, headers=api._headers())
+        self._calls.submit(
+            api.update_profile,
+            first_name=self.first_name.text.strip(),
+            last_name=self.last_name.text.strip(),
+            username=(self.first_name.text.strip() + " " + self.last_name.text.strip()).strip(),
+            bio=self.bio.text.strip(),
+            on_success=self._save_done, key="save",
+        )
+
+    def _save_done(self, resp):
         if resp.status_code == 200:
+            # other screens show our name from the cache
+            user_cache.put((resp.json() or {}).get('user'))
             print("Profile updated")
         else:
             print("Failed", resp.text)
 
     def sign_out(self, *_):
+        self._calls.cancel_all()
+        user_cache.invalidate()
+        replica.reset()
+        clear_session()
         api.logout()
+        sockets.disconnect()
         try:
             self.manager.current = 'login'
         except Exception:
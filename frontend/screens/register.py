@@ -5,6 +5,8 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.uix.label import Label
 from services.api import api
+from services.background import CallGroup
+from components.loading import LoadingIndicator
 
 class RegisterScreen(Screen):
     def __init__(self, **kwargs):
@@ -43,6 +45,12 @@ class RegisterScreen(Screen):
         layout.add_widget(register_btn)
         layout.add_widget(back_btn)
         self.add_widget(layout)
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
+
+    def on_leave(self, *args):
+        self._calls.cancel_all()
 
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
@@ -61,7 +69,11 @@ class RegisterScreen(Screen):
         if not email.lower().endswith("@student.kpu.ca"):
             self._alert("Please use your KPU student email (@student.kpu.ca).")
             return
-        resp = api.register(email=email, password=password, first_name=first_name, last_name=last_name)
+        self._calls.submit(api.register, email=email, password=password, first_name=first_name,
+                           last_name=last_name, on_success=lambda resp: self._register_done(resp, email),
+                           on_error=lambda e: self._alert("Network error. Please try again."), key="register")
+
+    def _register_done(self, resp, email):
         if resp.status_code in (200, 201):
             try:
                 data = resp.json()
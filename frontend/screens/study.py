@@ -1,13 +1,13 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.anchorlayout import AnchorLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.widget import Widget
 from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.graphics import Color, Rectangle, Ellipse, Line
+from kivy.factory import Factory
 
 # Reuse shared styles from Task screen
 try:
@@ -16,24 +16,32 @@ except Exception:  # fallback colors if import fails during design time
     LightRoundedButton = Button
     DARK_BLUE = (0.10, 0.20, 0.55, 1)
 from services.api import api
+from services.background import CallGroup
+from services.replica import newest_first, replica
+from services.user_cache import user_cache
+from components.loading import LoadingIndicator
+from components.recycle_list import RecycleList, RecycleRow, hint_row
 
 
 class _ColorDot(Widget):
     def __init__(self, rgba=(0.6, 0.6, 0.6, 1), size_px=36, **kwargs):
         super().__init__(size_hint=(None, None), size=(size_px, size_px), **kwargs)
         with self.canvas:
-            Color(*rgba)
+            self._color = Color(*rgba)
             self._circle = Ellipse(pos=self.pos, size=self.size)
         self.bind(pos=self._update, size=self._update)
 
+    def set_rgba(self, rgba):
+        self._color.rgba = rgba
+
     def _update(self, *args):
         if hasattr(self, "_circle"):
             self._circle.pos = self.pos
             self._circle.size = self.size
 
 
-class _StudyRow(BoxLayout):
-    def __init__(self, session: dict, connect_cb=None, update_cb=None, delete_cb=None, view_cb=None, dot_rgba=(0.6, 0.6, 0.6, 1), **kwargs):
+class _StudyRow(RecycleRow, BoxLayout):
+    def __init__(self, **kwargs):
         super().__init__(orientation="horizontal", size_hint=(1, None), height=74, padding=[10, 8, 10, 8], spacing=10, **kwargs)
         with self.canvas.before:
             Color(1, 1, 1, 1)
@@ -42,47 +50,57 @@ class _StudyRow(BoxLayout):
             self._line = Line(points=[])
         self.bind(pos=self._update_bg, size=self._update_bg)
 
-        self.session = session or {}
-        self.connect_cb = connect_cb or (lambda *_: None)
-        self.update_cb = update_cb or (lambda *_: None)
-        self.delete_cb = delete_cb or (lambda *_: None)
-        self.view_cb = view_cb or (lambda *_: None)
+        self.session = {}
+        self.connect_cb = None
+        self.update_cb = None
+        self.delete_cb = None
+        self.view_cb = None
 
         # Left dot (centered vertically using an AnchorLayout)
         dot_size = 34
         from kivy.uix.anchorlayout import AnchorLayout as _AL
         dot_wrap = _AL(anchor_x='center', anchor_y='center', size_hint=(None, 1), width=dot_size)
-        dot_wrap.add_widget(_ColorDot(dot_rgba, size_px=dot_size))
+        self._dot = _ColorDot(size_px=dot_size)
+        dot_wrap.add_widget(self._dot)
         self.add_widget(dot_wrap)
 
         # Center column
         col = BoxLayout(orientation="vertical")
         col.add_widget(Label(text="[b]Course[/b]", markup=True, color=DARK_BLUE, size_hint=(1, None), height=22))
-        col.add_widget(Label(text=self.session.get('course') or '', color=(0, 0, 0, 1), size_hint=(1, None), height=20))
-        available = bool(self.session.get('available'))
-        # Show simple availability text only to avoid overlap
-        status_text = "Available now" if available else "Not available"
-        status_color = (0.15, 0.55, 0.25, 1) if available else (0.55, 0.15, 0.15, 1)
-        col.add_widget(Label(text=status_text, color=status_color, size_hint=(1, None), height=18))
+        self._course_lbl = Label(color=(0, 0, 0, 1), size_hint=(1, None), height=20)
+        col.add_widget(self._course_lbl)
+        self._status_lbl = Label(size_hint=(1, None), height=18)
+        col.add_widget(self._status_lbl)
         self.add_widget(col)
 
-        # Right side controls
-        right = AnchorLayout(anchor_x='center', anchor_y='center', size_hint=(None, 1), width=150)
-        owner_id = self.session.get('user_id')
+        # Right side controls: owners get Edit (opens popup), everyone else View
+        self._right = AnchorLayout(anchor_x='center', anchor_y='center', size_hint=(None, 1), width=150)
+        self._edit_btn = LightRoundedButton(text="Edit", size_hint=(None, None), size=(80, 36))
+        self._edit_btn.bind(on_press=lambda *_: self.update_cb and self.update_cb(self.session, None))
+        self._view_btn = LightRoundedButton(text="View", size_hint=(None, None), size=(100, 36))
+        self._view_btn.bind(on_press=lambda *_: self.view_cb and self.view_cb(self.session))
+        self.add_widget(self._right)
+
+    def update_row(self, data: dict):
+        self.session = data.get('session') or {}
+        self.connect_cb = data.get('connect_cb')
+        self.update_cb = data.get('update_cb')
+        self.delete_cb = data.get('delete_cb')
+        self.view_cb = data.get('view_cb')
+        self._dot.set_rgba(data.get('dot_rgba') or (0.6, 0.6, 0.6, 1))
+        self._course_lbl.text = self.session.get('course') or ''
+        available = bool(self.session.get('available'))
+        # Show simple availability text only to avoid overlap
+        status = "Available now" if available else "Not available"
+        host = data.get('host')
+        self._status_lbl.text = f"{status} \u00b7 {host}" if host else status
+        self._status_lbl.color = (0.15, 0.55, 0.25, 1) if available else (0.55, 0.15, 0.15, 1)
         me = (api.user or {}).get('id')
-        if me and owner_id == me:
-            # Owner controls: single Edit button opens popup
-            edit_btn = LightRoundedButton(text="Edit", size_hint=(None, None), size=(80, 36))
-            edit_btn.bind(on_press=lambda *_: self.update_cb(self.session, None))
-            right.add_widget(edit_btn)
-        else:
-            btn = LightRoundedButton(text="View", size_hint=(None, None), size=(100, 36))
-            if not available:
-                # still allow viewing even if not available
-                pass
-            btn.bind(on_press=lambda *_: self.view_cb(self.session))
-            right.add_widget(btn)
-        self.add_widget(right)
+        # still allow viewing even if not available
+        btn = self._edit_btn if me and self.session.get('user_id') == me else self._view_btn
+        if btn.parent is None:
+            self._right.clear_widgets()
+            self._right.add_widget(btn)
 
     def _connect(self, title, course):
         pass
@@ -132,14 +150,14 @@ class StudyScreen(Screen):
         self.root_layout.add_widget(header)
 
         # Scrollable list
-        self.scroll = ScrollView(size_hint=(1, 1))
-        self.list_box = BoxLayout(orientation="vertical", size_hint=(1, None), spacing=0, padding=[0, 0, 0, 8])
-        self.list_box.bind(minimum_height=self.list_box.setter('height'))
-        self.scroll.add_widget(self.list_box)
-        self.root_layout.add_widget(self.scroll)
+        self.list_box = RecycleList(spacing=0, padding=[0, 0, 0, 8], row_height=74)
+        self.root_layout.add_widget(self.list_box)
 
         # Bottom nav
         self._add_bottom_nav()
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
 
     def on_pre_enter(self, *args):
         # current filter
@@ -147,37 +165,74 @@ class StudyScreen(Screen):
             self._filter = {"q": None, "campus": None}
         self._populate_list()
 
+    def on_leave(self, *args):
+        self._calls.cancel_all()
+
     def _populate_list(self):
-        self.list_box.clear_widgets()
-        try:
-            q = None; campus = None
-            f = getattr(self, '_filter', {}) or {}
-            q = (f.get('q') or '').strip() or None
-            campus = (f.get('campus') or '').strip() or None
-            if campus and campus.lower() == 'any':
-                campus = None
+        f = getattr(self, '_filter', {}) or {}
+        q = (f.get('q') or '').strip() or None
+        campus = (f.get('campus') or '').strip() or None
+        if campus and campus.lower() == 'any':
+            campus = None
+        # without a course search the synced copy can be drawn at once
+        self._showing_local = not q and replica.has_data()
+        if self._showing_local:
+            self._show_sessions(self._local_sessions(campus))
+        # the current list stays up until the new one arrives
+        self._calls.submit(self._fetch_sessions, q, campus, on_success=self._show_sessions,
+                           on_error=self._show_error, key='refresh')
+
+    @staticmethod
+    def _local_sessions(campus):
+        sessions = replica.rows('study')
+        if campus:
+            sessions = [s for s in sessions if (s.get('campus') or '').lower() == campus.lower()]
+        return newest_first(sessions)
+
+    @classmethod
+    def _fetch_sessions(cls, q, campus):
+        """Sessions plus one batch lookup of the hosts. Course searches go to
+        the server's full-text index; everything else syncs the replica and
+        filters it. Runs on the API pool.
+        """
+        if q or not api.token:
             resp = api.list_study_sessions(q=q, campus=campus)
             if resp.status_code != 200:
-                raise Exception(getattr(resp, 'text', resp))
+                raise RuntimeError(getattr(resp, 'text', resp))
             sessions = resp.json() or []
-        except Exception as e:
-            self.list_box.add_widget(Label(text=f"Failed to load sessions: {e}", color=DARK_BLUE))
+        else:
+            replica.sync()
+            sessions = cls._local_sessions(campus)
+        user_cache.prefetch([s.get('user_id') for s in sessions])
+        return sessions
+
+    def _show_error(self, e):
+        if getattr(self, '_showing_local', False):
+            # offline: keep showing the synced copy
+            print('Study sync failed:', e)
             return
+        self.list_box.show_message(f"Failed to load sessions: {e}", DARK_BLUE)
+
+    def _show_sessions(self, sessions):
+        rows = []
         for s in sessions:
             # Dot color: Available -> green, Not Available -> black
             rgba = (0.15, 0.55, 0.25, 1) if bool(s.get('available')) else (0.00, 0.00, 0.00, 1)
-            row = _StudyRow(
-                s,
-                connect_cb=self._connect_to_session,
-                update_cb=self._update_session_status,
-                delete_cb=self._delete_session,
-                view_cb=self._open_view_session_popup,
-                dot_rgba=rgba,
-            )
-            self.list_box.add_widget(row)
+            rows.append({
+                'viewclass': 'StudyRow',
+                'session': s,
+                'connect_cb': self._connect_to_session,
+                'update_cb': self._update_session_status,
+                'delete_cb': self._delete_session,
+                'view_cb': self._open_view_session_popup,
+                'dot_rgba': rgba,
+                'host': user_cache.name(s.get('user_id')),
+                'height': 74,
+            })
 
         if not sessions:
-            self.list_box.add_widget(Label(text="No sessions match the filter.", color=DARK_BLUE, size_hint=(1, None), height=24))
+            rows.append(hint_row("No sessions match the filter.", DARK_BLUE))
+        self.list_box.set_rows(rows)
 
     def _add_bottom_nav(self):
         try:
@@ -297,12 +352,15 @@ class StudyScreen(Screen):
             if not course:
                 return
             campus = campus_spinner.text.strip() or 'Surrey'
-            r = api.create_study_session(course, state["available"], campus, teacher_input.text.strip() or None, desc_input.text.strip() or None)
-            if r.status_code in (200, 201):
-                popup.dismiss()
-                self._populate_list()
-            else:
-                print('Create failed', getattr(r, 'text', r))
+            def done(r):
+                if r.status_code in (200, 201):
+                    popup.dismiss()
+                    self._populate_list()
+                else:
+                    print('Create failed', getattr(r, 'text', r))
+            self._calls.submit(api.create_study_session, course, state["available"], campus,
+                               teacher_input.text.strip() or None, desc_input.text.strip() or None,
+                               on_success=done, on_error=lambda e: print('Create failed', e), key='create')
         def do_cancel(*_):
             popup.dismiss()
         ok.bind(on_press=do_post)
@@ -317,7 +375,10 @@ class StudyScreen(Screen):
         sid = session.get('id')
         if not sid:
             return
-        r = api.update_study_session(sid, available=available_bool)
+        self._calls.submit(api.update_study_session, sid, available=available_bool,
+                           on_success=self._changed, on_error=lambda e: print('Update failed', e))
+
+    def _changed(self, r):
         if r.status_code == 200:
             self._populate_list()
         else:
@@ -364,11 +425,13 @@ class StudyScreen(Screen):
 
         def do_save(*_):
             avail = True if t_av.state == 'down' else False
-            r = api.update_study_session(session.get('id'), available=avail)
-            if r.status_code == 200:
-                popup.dismiss(); self._populate_list()
-            else:
-                print('Update failed', getattr(r, 'text', r))
+            def done(r):
+                if r.status_code == 200:
+                    popup.dismiss(); self._populate_list()
+                else:
+                    print('Update failed', getattr(r, 'text', r))
+            self._calls.submit(api.update_study_session, session.get('id'), available=avail,
+                               on_success=done, on_error=lambda e: print('Update failed', e))
         def do_delete(*_):
             self._delete_session(session); popup.dismiss()
         def do_cancel(*_):
@@ -382,11 +445,13 @@ class StudyScreen(Screen):
         sid = session.get('id')
         if not sid:
             return
-        r = api.delete_study_session(sid)
-        if r.status_code == 200:
-            self._populate_list()
-        else:
-            print('Delete failed', getattr(r, 'text', r))
+        def done(r):
+            if r.status_code == 200:
+                self._populate_list()
+            else:
+                print('Delete failed', getattr(r, 'text', r))
+        self._calls.submit(api.delete_study_session, sid, on_success=done,
+                           on_error=lambda e: print('Delete failed', e))
 
     def _connect_to_session(self, session: dict):
         sid = session.get('id')
@@ -407,12 +472,16 @@ class StudyScreen(Screen):
         except Exception:
             pass
         # Call connect endpoint (optional, but keeps API semantics)
-        r = api.connect_study_session(sid)
-        if r.status_code not in (200, 201):
+        self._calls.submit(api.connect_study_session, sid,
+                           on_success=lambda r: self._open_owner_chat(session, owner_id, r),
+                           on_error=lambda e: self._open_owner_chat(session, owner_id, None), key='connect')
+
+    def _open_owner_chat(self, session: dict, owner_id, r):
+        if r is None or r.status_code not in (200, 201):
             # fallback: use owner_id from session list
             print('Connect fallback: ', getattr(r, 'text', r))
         try:
-            data = r.json() if r.status_code in (200, 201) else {}
+            data = r.json() if r is not None and r.status_code in (200, 201) else {}
             owner_id = data.get('owner_id') or owner_id
         except Exception:
             pass
@@ -458,6 +527,7 @@ class StudyScreen(Screen):
 
         box.add_widget(Label(text='Study Session', color=DARK_BLUE, size_hint=(1, None), height=24))
         box.add_widget(line('Course:', session.get('course') or ''))
+        box.add_widget(line('Host:', user_cache.name(session.get('user_id'))))
         box.add_widget(line('Campus:', session.get('campus') or ''))
         box.add_widget(line('Teacher:', session.get('teacher') or ''))
         # Description as multi-line block
@@ -522,3 +592,6 @@ class StudyScreen(Screen):
         clear_b.bind(on_press=do_clear)
         cancel_b.bind(on_press=do_cancel)
         popup.open()
+
+
+Factory.register('StudyRow', cls=_StudyRow)
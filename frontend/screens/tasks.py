@@ -5,12 +5,22 @@ from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.anchorlayout import AnchorLayout
 from kivy.uix.image import Image
 from components.task_card import TaskCard
 from components.bottom_nav import BottomNav
 from services.api import api
+from services import sockets
+from services.background import CallGroup, run_async
+from services.replica import newest_first, replica
+from services.user_cache import user_cache
+try:
+    from local_store import clear_session
+except Exception:
+    from frontend.local_store import clear_session
+from components.loading import LoadingIndicator
+from components.recycle_list import RecycleList, RecycleRow, hint_row
+from kivy.factory import Factory
 
 DARK_BLUE = (0.10, 0.20, 0.55, 1)
 
@@ -18,6 +28,9 @@ DARK_BLUE = (0.10, 0.20, 0.55, 1)
 _FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 ASSETS_DIR = os.path.join(_FRONTEND_DIR, 'assets')
 
+# Rows fetched per "page" of the task feed
+TASK_PAGE_SIZE = 30
+
 class TaskScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -41,12 +54,19 @@ class TaskScreen(Screen):
         self.location_spinner = None
         # track currently open edit popup
         self._edit_popup = None
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
 
     def on_enter(self, *args):
         # Do not force a view on enter; navigation callbacks
         # explicitly choose Home or Tasks list as needed.
         pass
 
+    def on_leave(self, *args):
+        self._calls.cancel_all()
+        self._feed_loading = False
+
     def load_tasks(self):
         # Build list view with header + scroll
         self.root_layout.clear_widgets()
@@ -72,52 +92,36 @@ class TaskScreen(Screen):
         header.add_widget(title_row)
         self.root_layout.add_widget(header)
 
-        scroll = ScrollView(size_hint=(1, 1))
         # Match Study Buddy list layout: tight rows with top dividers
-        self.content = BoxLayout(orientation="vertical", spacing=0, size_hint=(1, None), padding=[0, 0, 0, 8])
-        self.content.bind(minimum_height=self.content.setter("height"))
-        scroll.add_widget(self.content)
-        self.root_layout.add_widget(scroll)
+        self.content = RecycleList(spacing=0, padding=[0, 0, 0, 8], row_height=64)
+        # fetch the next page when the user reaches the bottom of the list
+        self.content.bind(scroll_y=lambda inst, val: self._load_next_page() if val <= 0 else None)
+        self.root_layout.add_widget(self.content)
         # bottom navigation bar
         self._add_bottom_nav(active="Tasks")
 
-        # fetch all tasks; if not logged in, still show
-        resp = api.list_tasks()
-        if resp.status_code != 200:
-            self.content.add_widget(Label(text="Failed to load tasks.", color=DARK_BLUE))
-            return
-
-        tasks = resp.json() or []
         # initialize filter if missing
         if not hasattr(self, '_filter'):
             self._filter = {"status": None, "location": None}
-        # apply filters
-        tasks = self._apply_task_filters(tasks)
-        my_id = api.user.get("id") if api.user else None
-        # Partition into mine and others
-        mine = [t for t in tasks if my_id and t.get("user_id") == my_id]
-        others = [t for t in tasks if not (my_id and t.get("user_id") == my_id)]
-
-        # Sort others by status order: open -> assigned -> done
-        def _rank_status(t: dict) -> int:
-            s = (t.get('status') or 'open').lower()
-            if s in ('open', ''):
-                return 0
-            if s == 'assigned':
-                return 1
-            if s == 'done':
-                return 2
-            return 3
-
-        others_sorted = sorted(others, key=_rank_status)
-
-        ordered = (mine or []) + others_sorted
-        if not ordered:
-            self._add_hint("No tasks yet.")
-        else:
-            for t in ordered:
-                rgba = self._dot_color_for_task(t)
-                self._add_task_row(t, mine=bool(my_id and t.get('user_id') == my_id), dot_rgba=rgba)
+        # page through the server-side feed; if not logged in, still show
+        self._my_id = api.user.get("id") if api.user else None
+        self._feed_segments = self._build_feed_segments()
+        self._feed_cursor = None
+        self._feed_count = 0
+        # a page still loading belongs to the list just cleared
+        self._calls.cancel('feed')
+        self._feed_loading = False
+        # draw the first page from the synced copy; the server's page
+        # replaces it when it arrives
+        local = self._local_page(self._feed_segments)
+        self._feed_local = bool(local)
+        if local:
+            self.content.set_rows([self._task_row(t, mine=bool(self._my_id and t.get('user_id') == self._my_id),
+                                                  dot_rgba=self._dot_color_for_task(t)) for t in local])
+        self._load_next_page()
+        if api.token:
+            # keep the copy current for the next visit
+            run_async(replica.sync, on_error=lambda e: print('Sync failed:', e))
 
     def open_add_task(self, instance):
         self.show_form()
@@ -140,16 +144,11 @@ class TaskScreen(Screen):
         if not api.token:
             print("Please log in to create tasks.")
             return
-        extra = []
-        if reward:
-            extra.append(f"Reward: {reward}")
-        if deadline:
-            extra.append(f"Deadline: {deadline}")
-        if location:
-            extra.append(f"Location: {location}")
-        if extra:
-            desc = (desc + "\n" if desc else "") + " | ".join(extra)
-        resp = api.create_task(title, desc)
+        self._calls.submit(api.create_task, title, desc, reward=reward or None, deadline=deadline or None,
+                           location=location or None, on_success=self._task_created,
+                           on_error=lambda e: print("Failed to create task:", e), key='create')
+
+    def _task_created(self, resp):
         if resp.status_code in (200, 201):
             print("Task created")
             self.show_home()
@@ -173,6 +172,12 @@ class TaskScreen(Screen):
         body = BoxLayout(orientation="vertical", spacing=10, padding=[16, 10, 16, 10])
         title = Label(text=f"[b]{task.get('title','')}[/b]", markup=True, size_hint=(1, None), height=28, color=DARK_BLUE)
         base_desc, reward, deadline, location = self._parse_details(task.get("description", ""))
+        # prefer the typed columns; legacy tasks may only have the text form
+        if task.get('reward_cents') is not None:
+            reward = self._format_reward(task.get('reward_cents'))
+        if task.get('deadline_at'):
+            deadline = self._format_deadline(task.get('deadline_at'))
+        location = task.get('location') or location
         desc = Label(text=base_desc or "(No description)", size_hint=(1, None), height=60, color=(0,0,0,1))
         # chips stacked vertically (one per line)
         chips = BoxLayout(orientation='vertical', spacing=6, size_hint=(1, None))
@@ -187,6 +192,12 @@ class TaskScreen(Screen):
             add_chip(f"Deadline: {deadline}")
         if location:
             add_chip(f"Location: {location}")
+        owner = user_cache.name(task.get('user_id'))
+        if owner:
+            add_chip(f"Posted by: {owner}")
+        assignee = user_cache.name(task.get('assignee_id'))
+        if assignee:
+            add_chip(f"Assigned to: {assignee}")
         body.add_widget(title)
         body.add_widget(desc)
         if len(chips.children) > 0:
@@ -233,7 +244,10 @@ class TaskScreen(Screen):
         if not api.token:
             print("Please log in to delete tasks.")
             return
-        resp = api.delete_task(task.get("id"))
+        self._calls.submit(api.delete_task, task.get("id"), on_success=self._task_deleted,
+                           on_error=lambda e: print("Delete failed:", e))
+
+    def _task_deleted(self, resp):
         if resp.status_code == 200:
             print("Task deleted")
             self.load_tasks()
@@ -267,11 +281,13 @@ class TaskScreen(Screen):
                 print('Login required')
                 return
             new_status = 'done' if t_done.state == 'down' else 'open'
-            r = api.update_task(task.get('id'), status=new_status)
-            if getattr(r, 'status_code', 0) in (200, 201):
-                popup.dismiss(); self.load_tasks()
-            else:
-                print('Update failed', getattr(r, 'text', r))
+            def done(r):
+                if getattr(r, 'status_code', 0) in (200, 201):
+                    popup.dismiss(); self.load_tasks()
+                else:
+                    print('Update failed', getattr(r, 'text', r))
+            self._calls.submit(api.update_task, task.get('id'), status=new_status,
+                               on_success=done, on_error=lambda e: print('Update failed', e))
         def do_delete(*_):
             self.delete_task(task); popup.dismiss()
         def do_cancel(*_):
@@ -287,7 +303,12 @@ class TaskScreen(Screen):
             self._bg.size = self.size
 
     def sign_out(self, instance):
+        self._calls.cancel_all()
+        user_cache.invalidate()
+        replica.reset()
+        clear_session()
         api.logout()
+        sockets.disconnect()
         # clear current list and go back to login
         self.root_layout.clear_widgets()
         if self.manager:
@@ -337,7 +358,7 @@ class TaskScreen(Screen):
         self.title_input = RoundedInput(hint='Task Title')
         self.desc_input = RoundedInput(hint='Description', multiline=True, height=90)
         self.reward_input = RoundedInput(hint='Reward Points (Optional)')
-        self.deadline_input = RoundedInput(hint='Deadline')
+        self.deadline_input = RoundedInput(hint='Deadline (YYYY-MM-DD HH:MM)')
         from kivy.uix.spinner import Spinner
         # Optional location via dropdown
         self.location_spinner = Spinner(
@@ -435,20 +456,27 @@ class TaskScreen(Screen):
         cur_loc = (getattr(self, '_filter', {}) or {}).get('location') or 'Any'
         loc_values = ('Any', 'Surrey', 'Langley', 'Richmond')
         location = Spinner(text=cur_loc, values=loc_values, size_hint=(1, None), height=40, color=DARK_BLUE)
+        # Sort: newest first, or soonest deadline (tasks with a deadline only)
+        cur_sort = (getattr(self, '_filter', {}) or {}).get('sort') or 'Newest'
+        sort = Spinner(text=cur_sort, values=('Newest', 'Deadline'), size_hint=(1, None), height=40, color=DARK_BLUE)
+        # Keyword: server-side full-text search, ranked by relevance
+        keyword = RoundedInput(hint='Keyword (title or description)')
+        keyword.input.text = (getattr(self, '_filter', {}) or {}).get('q') or ''
         # Actions
         actions = BoxLayout(orientation='horizontal', spacing=8, size_hint=(1, None), height=44)
         apply_b = LightRoundedButton(text='Apply', size_hint=(1, 1))
         clear_b = LightRoundedButton(text='Clear', size_hint=(1, 1))
         cancel_b = LightRoundedButton(text='Cancel', size_hint=(1, 1))
         actions.add_widget(apply_b); actions.add_widget(clear_b); actions.add_widget(cancel_b)
-        box.add_widget(info); box.add_widget(status); box.add_widget(location); box.add_widget(actions)
-        popup = Popup(title='Filter', content=box, size_hint=(None, None), size=(340, 260), auto_dismiss=False, background_color=(0.90, 0.90, 0.94, 1))
+        box.add_widget(info); box.add_widget(keyword); box.add_widget(status); box.add_widget(location); box.add_widget(sort); box.add_widget(actions)
+        popup = Popup(title='Filter', content=box, size_hint=(None, None), size=(340, 364), auto_dismiss=False, background_color=(0.90, 0.90, 0.94, 1))
 
         def do_apply(*_):
-            self._filter = {"status": status.text.strip() or None, "location": location.text.strip() or None}
+            self._filter = {"status": status.text.strip() or None, "location": location.text.strip() or None,
+                            "sort": sort.text.strip() or None, "q": keyword.input.text.strip() or None}
             popup.dismiss(); self.load_tasks()
         def do_clear(*_):
-            self._filter = {"status": None, "location": None}
+            self._filter = {"status": None, "location": None, "sort": None, "q": None}
             popup.dismiss(); self.load_tasks()
         def do_cancel(*_):
             popup.dismiss()
@@ -457,38 +485,135 @@ class TaskScreen(Screen):
         cancel_b.bind(on_press=do_cancel)
         popup.open()
 
-    def _apply_task_filters(self, tasks: list) -> list:
-        """Filter tasks by status and location (from description) based on self._filter.
+    def _build_feed_segments(self) -> list:
+        """Return the ordered list of server queries that make up the task list.
+        My tasks come first, then everyone else's grouped open -> assigned -> done.
         Status mapping: Available->open, In Progress->assigned, Complete->done.
-        Location is matched case-insensitively as a substring of parsed location.
+        Each segment is paged with the server's keyset cursor.
         """
         f = getattr(self, '_filter', {}) or {}
-        status_sel = (f.get('status') or 'Any').strip()
+        status_map = {'Available': 'open', 'In Progress': 'assigned', 'Complete': 'done'}
+        status = status_map.get((f.get('status') or 'Any').strip())
         loc_sel = (f.get('location') or 'Any').strip()
-        if status_sel == 'Any' and loc_sel == 'Any':
-            return tasks
-        def status_ok(t: dict) -> bool:
-            if status_sel == 'Any':
-                return True
-            s = (t.get('status') or 'open').lower()
-            if status_sel == 'Available':
-                return s in ('open', '')
-            if status_sel == 'In Progress':
-                return s == 'assigned'
-            if status_sel == 'Complete':
-                return s == 'done'
-            return True
-        def location_ok(t: dict) -> bool:
-            if loc_sel == 'Any':
-                return True
-            try:
-                base, reward, deadline, location = self._parse_details(t.get('description') or '')
-                if not location:
-                    return False
-                return loc_sel.lower() in location.lower()
-            except Exception:
-                return False
-        return [t for t in tasks if status_ok(t) and location_ok(t)]
+        location = None if loc_sel == 'Any' else loc_sel
+        sort = 'deadline' if (f.get('sort') or '') == 'Deadline' else None
+        if f.get('q'):
+            # keyword results come back ranked; status/location narrow each page
+            return [{"search": f.get('q'), "status": status, "location": location}]
+        segments = []
+        if self._my_id:
+            segments.append({"owner": self._my_id, "status": status, "location": location, "sort": sort})
+        for s in ([status] if status else ['open', 'assigned', 'done']):
+            segments.append({"exclude_owner": self._my_id, "status": s, "location": location, "sort": sort})
+        return segments
+
+    def _load_next_page(self, *_):
+        if getattr(self, '_feed_loading', False) or not getattr(self, '_feed_segments', None):
+            return
+        self._feed_loading = True
+        data = self.content.data
+        if data and data[-1].get('viewclass') == 'LoadMoreRow':
+            data.pop()
+        self._calls.submit(self._fetch_page, list(self._feed_segments), self._feed_cursor,
+                           on_success=self._show_page, on_error=self._page_failed, key='feed')
+
+    def _fetch_page(self, segments: list, cursor):
+        """Fetch up to TASK_PAGE_SIZE rows across the feed segments.
+
+        Runs on the API pool, so it only touches its own copies of the feed
+        state; _show_page applies the result on the main thread.
+        """
+        tasks = []
+        while segments and len(tasks) < TASK_PAGE_SIZE:
+            seg = segments[0]
+            if seg.get('search'):
+                resp = api.search(seg['search'], kind='task', limit=TASK_PAGE_SIZE - len(tasks), offset=cursor)
+            else:
+                resp = api.list_tasks(limit=TASK_PAGE_SIZE - len(tasks), cursor=cursor, **seg)
+            if resp.status_code != 200:
+                return {"tasks": tasks, "segments": [], "cursor": None, "failed": True}
+            data = resp.json() or {}
+            if seg.get('search'):
+                found = [r.get('item') or {} for r in data.get('results') or []]
+                data = {"tasks": [t for t in found if self._matches_segment(t, seg)],
+                        "next_cursor": data.get('next_offset')}
+                if not data['tasks'] and data['next_cursor']:
+                    # a page filtered down to nothing still advances
+                    cursor = data['next_cursor']
+                    continue
+            tasks.extend(data.get('tasks') or [])
+            cursor = data.get('next_cursor')
+            if not cursor:
+                segments.pop(0)
+        # names for every owner and assignee on the page, in one request
+        user_cache.prefetch([t.get(k) for t in tasks for k in ('user_id', 'assignee_id')])
+        return {"tasks": tasks, "segments": segments, "cursor": cursor, "failed": False}
+
+    def _local_page(self, segments: list) -> list:
+        """Up to TASK_PAGE_SIZE replicated tasks, in the order the server
+        would return the feed segments. Keyword searches are server-only.
+        """
+        tasks = replica.rows('tasks')
+        if not tasks or any(seg.get('search') for seg in segments):
+            return []
+        page = []
+        for seg in segments:
+            rows = [t for t in tasks if self._matches_segment(t, seg)]
+            if seg.get('owner') is not None:
+                rows = [t for t in rows if t.get('user_id') == seg['owner']]
+            if seg.get('exclude_owner') is not None:
+                rows = [t for t in rows if t.get('user_id') != seg['exclude_owner']]
+            if seg.get('sort') == 'deadline':
+                rows = sorted((t for t in rows if t.get('deadline_at')), key=lambda t: (t['deadline_at'], t.get('id') or 0))
+            else:
+                rows = newest_first(rows)
+            page.extend(rows[:TASK_PAGE_SIZE - len(page)])
+            if len(page) >= TASK_PAGE_SIZE:
+                break
+        return page
+
+    def _page_failed(self, exc):
+        self._feed_loading = False
+        if getattr(self, '_feed_local', False):
+            # offline: keep the synced first page on screen
+            self._feed_local = False
+            self._feed_segments = []
+            return
+        self.content.append_rows([hint_row("Failed to load tasks.", DARK_BLUE)])
+        self._feed_segments = []
+
+    def _show_page(self, page: dict):
+        self._feed_loading = False
+        rows = []
+        for t in page['tasks']:
+            mine = bool(self._my_id and t.get('user_id') == self._my_id)
+            rows.append(self._task_row(t, mine=mine, dot_rgba=self._dot_color_for_task(t)))
+        self._feed_count += len(page['tasks'])
+        self._feed_segments = page['segments']
+        self._feed_cursor = page['cursor']
+        if page['failed']:
+            rows.append(hint_row("Failed to load tasks.", DARK_BLUE))
+        elif self._feed_segments:
+            rows.append({'viewclass': 'LoadMoreRow', 'text': 'Load more', 'press_cb': self._load_next_page,
+                         'height': 40})
+        elif not self._feed_count:
+            rows.append(self._hint("No tasks yet."))
+        if getattr(self, '_feed_local', False):
+            # the synced page on screen gives way to the server's; unchanged
+            # rows stay as they are
+            self._feed_local = False
+            self.content.set_rows(rows)
+            return
+        # one append for the whole page: only the new rows are laid out
+        self.content.append_rows(rows)
+
+    @staticmethod
+    def _matches_segment(task: dict, seg: dict) -> bool:
+        if seg.get('status') and (task.get('status') or 'open') != seg['status']:
+            return False
+        if seg.get('location') and task.get('location') != seg['location']:
+            return False
+        return True
 
     def _task_icon_widget(self):
         """Return a centered image widget for the task placeholder icon.
@@ -513,21 +638,17 @@ class TaskScreen(Screen):
         return icon
 
     # --- list helpers ---
-    def _add_section_header(self, text: str):
-        bar = BoxLayout(size_hint=(1, None), height=24)
-        bar.add_widget(Label(text=f"[b]{text}[/b]", markup=True, color=DARK_BLUE, size_hint=(1, 1)))
-        self.content.add_widget(bar)
-
-    def _add_hint(self, text: str):
-        self.content.add_widget(Label(text=text, color=(0.3,0.3,0.3,1), size_hint=(1, None), height=24))
-
-    def _add_task_row(self, task: dict, mine: bool = False, dot_rgba=(0.6, 0.6, 0.6, 1)):
-        def _view_cb(*_):
-            self.view_task_inline(task)
-        def _edit_cb(*_):
-            self._open_task_edit_popup(task)
-        row = _TaskRow(task, view_cb=_view_cb, edit_cb=_edit_cb, dot_rgba=dot_rgba)
-        self.content.add_widget(row)
+    # rows are data dicts for self.content; _TaskRow views render them
+    def _section_header(self, text: str) -> dict:
+        return hint_row(f"[b]{text}[/b]", DARK_BLUE, markup=True)
+
+    def _hint(self, text: str) -> dict:
+        return hint_row(text, (0.3, 0.3, 0.3, 1))
+
+    def _task_row(self, task: dict, mine: bool = False, dot_rgba=(0.6, 0.6, 0.6, 1)) -> dict:
+        return {'viewclass': 'TaskRow', 'task': task, 'dot_rgba': dot_rgba, 'height': 64,
+                'owner': None if mine else user_cache.name(task.get('user_id')),
+                'view_cb': self.view_task_inline, 'edit_cb': self._open_task_edit_popup}
 
     def _status_label(self, task: dict):
         status = (task.get('status') or 'open').lower()
@@ -539,6 +660,23 @@ class TaskScreen(Screen):
             return 'Complete', (0.2, 0.2, 0.2, 1)
         return status.title(), (0, 0, 0, 1)
 
+    def _format_reward(self, cents) -> str:
+        try:
+            cents = int(cents)
+        except Exception:
+            return ""
+        return str(cents // 100) if cents % 100 == 0 else f"{cents / 100:.2f}"
+
+    def _format_deadline(self, iso: str) -> str:
+        from datetime import datetime
+        try:
+            dt = datetime.fromisoformat(iso)
+        except Exception:
+            return iso or ""
+        if dt.hour == 0 and dt.minute == 0:
+            return dt.strftime('%b %d, %Y')
+        return dt.strftime('%b %d, %Y %H:%M')
+
     def _parse_details(self, description: str):
         if not description:
             return "", "", "", ""
@@ -562,7 +700,10 @@ class TaskScreen(Screen):
         if not api.token:
             print("Please log in to accept tasks.")
             return
-        resp = api.accept_task(task.get('id'))
+        self._calls.submit(api.accept_task, task.get('id'), on_success=self._accepted,
+                           on_error=lambda e: print("Accept failed:", e))
+
+    def _accepted(self, resp):
         if getattr(resp, 'status_code', 500) == 200:
             print("Task accepted")
         else:
@@ -577,7 +718,10 @@ class TaskScreen(Screen):
         if not api.token:
             print("Please log in to mark tasks done.")
             return
-        resp = api.mark_task_done(task.get('id'))
+        self._calls.submit(api.mark_task_done, task.get('id'), on_success=self._marked_done,
+                           on_error=lambda e: print("Mark done failed:", e))
+
+    def _marked_done(self, resp):
         if getattr(resp, 'status_code', 500) == 200:
             print("Task marked done")
         else:
@@ -653,10 +797,13 @@ class _ColorDot(Widget):
     def __init__(self, rgba=(0.6, 0.6, 0.6, 1), size_px=34, **kwargs):
         super().__init__(size_hint=(None, None), size=(size_px, size_px), **kwargs)
         with self.canvas:
-            Color(*rgba)
+            self._color = Color(*rgba)
             self._circle = Ellipse(pos=self.pos, size=self.size)
         self.bind(pos=self._update, size=self._update)
 
+    def set_rgba(self, rgba):
+        self._color.rgba = rgba
+
     def _update(self, *args):
         if hasattr(self, "_circle"):
             self._circle.pos = self.pos
@@ -676,8 +823,12 @@ class LightRoundedButton(Button):
         self._rect.pos = self.pos
         self._rect.size = self.size
 
-class _TaskRow(BoxLayout):
-    def __init__(self, task: dict, view_cb=None, edit_cb=None, dot_rgba=(0.6, 0.6, 0.6, 1), **kwargs):
+class _TaskRow(RecycleRow, BoxLayout):
+    """Task list row. One view is reused for whichever task scrolls into its
+    place, so the widgets are built once and update_row() refills them.
+    """
+
+    def __init__(self, **kwargs):
         super().__init__(orientation='horizontal', size_hint=(1, None), height=64, padding=[12, 8, 12, 8], spacing=10, **kwargs)
         # background and top divider like Study Buddy
         with self.canvas.before:
@@ -687,20 +838,41 @@ class _TaskRow(BoxLayout):
             self._line = Line(points=[])
         self.bind(pos=self._update_bg, size=self._update_bg)
 
-        self.task = task or {}
-        self.view_cb = view_cb or (lambda *_: None)
-        self.edit_cb = edit_cb or (lambda *_: None)
+        self.task = {}
+        self.view_cb = None
+        self.edit_cb = None
 
         # Left dot (centered vertically using an AnchorLayout)
         dot_size = 30
         dot_wrap = AnchorLayout(anchor_x='center', anchor_y='center', size_hint=(None, 1), width=dot_size)
-        dot_wrap.add_widget(_ColorDot(dot_rgba, size_px=dot_size))
+        self._dot = _ColorDot(size_px=dot_size)
+        dot_wrap.add_widget(self._dot)
         self.add_widget(dot_wrap)
 
         # Middle: title + status
         mid = BoxLayout(orientation='vertical', size_hint=(1, 1), spacing=2)
+        self._title_lbl = Label(markup=True, color=DARK_BLUE, size_hint=(1, None), height=22)
+        self._status_lbl = Label(size_hint=(1, None), height=20)
+        mid.add_widget(self._title_lbl)
+        mid.add_widget(self._status_lbl)
+        self.add_widget(mid)
+
+        # Right: View (+ Edit if owner)
+        self._right = BoxLayout(orientation='horizontal', size_hint=(None, 1), width=180, spacing=8)
+        view_btn = LightRoundedButton(text='View', size_hint=(None, None), size=(80, 36))
+        view_btn.bind(on_press=lambda *_: self.view_cb and self.view_cb(self.task))
+        self._right.add_widget(view_btn)
+        self._edit_btn = LightRoundedButton(text='Edit', size_hint=(None, None), size=(80, 36))
+        self._edit_btn.bind(on_press=lambda *_: self.edit_cb and self.edit_cb(self.task))
+        self.add_widget(self._right)
+
+    def update_row(self, data: dict):
+        self.task = data.get('task') or {}
+        self.view_cb = data.get('view_cb')
+        self.edit_cb = data.get('edit_cb')
+        self._dot.set_rgba(data.get('dot_rgba') or (0.6, 0.6, 0.6, 1))
         title = (self.task.get('title') or '').strip() or 'Untitled'
-        mid.add_widget(Label(text=f"[b]{title}[/b]", markup=True, color=DARK_BLUE, size_hint=(1, None), height=22))
+        self._title_lbl.text = f"[b]{title}[/b]"
         # status label
         status = (self.task.get('status') or 'open').lower()
         if status in ('open', ''):
@@ -711,25 +883,15 @@ class _TaskRow(BoxLayout):
             sub_text, sub_color = 'Complete', (0.2, 0.2, 0.2, 1)
         else:
             sub_text, sub_color = status.title(), (0, 0, 0, 1)
-        mid.add_widget(Label(text=sub_text, color=sub_color, size_hint=(1, None), height=20))
-        self.add_widget(mid)
-
-        # Right: View (+ Edit if owner)
-        right = BoxLayout(orientation='horizontal', size_hint=(None, 1), width=180, spacing=8)
-        view_btn = LightRoundedButton(text='View', size_hint=(None, None), size=(80, 36))
-        view_btn.bind(on_press=self.view_cb)
-        right.add_widget(view_btn)
+        owner = data.get('owner')
+        self._status_lbl.text = f"{sub_text} \u00b7 {owner}" if owner else sub_text
+        self._status_lbl.color = sub_color
         # owner can edit
-        try:
-            from services.api import api as _api
-            can_edit = bool(_api.user) and self.task.get('user_id') == (_api.user or {}).get('id')
-        except Exception:
-            can_edit = False
-        if can_edit:
-            edit_btn = LightRoundedButton(text='Edit', size_hint=(None, None), size=(80, 36))
-            edit_btn.bind(on_press=self.edit_cb)
-            right.add_widget(edit_btn)
-        self.add_widget(right)
+        can_edit = bool(api.user) and self.task.get('user_id') == (api.user or {}).get('id')
+        if can_edit and self._edit_btn.parent is None:
+            self._right.add_widget(self._edit_btn)
+        elif not can_edit and self._edit_btn.parent is not None:
+            self._right.remove_widget(self._edit_btn)
 
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
@@ -739,3 +901,20 @@ class _TaskRow(BoxLayout):
         x, y = self.pos
         w, h = self.size
         self._line.points = [x, y + h, x + w, y + h]
+
+
+class _LoadMoreRow(RecycleRow, LightRoundedButton):
+    """Trailing "Load more" button of the task feed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(size_hint=(1, None), height=40, **kwargs)
+        self.press_cb = None
+        self.bind(on_press=lambda *_: self.press_cb and self.press_cb())
+
+    def update_row(self, data: dict):
+        self.text = data.get('text', '')
+        self.press_cb = data.get('press_cb')
+
+
+Factory.register('TaskRow', cls=_TaskRow)
+Factory.register('LoadMoreRow', cls=_LoadMoreRow)
@@ -6,6 +6,8 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.graphics import Color, Rectangle
 from services.api import api
+from services.background import CallGroup
+from components.loading import LoadingIndicator
 
 
 class VerifyEmailScreen(Screen):
@@ -35,6 +37,12 @@ class VerifyEmailScreen(Screen):
         layout.add_widget(resend_btn)
         layout.add_widget(back_btn)
         self.add_widget(layout)
+        self._loading = LoadingIndicator()
+        self.add_widget(self._loading)
+        self._calls = CallGroup(on_busy=self._loading.set_busy)
+
+    def on_leave(self, *args):
+        self._calls.cancel_all()
 
     def _update_bg(self, *args):
         if hasattr(self, '_bg'):
@@ -59,7 +67,10 @@ class VerifyEmailScreen(Screen):
         if not self._email or not code:
             self._alert("Missing email or code")
             return
-        resp = api.verify_otp(self._email, code)
+        self._calls.submit(api.verify_otp, self._email, code, on_success=self._verify_done,
+                           on_error=lambda e: self._alert("Network error. Please try again."), key="verify")
+
+    def _verify_done(self, resp):
         if resp.status_code == 200:
             self._alert("Email verified! You can now log in.")
             self.manager.current = "login"
@@ -74,7 +85,10 @@ class VerifyEmailScreen(Screen):
         if not self._email:
             self._alert("Missing email")
             return
-        resp = api.resend_otp(self._email)
+        self._calls.submit(api.resend_otp, self._email, on_success=self._resend_done,
+                           on_error=lambda e: self._alert("Network error. Please try again."), key="resend")
+
+    def _resend_done(self, resp):
         if resp.status_code == 200:
             self._alert("A new code has been sent.")
         else:
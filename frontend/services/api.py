@@ -1,13 +1,75 @@
 # frontend/services/api.py
+import threading
+from collections import OrderedDict
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "http://127.0.0.1:5000"
 
+# keep-alive connections kept open to the backend (screens refresh from a
+# few background threads at once)
+POOL_SIZE = 8
+# (connect, read) seconds, unless a call passes its own timeout
+DEFAULT_TIMEOUT = (3.05, 15)
+# failed connects are retried for any call; read errors and gateway errors
+# only for idempotent methods (GET, HEAD, PUT, DELETE, ...), never for POST
+RETRY = Retry(total=2, connect=2, read=2, status=2, backoff_factor=0.2,
+              status_forcelist=(502, 503, 504), allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+              respect_retry_after_header=True, raise_on_status=False)
+# GET responses that carried an ETag, kept to revalidate with If-None-Match;
+# a 304 hands the cached response back without a body on the wire
+VALIDATOR_CACHE_SIZE = 64
+
+
+def make_session(pool_size=POOL_SIZE, retry=RETRY):
+    """A requests.Session with a sized keep-alive pool and retries."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+class ValidatorCache:
+    """LRU of (etag, response) by request, shared by the API worker threads."""
+
+    def __init__(self, size=VALIDATOR_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, etag, resp):
+        with self._lock:
+            self._entries[key] = (etag, resp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
 class ApiService:
     def __init__(self):
         self.base = BASE_URL
         self.token = None
         self.user = None
+        self.session = make_session()
+        self.validators = ValidatorCache()
+        # called (from a worker thread) when the backend rejects our token,
+        # e.g. a session restored at startup that has since expired
+        self.on_unauthorized = None
 
     def _headers(self):
         headers = {"Content-Type": "application/json"}
@@ -15,15 +77,45 @@ class ApiService:
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
 
+    def _request(self, method, url, **kwargs):
+        """Send through the shared session with auth headers and the default timeout.
+
+        GETs are revalidated against the last response with an ETag: when
+        the backend answers 304 that earlier response is returned instead.
+        """
+        kwargs.setdefault("headers", self._headers())
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        if method != "GET":
+            return self._checked(self.session.request(method, url, **kwargs), kwargs)
+        # the token is part of the key: /chat/overview differs per user
+        key = (url, tuple(sorted((kwargs.get("params") or {}).items())), kwargs["headers"].get("Authorization"))
+        cached = self.validators.get(key)
+        if cached is not None:
+            kwargs["headers"] = {**kwargs["headers"], "If-None-Match": cached[0]}
+        resp = self._checked(self.session.request(method, url, **kwargs), kwargs)
+        if resp.status_code == 304 and cached is not None:
+            return cached[1]
+        etag = resp.headers.get("ETag")
+        if resp.status_code == 200 and etag:
+            resp.content  # read the body now; later callers may be on other threads
+            self.validators.put(key, etag, resp)
+        return resp
+
+    def _checked(self, resp, kwargs):
+        # 401: expired token; 422: one the backend cannot decode (e.g. its key changed)
+        if resp.status_code in (401, 422) and "Authorization" in kwargs["headers"] and self.on_unauthorized:
+            self.on_unauthorized()
+        return resp
+
     def register(self, email, password, first_name="", last_name="", username=None):
         username = username or (f"{first_name} {last_name}".strip() or email.split("@")[0])
         payload = {"email": email, "password": password, "username": username,
                    "first_name": first_name, "last_name": last_name}
-        return requests.post(f"{self.base}/auth/register", json=payload, headers=self._headers())
+        return self._request("POST", f"{self.base}/auth/register", json=payload)
 
     def login(self, email, password):
         payload = {"email": email, "password": password}
-        resp = requests.post(f"{self.base}/auth/login", json=payload, headers=self._headers())
+        resp = self._request("POST", f"{self.base}/auth/login", json=payload)
         if resp.status_code == 200:
             data = resp.json()
             self.token = data.get("token")
@@ -32,25 +124,60 @@ class ApiService:
 
     def verify_otp(self, email, code):
         payload = {"email": email, "otp": str(code)}
-        return requests.post(f"{self.base}/auth/verify-otp", json=payload, headers=self._headers())
+        return self._request("POST", f"{self.base}/auth/verify-otp", json=payload)
 
     def resend_otp(self, email):
         payload = {"email": email}
-        return requests.post(f"{self.base}/auth/resend-otp", json=payload, headers=self._headers())
+        return self._request("POST", f"{self.base}/auth/resend-otp", json=payload)
 
     def logout(self):
         self.token = None
         self.user = None
+        self.validators.clear()
 
-    def list_tasks(self):
-        return requests.get(f"{self.base}/tasks", headers=self._headers())
+    def list_tasks(self, status=None, owner=None, exclude_owner=None, assignee=None,
+                   location=None, sort=None, limit=None, cursor=None):
+        params = {}
+        if status:
+            params["status"] = status
+        if owner is not None:
+            params["owner"] = owner
+        if exclude_owner is not None:
+            params["exclude_owner"] = exclude_owner
+        if assignee is not None:
+            params["assignee"] = assignee
+        if location:
+            params["location"] = location
+        if sort:
+            params["sort"] = sort
+        if limit:
+            params["limit"] = int(limit)
+        if cursor:
+            params["cursor"] = cursor
+        return self._request("GET", f"{self.base}/tasks", params=params or None)
+
+    def search(self, q, kind=None, limit=None, offset=None):
+        params = {"q": q}
+        if kind:
+            params["kind"] = kind
+        if limit:
+            params["limit"] = int(limit)
+        if offset:
+            params["offset"] = int(offset)
+        return self._request("GET", f"{self.base}/search", params=params)
 
     def list_my_tasks(self):
-        return requests.get(f"{self.base}/tasks/mine", headers=self._headers())
+        return self._request("GET", f"{self.base}/tasks/mine")
 
-    def create_task(self, title, description=""):
+    def create_task(self, title, description="", reward=None, deadline=None, location=None):
         payload = {"title": title, "description": description}
-        return requests.post(f"{self.base}/tasks", json=payload, headers=self._headers())
+        if reward:
+            payload["reward"] = reward
+        if deadline:
+            payload["deadline"] = deadline
+        if location:
+            payload["location"] = location
+        return self._request("POST", f"{self.base}/tasks", json=payload)
 
     def update_task(self, task_id, title=None, description=None, status=None):
         payload = {}
@@ -60,34 +187,74 @@ class ApiService:
             payload["description"] = description
         if status is not None:
             payload["status"] = status
-        return requests.put(f"{self.base}/tasks/{task_id}", json=payload, headers=self._headers())
+        return self._request("PUT", f"{self.base}/tasks/{task_id}", json=payload)
 
     def delete_task(self, task_id):
-        return requests.delete(f"{self.base}/tasks/{task_id}", headers=self._headers())
+        return self._request("DELETE", f"{self.base}/tasks/{task_id}")
 
     def accept_task(self, task_id):
-        return requests.post(f"{self.base}/tasks/{task_id}/accept", headers=self._headers())
+        return self._request("POST", f"{self.base}/tasks/{task_id}/accept")
 
     def mark_task_done(self, task_id):
-        return requests.post(f"{self.base}/tasks/{task_id}/done", headers=self._headers())
+        return self._request("POST", f"{self.base}/tasks/{task_id}/done")
 
     def send_message(self, receiver_id, content):
         payload = {"receiver_id": receiver_id, "content": content}
-        return requests.post(f"{self.base}/chat/send", json=payload, headers=self._headers())
+        return self._request("POST", f"{self.base}/chat/send", json=payload)
+
+    @staticmethod
+    def _message_cursor(after_id=None, before_id=None, since=None, limit=None):
+        params = {}
+        if after_id is not None:
+            params["after_id"] = int(after_id)
+        if before_id is not None:
+            params["before_id"] = int(before_id)
+        if since:
+            params["since"] = since
+        if limit:
+            params["limit"] = int(limit)
+        return params or None
 
     # Task-specific chat
-    def list_task_messages(self, task_id):
-        return requests.get(f"{self.base}/chat/task/{task_id}", headers=self._headers())
+    def list_task_messages(self, task_id, after_id=None, before_id=None, since=None, limit=None):
+        params = self._message_cursor(after_id, before_id, since, limit)
+        return self._request("GET", f"{self.base}/chat/task/{task_id}", params=params)
 
     def send_task_message(self, task_id, content):
         payload = {"content": content}
-        return requests.post(f"{self.base}/chat/task/{task_id}/send", json=payload, headers=self._headers())
+        return self._request("POST", f"{self.base}/chat/task/{task_id}/send", json=payload)
+
+    def update_profile(self, first_name=None, last_name=None, username=None, bio=None):
+        payload = {}
+        if first_name is not None:
+            payload["first_name"] = first_name
+        if last_name is not None:
+            payload["last_name"] = last_name
+        if username is not None:
+            payload["username"] = username
+        if bio is not None:
+            payload["bio"] = bio
+        return self._request("PUT", f"{self.base}/users/me", json=payload)
 
     def get_user(self, user_id):
-        return requests.get(f"{self.base}/users/{user_id}", headers=self._headers())
+        return self._request("GET", f"{self.base}/users/{user_id}")
+
+    def get_users(self, user_ids):
+        """Batch lookup; the backend accepts at most 100 ids per call."""
+        ids = ",".join(str(int(i)) for i in user_ids)
+        return self._request("GET", f"{self.base}/users", params={"ids": ids})
+
+    def sync(self, since=None, limit=None):
+        """Changes since a token from the previous call (everything without one)."""
+        params = {}
+        if since:
+            params["since"] = since
+        if limit:
+            params["limit"] = int(limit)
+        return self._request("GET", f"{self.base}/sync", params=params)
 
     def list_rides(self):
-        return requests.get(f"{self.base}/rides", headers=self._headers())
+        return self._request("GET", f"{self.base}/rides")
 
     def create_ride(self, origin, destination, time, kind: str = None, description: str = None):
         payload = {"origin": origin, "destination": destination, "time": time}
@@ -95,10 +262,10 @@ class ApiService:
             payload["kind"] = str(kind)
         if description:
             payload["description"] = str(description)
-        return requests.post(f"{self.base}/rides", json=payload, headers=self._headers())
+        return self._request("POST", f"{self.base}/rides", json=payload)
 
     def delete_ride(self, ride_id):
-        return requests.delete(f"{self.base}/rides/{ride_id}", headers=self._headers())
+        return self._request("DELETE", f"{self.base}/rides/{ride_id}")
 
     # Study sessions
     def list_study_sessions(self, q=None, campus=None):
@@ -107,7 +274,7 @@ class ApiService:
             params["q"] = q
         if campus:
             params["campus"] = campus
-        return requests.get(f"{self.base}/study", headers=self._headers(), params=params or None)
+        return self._request("GET", f"{self.base}/study", params=params or None)
 
     def create_study_session(self, course, available=True, campus="Surrey", teacher=None, description=None):
         payload = {"course": course, "available": bool(available), "campus": campus}
@@ -115,7 +282,7 @@ class ApiService:
             payload["teacher"] = teacher
         if description is not None:
             payload["description"] = description
-        return requests.post(f"{self.base}/study", json=payload, headers=self._headers())
+        return self._request("POST", f"{self.base}/study", json=payload)
 
     def update_study_session(self, session_id, course=None, available=None, campus=None, teacher=None, description=None):
         payload = {}
@@ -129,19 +296,30 @@ class ApiService:
             payload["teacher"] = teacher
         if description is not None:
             payload["description"] = description
-        return requests.put(f"{self.base}/study/{session_id}", json=payload, headers=self._headers())
+        return self._request("PUT", f"{self.base}/study/{session_id}", json=payload)
 
     def delete_study_session(self, session_id):
-        return requests.delete(f"{self.base}/study/{session_id}", headers=self._headers())
+        return self._request("DELETE", f"{self.base}/study/{session_id}")
 
     def connect_study_session(self, session_id):
-        return requests.post(f"{self.base}/study/{session_id}/connect", headers=self._headers())
+        return self._request("POST", f"{self.base}/study/{session_id}/connect")
 
     # Direct chat
-    def list_conversation(self, other_user_id):
-        return requests.get(f"{self.base}/chat/messages/{other_user_id}", headers=self._headers())
+    def list_conversation(self, other_user_id, after_id=None, before_id=None, since=None, limit=None):
+        params = self._message_cursor(after_id, before_id, since, limit)
+        return self._request("GET", f"{self.base}/chat/messages/{other_user_id}", params=params)
 
     def list_chat_overview(self):
-        return requests.get(f"{self.base}/chat/overview", headers=self._headers())
+        return self._request("GET", f"{self.base}/chat/overview")
+
+    def mark_chat_read(self, task_id=None, other_id=None, message_id=None):
+        payload = {}
+        if task_id:
+            payload["task_id"] = task_id
+        if other_id:
+            payload["other_id"] = other_id
+        if message_id:
+            payload["message_id"] = message_id
+        return self._request("POST", f"{self.base}/chat/read", json=payload)
 
 api = ApiService()
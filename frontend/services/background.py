@@ -0,0 +1,135 @@
+# frontend/services/background.py
+# Runs blocking API calls on a small thread pool so screens never wait on the
+# network from the Kivy main thread. Results come back through
+# Clock.schedule_once, so callbacks may touch widgets directly.
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from kivy.clock import Clock
+
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="api")
+        return _executor
+
+
+def _log_error(exc):
+    print("Request failed:", exc)
+
+
+class Call:
+    """One background call. After cancel() its callbacks never run; a request
+    already on the wire still finishes (bounded by the API timeouts).
+    """
+
+    def __init__(self, on_success=None, on_error=None, on_finish=None):
+        self.on_success = on_success
+        self.on_error = on_error or _log_error
+        self._on_finish = on_finish
+        self.future = None
+        self.cancelled = False
+        self.finished = False
+
+    def cancel(self):
+        if self.finished or self.cancelled:
+            return
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+        self._finish()
+
+    def _finish(self):
+        if self._on_finish is not None:
+            cb, self._on_finish = self._on_finish, None
+            cb(self)
+
+    def _deliver(self, future):
+        # main thread
+        if self.cancelled:
+            return
+        self.finished = True
+        self._finish()
+        try:
+            result = future.result()
+        except Exception as e:
+            self.on_error(e)
+            return
+        if self.on_success is not None:
+            self.on_success(result)
+
+
+def run_async(fn, *args, on_success=None, on_error=None, _on_finish=None, **kwargs) -> Call:
+    """Run fn(*args, **kwargs) on the API pool; then on_success(result) or
+    on_error(exception) runs on the main thread unless the call was cancelled.
+    """
+    call = Call(on_success, on_error, _on_finish)
+    call.future = _pool().submit(fn, *args, **kwargs)
+    call.future.add_done_callback(lambda f: Clock.schedule_once(lambda dt: call._deliver(f), 0))
+    return call
+
+
+class CallGroup:
+    """The calls a screen has in flight.
+
+    cancel_all() (from on_leave) drops every pending callback. on_busy(bool)
+    fires on the main thread when the first call starts and when the last
+    one finishes, to drive a loading indicator. Passing key= to submit()
+    cancels the previous call with the same key, so a newer refresh always
+    wins over an older one still in flight. quiet=True calls (background
+    polls) are cancelled like the rest but never show as busy.
+    """
+
+    def __init__(self, on_busy=None):
+        self.on_busy = on_busy
+        self._pending = set()
+        self._loud = set()
+        self._keyed = {}
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._loud)
+
+    def submit(self, fn, *args, on_success=None, on_error=None, key=None, quiet=False, **kwargs) -> Call:
+        self.cancel(key)
+        was_busy = self.busy
+        call = run_async(fn, *args, on_success=on_success, on_error=on_error,
+                         _on_finish=self._finished, **kwargs)
+        self._pending.add(call)
+        if not quiet:
+            self._loud.add(call)
+        if key is not None:
+            self._keyed[key] = call
+        if not was_busy and self.busy and self.on_busy is not None:
+            self.on_busy(True)
+        return call
+
+    def running(self, key) -> bool:
+        return key in self._keyed
+
+    def cancel(self, key):
+        """Cancel the pending call submitted under key, if any."""
+        call = self._keyed.pop(key, None) if key is not None else None
+        if call is not None:
+            call.cancel()
+
+    def cancel_all(self):
+        for call in list(self._pending):
+            call.cancel()
+
+    def _finished(self, call):
+        was_busy = self.busy
+        self._pending.discard(call)
+        self._loud.discard(call)
+        for key, keyed in list(self._keyed.items()):
+            if keyed is call:
+                del self._keyed[key]
+        if was_busy and not self.busy and self.on_busy is not None:
+            self.on_busy(False)
@@ -0,0 +1,191 @@
+# frontend/services/replica.py
+# Local SQLite copy of the tasks, rides, study sessions and the signed-in
+# user's messages, kept current with GET /sync deltas. Screens draw from it
+# the moment they open and refresh from the network after. Responses that
+# are not replicated row by row (the chat overview) are kept whole as
+# snapshots.
+import json
+import os
+import sqlite3
+import threading
+
+from services.api import api
+
+_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DB_PATH = os.path.join(_BASE, "replica.db")
+
+# sections of a /sync response, one per replicated collection
+KINDS = ("tasks", "rides", "study", "messages")
+# changes asked for per /sync call
+SYNC_PAGE_SIZE = 500
+
+
+def newest_first(rows: list) -> list:
+    """Rows in the servers' list order: created_at, then id, descending."""
+    return sorted(rows, key=lambda r: (r.get('created_at') or '', r.get('id') or 0), reverse=True)
+
+
+class Replica:
+    """Rows by kind and id, held in memory and mirrored to SQLite.
+
+    rows() never touches the disk after the first call and only returns data
+    synced for the signed-in user. sync() blocks on the network, so screens
+    run it on the API pool; each page is committed to SQLite together with
+    its token before it is applied in memory.
+    """
+
+    def __init__(self, path=_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()  # guards the in-memory copy
+        self._sync_lock = threading.Lock()  # one sync at a time
+        self._rows = None
+        self._meta = {}
+        self._snapshots = {}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE IF NOT EXISTS rows (kind TEXT NOT NULL, id INTEGER NOT NULL, "
+                     "data TEXT NOT NULL, PRIMARY KEY (kind, id)) WITHOUT ROWID")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS snapshots (name TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        return conn
+
+    def _ensure_loaded(self):
+        if self._rows is not None:
+            return
+        rows, meta, snapshots = {kind: {} for kind in KINDS}, {}, {}
+        try:
+            conn = self._connect()
+            try:
+                for kind, row_id, data in conn.execute("SELECT kind, id, data FROM rows"):
+                    if kind in rows:
+                        rows[kind][row_id] = json.loads(data)
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+                snapshots = dict(conn.execute("SELECT name, data FROM snapshots"))
+            finally:
+                conn.close()
+        except Exception as e:
+            print("replica: load failed:", e)
+        self._rows, self._meta, self._snapshots = rows, meta, snapshots
+
+    def _owned(self) -> bool:
+        user_id = (api.user or {}).get('id')
+        return user_id is not None and self._meta.get('user_id') == str(user_id)
+
+    def rows(self, kind: str) -> list:
+        """Every replicated row of `kind`, unordered; [] before the first sync."""
+        with self._lock:
+            self._ensure_loaded()
+            if not self._owned():
+                return []
+            return list(self._rows[kind].values())
+
+    def has_data(self) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            return self._owned() and bool(self._meta.get('token'))
+
+    def _clear(self, user_id=None):
+        # caller holds self._lock
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM rows")
+                conn.execute("DELETE FROM meta")
+                conn.execute("DELETE FROM snapshots")
+                if user_id is not None:
+                    conn.execute("INSERT INTO meta (key, value) VALUES ('user_id', ?)", (str(user_id),))
+        finally:
+            conn.close()
+        self._rows = {kind: {} for kind in KINDS}
+        self._meta = {} if user_id is None else {'user_id': str(user_id)}
+        self._snapshots = {}
+
+    def snapshot(self, name: str):
+        """The last response saved under `name` for the signed-in user, or None."""
+        with self._lock:
+            self._ensure_loaded()
+            data = self._snapshots.get(name) if self._owned() else None
+        return json.loads(data) if data is not None else None
+
+    def save_snapshot(self, name: str, value):
+        """Keep `value` (JSON-able) as the snapshot `name`; a no-op when unchanged."""
+        user_id = (api.user or {}).get('id')
+        if user_id is None:
+            return
+        data = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._ensure_loaded()
+            if not self._owned():
+                self._clear(user_id)
+            if self._snapshots.get(name) == data:
+                return
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO snapshots (name, data) VALUES (?, ?)", (name, data))
+            finally:
+                conn.close()
+            self._snapshots[name] = data
+
+    def reset(self):
+        """Forget everything (sign out): messages are private to their user."""
+        with self._lock:
+            self._ensure_loaded()
+            self._clear()
+
+    def _apply(self, page: dict) -> bool:
+        upserts, deletes = [], []
+        for kind in KINDS:
+            section = page.get(kind) or {}
+            upserts += [(kind, int(r['id']), r) for r in section.get('upserted') or []]
+            deletes += [(kind, int(row_id)) for row_id in section.get('deleted') or []]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM rows WHERE kind = ? AND id = ?", deletes)
+                conn.executemany("INSERT OR REPLACE INTO rows (kind, id, data) VALUES (?, ?, ?)",
+                                 [(kind, row_id, json.dumps(r, ensure_ascii=False, separators=(',', ':'))) for kind, row_id, r in upserts])
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('token', ?)", (page.get('token'),))
+        finally:
+            conn.close()
+        with self._lock:
+            for kind, row_id in deletes:
+                self._rows[kind].pop(row_id, None)
+            for kind, row_id, r in upserts:
+                self._rows[kind][row_id] = r
+            self._meta['token'] = page.get('token')
+        return bool(upserts or deletes)
+
+    def sync(self) -> bool:
+        """Pull every change since the last sync. Returns whether anything
+        changed; raises RuntimeError if the backend refuses.
+        """
+        user_id = (api.user or {}).get('id')
+        if not api.token or user_id is None:
+            return False
+        with self._sync_lock:
+            with self._lock:
+                self._ensure_loaded()
+                if not self._owned():
+                    self._clear(user_id)
+                token = self._meta.get('token')
+            changed, restarted = False, False
+            while True:
+                resp = api.sync(since=token, limit=SYNC_PAGE_SIZE)
+                if resp.status_code == 410 and not restarted:
+                    # the server's log was reset; start over from nothing
+                    with self._lock:
+                        self._clear(user_id)
+                    token, changed, restarted = None, True, True
+                    continue
+                if resp.status_code != 200:
+                    raise RuntimeError(f"sync failed: HTTP {resp.status_code}")
+                page = resp.json() or {}
+                changed = self._apply(page) or changed
+                token = page.get('token')
+                if not page.get('more'):
+                    return changed
+
+
+replica = Replica()
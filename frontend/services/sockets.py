@@ -1,14 +1,151 @@
-# frontend/services/socket.py
+# frontend/services/sockets.py
+# Socket.IO client for server pushes. Events arrive on the client's network
+# thread, so listeners are always invoked on the Kivy main thread.
+import threading
+
 import socketio
+from kivy.clock import Clock
+
+from services.api import BASE_URL
+
+sio = socketio.Client(reconnection=True)
+_token = None
+_rooms = []          # join payloads, replayed after a reconnect
+_ride_filter = None  # ride feed subscription, replayed after a reconnect
+_listeners = {}      # event name -> [callback]
+_connect_lock = threading.Lock()
+
+
+def _dispatch(event, payload=None):
+    for cb in list(_listeners.get(event, ())):
+        Clock.schedule_once(lambda dt, cb=cb: cb(payload), 0)
+
+
+@sio.on("connect")
+def _on_connect():
+    # rooms are per connection on the server, so rejoin after reconnecting
+    for room in list(_rooms):
+        try:
+            sio.emit("join", room)
+        except Exception:
+            pass
+    if _ride_filter is not None:
+        try:
+            sio.emit("subscribe_rides", _ride_filter)
+        except Exception:
+            pass
+    _dispatch("connect")
+
+
+@sio.on("disconnect")
+def _on_disconnect(*args):
+    _dispatch("disconnect")
+
+
+@sio.on("chat_message")
+def _on_chat_message(data):
+    _dispatch("chat_message", data)
+
+
+@sio.on("ride_created")
+def _on_ride_created(data):
+    _dispatch("ride_created", data)
+
+
+@sio.on("ride_deleted")
+def _on_ride_deleted(data):
+    _dispatch("ride_deleted", data)
+
+
+def add_listener(event, callback):
+    _listeners.setdefault(event, [])
+    if callback not in _listeners[event]:
+        _listeners[event].append(callback)
 
-# simple client
-sio = socketio.Client()
 
-def connect(url="http://127.0.0.1:5000"):
+def remove_listener(event, callback):
     try:
-        sio.connect(url)
-    except Exception as e:
-        print("Socket connect error:", e)
+        _listeners.get(event, []).remove(callback)
+    except ValueError:
+        pass
+
+
+def is_connected():
+    return sio.connected
+
+
+def connect(token, url=BASE_URL):
+    """Open (or reuse) an authenticated connection; returns True when connected."""
+    global _token
+    with _connect_lock:
+        if sio.connected and token == _token:
+            return True
+        if sio.connected:
+            disconnect()
+        _token = token
+        if not token:
+            return False
+        try:
+            sio.connect(url, auth={"token": token}, wait_timeout=3)
+        except Exception as e:
+            print("Socket connect error:", e)
+            return False
+        return sio.connected
+
+
+def connect_async(token, url=BASE_URL):
+    """Connect without blocking the UI; listeners get "connect" when ready."""
+    threading.Thread(target=connect, args=(token, url), daemon=True).start()
+
+
+def disconnect():
+    global _ride_filter
+    _rooms.clear()
+    _ride_filter = None
+    try:
+        sio.disconnect()
+    except Exception:
+        pass
+
+
+def join_conversation(task_id=None, other_id=None):
+    room = {"task_id": task_id} if task_id else {"other_id": other_id}
+    if room not in _rooms:
+        _rooms.append(room)
+    if sio.connected:
+        try:
+            sio.emit("join", room)
+        except Exception:
+            pass
+
+
+def leave_conversation(task_id=None, other_id=None):
+    room = {"task_id": task_id} if task_id else {"other_id": other_id}
+    if room in _rooms:
+        _rooms.remove(room)
+    if sio.connected:
+        try:
+            sio.emit("leave", room)
+        except Exception:
+            pass
+
+
+def subscribe_rides(kind=None, origin=None, destination=None):
+    """Follow the ride feed room for a filter; None/"Any" means any value."""
+    global _ride_filter
+    _ride_filter = {"kind": kind or "*", "origin": origin or "*", "destination": destination or "*"}
+    if sio.connected:
+        try:
+            sio.emit("subscribe_rides", _ride_filter)
+        except Exception:
+            pass
+
 
-def send_message(room, payload):
-    sio.emit("message", {"room": room, **payload})
+def unsubscribe_rides():
+    global _ride_filter
+    _ride_filter = None
+    if sio.connected:
+        try:
+            sio.emit("unsubscribe_rides")
+        except Exception:
+            pass
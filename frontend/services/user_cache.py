@@ -0,0 +1,131 @@
+# frontend/services/user_cache.py
+# Profiles of other users, shared by every screen. Lookups that miss are
+# batched into one GET /users?ids=... instead of one GET /users/<id> each.
+import threading
+import time
+from collections import OrderedDict
+
+from services.api import api
+
+# most recently used profiles kept in memory
+USER_CACHE_SIZE = 512
+# a cached profile is fetched again after this long (names and bios change)
+USER_CACHE_TTL_SECONDS = 300
+# ids per request; matches MAX_BATCH_IDS in backend/routes/users.py
+BATCH_SIZE = 100
+
+# cached in place of a profile for ids the backend does not know, so they are
+# not asked for again until the entry expires
+_MISSING = object()
+
+
+def display_name(user) -> str | None:
+    """First and last name, else username, else email."""
+    if not user:
+        return None
+    full = f"{(user.get('first_name') or '').strip()} {(user.get('last_name') or '').strip()}".strip()
+    return full or user.get('username') or user.get('email')
+
+
+class UserCache:
+    """LRU of user dicts by id, each entry valid for ttl seconds.
+
+    get() only looks in memory and is safe on the main thread. get_many()
+    fetches whatever is missing or stale and blocks, so screens run it
+    through their CallGroup like any other API call.
+    """
+
+    def __init__(self, fetch=None, size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS):
+        self._fetch = fetch or api.get_users
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # id -> (expires_at, user or _MISSING)
+
+    def _lookup(self, user_id, now):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def _store(self, user_id, value, now):
+        self._entries[user_id] = (now + self.ttl, value)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def get(self, user_id):
+        """The cached user dict, or None if unknown, missing or expired."""
+        if user_id is None:
+            return None
+        with self._lock:
+            entry = self._lookup(int(user_id), time.monotonic())
+        return None if entry is None or entry[1] is _MISSING else entry[1]
+
+    def name(self, user_id):
+        return display_name(self.get(user_id))
+
+    def put(self, user: dict):
+        if user and user.get('id') is not None:
+            with self._lock:
+                self._store(int(user['id']), user, time.monotonic())
+
+    def put_many(self, users):
+        for user in users or ():
+            self.put(user)
+
+    def invalidate(self, user_id=None):
+        """Forget one user, or everyone when called without an id."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(user_id), None)
+
+    def get_many(self, user_ids) -> dict:
+        """{id: user} for the ids the backend knows, fetching any that are not
+        cached in batches of BATCH_SIZE. Blocks; call it from a worker.
+        """
+        wanted = list(dict.fromkeys(int(i) for i in user_ids if i is not None))
+        found, missing = {}, []
+        with self._lock:
+            now = time.monotonic()
+            for user_id in wanted:
+                entry = self._lookup(user_id, now)
+                if entry is None:
+                    missing.append(user_id)
+                elif entry[1] is not _MISSING:
+                    found[user_id] = entry[1]
+        if not api.token:
+            # the lookup needs a login; signed out, rows go without names
+            return found
+        for start in range(0, len(missing), BATCH_SIZE):
+            chunk = missing[start:start + BATCH_SIZE]
+            resp = self._fetch(chunk)
+            if resp.status_code != 200:
+                # leave the chunk uncached so the next call tries again
+                continue
+            users = {int(u['id']): u for u in (resp.json() or {}).get('users', [])}
+            with self._lock:
+                now = time.monotonic()
+                for user_id in chunk:
+                    self._store(user_id, users.get(user_id, _MISSING), now)
+            found.update(users)
+        return found
+
+    def prefetch(self, user_ids) -> dict:
+        """get_many() that never raises, for warming the cache alongside a
+        list request; the list still renders if the lookup fails.
+        """
+        try:
+            return self.get_many(user_ids)
+        except Exception as e:
+            print("User lookup failed:", e)
+            return {}
+
+
+user_cache = UserCache()